@@ -0,0 +1,50 @@
+# File: backend/app/api/avatar.py
+from fastapi import APIRouter, HTTPException, Request, UploadFile, File
+from fastapi.responses import Response
+from app.services.avatar_store import (
+    AVATAR_ID_PATTERN, AVATAR_MAX_BYTES, AVATAR_URL_PREFIX, CONTENT_TYPES,
+    AvatarError, AvatarTooLargeError, avatar_store,
+)
+
+router = APIRouter()
+
+# Avatar ids are content hashes, so a given URL always serves the same bytes.
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.post("", tags=["Avatar"], summary="Upload Avatar")
+async def upload_avatar(file: UploadFile = File(...)):
+    """
+    Stores an avatar image and returns its reference. Uploading the same image
+    again returns the same reference without storing a second copy.
+    """
+    # Read one byte past the limit so oversized uploads are caught without buffering them whole.
+    data = await file.read(AVATAR_MAX_BYTES + 1)
+    try:
+        avatar_id = await avatar_store.store(data)
+    except AvatarTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except AvatarError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"status": "OK", "id": avatar_id, "url": AVATAR_URL_PREFIX + avatar_id}
+
+
+@router.get("/{avatar_id}", tags=["Avatar"], summary="Get Avatar")
+async def get_avatar(avatar_id: str, request: Request):
+    if not AVATAR_ID_PATTERN.match(avatar_id):
+        raise HTTPException(status_code=404, detail="Avatar not found")
+    etag = f'"{avatar_id.split(".")[0]}"'
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    data = await avatar_store.load(avatar_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Avatar not found")
+
+    extension = avatar_id.rsplit(".", 1)[1]
+    if extension == "svg":
+        # Opened directly, an uploaded SVG must not be able to run scripts.
+        headers["Content-Security-Policy"] = "default-src 'none'; style-src 'unsafe-inline'"
+    headers["X-Content-Type-Options"] = "nosniff"
+    return Response(content=data, media_type=CONTENT_TYPES[extension], headers=headers)
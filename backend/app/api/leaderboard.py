@@ -0,0 +1,11 @@
+# File: backend/app/api/leaderboard.py
+from fastapi import APIRouter, Query
+from app.services.hall_of_fame import hall_of_fame
+
+router = APIRouter()
+
+
+@router.get("/hall-of-fame", tags=["Leaderboard"], summary="Get Hall of Fame")
+async def get_hall_of_fame(limit: int = Query(10, ge=1, le=100)):
+    """The best single performances across every session this server has hosted."""
+    return {"status": "OK", "enabled": hall_of_fame.enabled, "performances": await hall_of_fame.top(limit)}
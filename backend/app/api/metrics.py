@@ -0,0 +1,35 @@
+# File: backend/app/api/metrics.py
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from app.services import metrics
+from app.services.embeddability import embeddability_checker
+from app.services.payload_json import payload_stats
+from app.services.search_cache import search_cache
+from app.services.search_executor import get_search_pool_stats
+from app.services.song_catalog import song_catalog
+from app.sockets.socket_server import sio
+from app.state import session_store
+
+router = APIRouter()
+
+
+async def collect_state():
+    metrics.active_sessions.set(await session_store.count())
+    metrics.connected_sockets.set(sum(1 for _ in sio.manager.get_participants("/", None)))
+
+    # Coalesced lookups were answered by someone else's in-flight fetch, so they count as hits.
+    metrics.record_cache("search", search_cache.hits + search_cache.coalesced, search_cache.misses)
+    metrics.record_cache("oembed", embeddability_checker.hits, embeddability_checker.misses)
+    metrics.record_cache("catalog", song_catalog.hits, song_catalog.misses)
+    metrics.record_cache("snapshot", payload_stats.snapshots_reused, payload_stats.snapshots_encoded)
+
+    for stat, value in get_search_pool_stats().items():
+        metrics.search_pool.set(value, stat=stat)
+
+
+metrics.registry.add_collector(collect_state)
+
+
+@router.get("/metrics", tags=["Debug"], summary="Prometheus Metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return PlainTextResponse(await metrics.registry.render(), media_type="text/plain; version=0.0.4")
@@ -1,6 +1,7 @@
 # File: backend/app/api/network.py
 import socket
 from fastapi import APIRouter
+from app.services.payload_json import payload_stats
 
 router = APIRouter()
 
@@ -9,3 +10,9 @@ def get_host_ip():
     hostname = socket.gethostname()
     ip = socket.gethostbyname(hostname)
     return {"host_ip": ip}
+
+
+@router.get("/payload-stats", tags=["Debug"])
+def get_payload_stats():
+    """Session snapshot serialization counters and the estimated permessage-deflate savings."""
+    return {"status": "OK", "data": payload_stats.to_dict()}
@@ -1,9 +1,20 @@
 # File: backend/app/api/session.py
-from fastapi import APIRouter, HTTPException
+import logging
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from app.services.session_code_utils import generate_session_code
-from app.sockets.socket_server import sio
-from app.state import SESSIONS
+from app.services import queue_batch, session_listing
+from app.services.avatar_store import AvatarError, avatar_store
+from app.services.fair_queue import FIFO
+from app.services.payload_json import encode
+from app.services.queue_batch import QueueBatchError, QueueBatchForbiddenError, QueueFullError
+from app.services.session_model import Session
+from app.services.session_limits import MAX_SESSIONS, over_limit
+from app.sockets.core import end_session
+from app.sockets.session_sync import bump_revision, emit_session_patch
+from app.state import session_store
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -34,87 +45,223 @@ class RestoreRequest(BaseModel):
     leaderboard: list[LeaderboardEntry]
     password: str | None = None
 
+class QueueSong(BaseModel):
+    song_id: str
+    title: str = ""
+    duration: str | None = None
+    added_by: str
+    thumbnails: list[str] = []
+
+class AddSongsRequest(BaseModel):
+    songs: list[QueueSong]
+
+# `host_token` is the secret returned by /create; with it any song may be removed and the queue reordered.
+class RemoveSongsRequest(BaseModel):
+    queue_ids: list[str]
+    user_id: str | None = None
+    host_token: str | None = None
+
+class QueueMove(BaseModel):
+    queue_id: str
+    before: str | None = None
+
+class ReorderQueueRequest(BaseModel):
+    moves: list[QueueMove]
+    host_token: str | None = None
+
 # --- End of Models ---
 
 
+async def apply_queue_batch(session_code: str, apply) -> dict:
+    """
+    Runs a batch edit (see `queue_batch`) under the session lock and broadcasts it
+    as one patch. `apply(session)` returns (patch event, patch payload).
+    """
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            raise HTTPException(status_code=404, detail="Session not found")
+        try:
+            patch_event, payload = apply(session)
+        except QueueFullError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except QueueBatchForbiddenError as e:
+            raise HTTPException(status_code=403, detail=str(e))
+        except QueueBatchError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await emit_session_patch(session_code, session, patch_event, payload)
+        return {"status": "OK", "revision": session.revision, **payload}
+
+
 @router.get("/ping", tags=["Health"], summary="Health Check")
 def ping():
     return { "status": "OK", "message": "pong" }
 
 @router.post("/create", tags=["Session"], summary="Create Session")
-def create_session(request: CreateSessionRequest):
-    code = generate_session_code()
-    SESSIONS[code] = {
-        "users": [],
-        "queue": [],
-        "leaderboard": [],
-        "settings": {
-            "showScore": True
-        },
-        "password": request.password,
-        # The new flag to track if the session is live
-        "is_started": False
-    }
-    print(f"Session created: {code} with password: {'set' if request.password else 'not set'}.")
-    return { "status": "OK", "session_code": code }
+async def create_session(request: CreateSessionRequest):
+    if over_limit(await session_store.count(), MAX_SESSIONS):
+        raise HTTPException(status_code=503, detail="The server is hosting too many sessions. Please try again later.")
+    # The store picks a code no live session uses, so a new party can never overwrite another.
+    host_token = Session.new_host_token()
+    code = await session_store.create(Session(password=request.password, host_token=host_token))
+    logger.info(f"Session created: {code} with password: {'set' if request.password else 'not set'}.")
+    # Only the creator ever sees the token; it authorizes host-only REST calls.
+    return { "status": "OK", "session_code": code, "host_token": host_token }
 
 @router.post("/restore", tags=["Session"], summary="Restore Session")
-def restore_session(data: RestoreRequest):
-    # When restoring, we preserve the 'is_started' state if it exists, otherwise default to False
-    SESSIONS[data.session_code] = {
-        "users": [user.dict() for user in data.users],
-        "queue": [entry.dict() for entry in data.queue],
-        "leaderboard": [entry.dict() for entry in data.leaderboard],
-        "password": data.password,
-        "is_started": SESSIONS.get(data.session_code, {}).get("is_started", False)
-    }
+async def restore_session(data: RestoreRequest):
+    # When restoring, we preserve the 'is_started' state and settings if they exist, otherwise defaults
+    users = [user.dict() for user in data.users]
+    for user in users:
+        # Hosts restoring from older local storage may still hold inline images.
+        try:
+            user["avatarBase64"] = await avatar_store.to_reference(user["avatarBase64"])
+        except AvatarError:
+            user["avatarBase64"] = "/Avatars/1.svg"
+    async with session_store.edit(data.session_code) as previous:
+        if previous is None and over_limit(await session_store.count(), MAX_SESSIONS):
+            raise HTTPException(status_code=503, detail="The server is hosting too many sessions. Please try again later.")
+        restored = Session.from_dict({
+            "users": users,
+            "queue": [entry.dict() for entry in data.queue],
+            "leaderboard": [entry.dict() for entry in data.leaderboard],
+            "password": data.password,
+            # Hosts don't send settings, so keep the ones the server still has.
+            "settings": previous.settings if previous else None,
+            "is_started": previous.is_started if previous else False,
+            "revision": previous.revision if previous else 0,
+            # A restore keeps the existing host token; one restored from scratch gets a new one.
+            "host_token": previous.host_token if previous else Session.new_host_token(),
+            # The client only knows the public state; what the server owns carries over.
+            "host_sid": previous.host_sid if previous else None,
+            "player": previous.player if previous else None,
+            "leaderboard_scored": previous.leaderboard.scored_list() if previous else (),
+            # Songs sung still count; turns are rebuilt over the restored queue below.
+            "scheduler": {"sung": previous.scheduler.sung} if previous else None,
+        })
+        if previous is not None:
+            restored.set_queue_mode(restored.settings.get("queueMode", FIFO))
+        # The state was replaced wholesale, so connected clients will see a gap on the next patch and resync.
+        bump_revision(restored)
+        if previous is None:
+            await session_store.save(data.session_code, restored)
+        else:
+            previous.replace_with(restored)
     return {
         "status": "OK",
         "message": f"Session '{data.session_code}' restored.",
-        "data": SESSIONS[data.session_code]
+        "data": restored.to_public_dict(),
+        **({} if previous else {"host_token": restored.host_token}),
     }
 
+@router.post("/{session_code}/queue/add", tags=["Queue"], summary="Add Songs")
+async def add_songs(session_code: str, request: AddSongsRequest):
+    def apply(session):
+        items, moves = queue_batch.add_songs(session, [song.dict() for song in request.songs])
+        return "queue_items_added", {"items": items, "moves": moves}
+
+    return await apply_queue_batch(session_code, apply)
+
+@router.post("/{session_code}/queue/remove", tags=["Queue"], summary="Remove Songs")
+async def remove_songs(session_code: str, request: RemoveSongsRequest):
+    def apply(session):
+        is_host = session.is_host_token(request.host_token)
+        queue_ids = queue_batch.remove_songs(session, request.queue_ids, request.user_id, is_host=is_host)
+        return "queue_items_removed", {"queue_ids": queue_ids}
+
+    return await apply_queue_batch(session_code, apply)
+
+@router.post("/{session_code}/queue/reorder", tags=["Queue"], summary="Reorder Queue")
+async def reorder_queue(session_code: str, request: ReorderQueueRequest):
+    def apply(session):
+        if not session.is_host_token(request.host_token):
+            raise QueueBatchForbiddenError("Only the host can reorder the queue.")
+        moves = queue_batch.move_songs(session, [move.dict() for move in request.moves])
+        return "queue_items_moved", {"moves": moves}
+
+    return await apply_queue_batch(session_code, apply)
+
 @router.get("/validate/{session_code}", tags=["Session"], summary="Validate Session Existence")
-def validate_session_existence(session_code: str):
+async def validate_session_existence(session_code: str):
     """
     Checks if a session code exists and if it requires a password.
     This helps the frontend decide whether to show a password input field.
     """
-    session = SESSIONS.get(session_code)
+    session = await session_store.get(session_code)
     is_valid = session is not None
     password_required = False
 
     if is_valid:
-        password_required = bool(session.get("password"))
+        password_required = bool(session.password)
 
     return { "status": "OK", "valid": is_valid, "password_required": password_required }
 
-@router.get("/all-sessions", tags=["Debug"], summary="[Debug] Get All Active Sessions")
-def get_all_sessions():
+@router.get("/all-sessions", tags=["Debug"], summary="[Debug] Get All Active Sessions", deprecated=True)
+async def get_all_sessions():
     """
-    Returns the entire SESSIONS dictionary from memory.
+    Returns every session in the session store, in one response. With many sessions
+    use `/list` (paginated) or `/export` (streamed) instead.
     """
-    # For security, we strip passwords from the debug output.
+    # For security, only what clients already see: no password, host socket id or token.
     sessions_without_passwords = {}
-    for code, data in SESSIONS.items():
-        session_copy = data.copy()
-        session_copy.pop("password", None) 
-        sessions_without_passwords[code] = session_copy
+    async for code, data in session_store.iter_sessions():
+        sessions_without_passwords[code] = data.to_public_dict()
 
     return {
         "status": "OK",
-        "sessions_count": len(SESSIONS),
+        "sessions_count": len(sessions_without_passwords),
         "data": sessions_without_passwords
     }
 
+def _check_listing_params(state: str | None, view: str):
+    if state is not None and state not in session_listing.STATES:
+        raise HTTPException(status_code=400, detail=f"state must be one of: {', '.join(session_listing.STATES)}")
+    if view not in session_listing.VIEWS:
+        raise HTTPException(status_code=400, detail=f"view must be one of: {', '.join(session_listing.VIEWS)}")
+
+
+@router.get("/list", tags=["Debug"], summary="[Debug] List Sessions")
+async def list_sessions(
+    cursor: str | None = Query(None, description="`next_cursor` from the previous page"),
+    limit: int = Query(50, ge=1, le=500, description="Sessions per page"),
+    state: str | None = Query(None, description="Only sessions that are started, idle or password-protected"),
+    view: str = Query("counts", description="full, compact (no users or queue) or counts"),
+):
+    """
+    Lists sessions a page at a time. Keep passing `next_cursor` back until it is null;
+    a page may hold fewer than `limit` sessions (even none) before the end when a
+    filter skips most of them. Passwords are never included.
+    """
+    _check_listing_params(state, view)
+    items, next_cursor = await session_listing.list_page(session_store, cursor, limit, state, view)
+    return {"status": "OK", "sessions": items, "next_cursor": next_cursor}
+
+
+@router.get("/export", tags=["Debug"], summary="[Debug] Export Sessions as NDJSON")
+async def export_sessions(
+    state: str | None = Query(None, description="Only sessions that are started, idle or password-protected"),
+    view: str = Query("full", description="full, compact (no users or queue) or counts"),
+):
+    """
+    Streams every session as newline-delimited JSON, one session per line, reading
+    the store a page at a time. Passwords are never included.
+    """
+    _check_listing_params(state, view)
+
+    async def lines():
+        async for item in session_listing.iter_listing(session_store, state, view):
+            yield encode(item) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.get("/{session_code}", tags=["Session"], summary="Get Session Details")
-def get_session_details(session_code: str):
-    if session_code not in SESSIONS:
+async def get_session_details(session_code: str):
+    session = await session_store.get(session_code)
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    # For security, don't expose password in the general details endpoint.
-    session_data = SESSIONS[session_code].copy()
-    session_data.pop("password", None)
+    # For security, don't expose the password, host socket id or host token in the general details endpoint.
+    session_data = session.to_public_dict()
 
     return {
         "status": "OK",
@@ -122,14 +269,27 @@ def get_session_details(session_code: str):
         "data": session_data
     }
 
+@router.get("/{session_code}/leaderboard", tags=["Leaderboard"], summary="Get Session Leaderboard")
+async def get_leaderboard(session_code: str, limit: int = Query(10, ge=1, le=100), user_id: str | None = None):
+    """
+    The session's top singers by total score, each with its rank, and optionally
+    where one user stands (null until they have sung).
+    """
+    session = await session_store.get(session_code)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    response = {"status": "OK", "singers": len(session.leaderboard), "top": session.leaderboard.top(limit)}
+    if user_id is not None:
+        response["rank"] = session.leaderboard.rank_of(user_id)
+    return response
+
 @router.delete("/{session_code}", tags=["Session"], summary="Delete a Session")
 async def delete_session(session_code: str):
-    if session_code not in SESSIONS:
+    if not await session_store.exists(session_code):
         raise HTTPException(status_code=404, detail="Session not found")
 
-    await sio.emit("session_deleted", {"message": "The host has ended the session."}, room=session_code)
-    SESSIONS.pop(session_code, None)
-    print(f"Session '{session_code}' has been deleted.")
+    await end_session(session_code, "The host has ended the session.")
+    logger.info(f"Session '{session_code}' has been deleted.")
     
     return {
         "status": "OK",
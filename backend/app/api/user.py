@@ -1,8 +1,10 @@
 # File: backend/app/api/user.py
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.state import SESSIONS
-from app.sockets.socket_server import sio 
+from app.state import session_store
+from app.services.avatar_store import AvatarError, AvatarTooLargeError, avatar_store
+from app.services.session_limits import MAX_USERS_PER_SESSION, over_limit
+from app.sockets.session_sync import emit_session_patch
 
 router = APIRouter()
 
@@ -15,15 +17,12 @@ class JoinRequest(BaseModel):
     password: str | None = None # NEW: The password provided by the user trying to join.
 
 
-@router.post("/join", tags=["User"], summary="Join Session")
-async def join_session(user: JoinRequest):  
-    code = user.session_code
-
-    if code not in SESSIONS:
+def check_can_join(session, user: JoinRequest):
+    if session is None:
         raise HTTPException(status_code=404, detail="Session not found")
 
     # --- NEW: Password Validation Logic ---
-    session_password = SESSIONS[code].get("password")
+    session_password = session.password
 
     # Case 1: The session is password-protected.
     if session_password:
@@ -31,31 +30,54 @@ async def join_session(user: JoinRequest):
         if user.password != session_password:
             # If passwords do not match, reject the request with 403 Forbidden.
             raise HTTPException(status_code=403, detail="Invalid password for this session.")
-            
+
     # Case 2: The session is not password-protected (session_password is None or empty).
     # The request is allowed to proceed without a password check.
     # --- END: Password Validation Logic ---
 
-    existing = [u for u in SESSIONS[code]["users"] if u["id"] == user.id]
-    if existing:
-        return {
-            "status": "OK",
-            "message": "User already joined.",
-            "user": existing[0]
+
+@router.post("/join", tags=["User"], summary="Join Session")
+async def join_session(user: JoinRequest):  
+    code = user.session_code
+
+    # Checked before the avatar is stored, so a failed join never writes a file.
+    check_can_join(await session_store.get(code), user)
+
+    # Inline images are stored once and replaced by a short reference, so the
+    # session payload every client receives doesn't carry the image itself.
+    try:
+        avatar = await avatar_store.to_reference(user.avatarBase64)
+    except AvatarTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except AvatarError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async with session_store.edit(code) as session:
+        # Again under the lock: the session may have ended while the avatar was stored.
+        check_can_join(session, user)
+
+        existing = session.users.get(user.id)
+        if existing:
+            return {
+                "status": "OK",
+                "message": "User already joined.",
+                "user": existing
+            }
+
+        if over_limit(len(session.users), MAX_USERS_PER_SESSION):
+            raise HTTPException(status_code=403, detail="This session is full.")
+
+        user_entry = {
+            "id": user.id,
+            "name": user.name,
+            "avatarBase64": avatar or "/Avatars/1.svg"
         }
+        session.add_user(user_entry)
+
+        await emit_session_patch(code, session, "user_joined", {"user": user_entry})
 
-    user_entry = {
-        "id": user.id,
-        "name": user.name,
-        "avatarBase64": user.avatarBase64 or "/Avatars/1.svg"
-    }
-    SESSIONS[code]["users"].append(user_entry)
-
-    await sio.emit("join_remote", user_entry, room=code)
-    await sio.emit("session_updated", SESSIONS[code], room=code)
-
-    return {
-        "status": "OK",
-        "message": "User added.",
-        "user": user_entry
-    }
\ No newline at end of file
+        return {
+            "status": "OK",
+            "message": "User added.",
+            "user": user_entry
+        }
\ No newline at end of file
@@ -1,37 +1,21 @@
 # backend/app/api/youtube.py
 
-from fastapi import APIRouter, Query
-import httpx
-import asyncio
+from fastapi import APIRouter, HTTPException, Query
 import logging
-import time
-from youtube_search import YoutubeSearch
+from app.services.embeddability import embeddability_checker
+from app.services.search_cache import search_cache
+from app.services.search_executor import (
+    SearchOverloadedError,
+    SearchTimeoutError,
+    get_search_pool_stats,
+)
+from app.services.song_catalog import song_catalog
+from app.services.song_search import find_songs
+from app.services.suggestions import suggestion_index
 
 router = APIRouter()
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-EMBEDDABILITY_CACHE = {}
-CACHE_TTL_SECONDS = 86400
-
-async def is_embeddable(video_id: str) -> bool:
-    current_time = time.time()
-    if video_id in EMBEDDABILITY_CACHE:
-        is_embeddable_flag, cached_time = EMBEDDABILITY_CACHE[video_id]
-        if (current_time - cached_time) < CACHE_TTL_SECONDS:
-            return is_embeddable_flag
-    oembed_url = "https://www.youtube.com/oembed"
-    params = {"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"}
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(oembed_url, params=params, timeout=5.0)
-            is_ok = response.status_code == 200
-            EMBEDDABILITY_CACHE[video_id] = (is_ok, current_time)
-            return is_ok
-        except httpx.RequestError:
-            EMBEDDABILITY_CACHE[video_id] = (False, current_time)
-            return False
-
 # --- THIS IS THE FIX ---
 # The endpoint now accepts a 'page' parameter to support pagination.
 @router.get(
@@ -45,23 +29,12 @@ async def search_youtube(
     limit: int = Query(10, ge=5, le=20, description="Items per page"),
     page: int = Query(1, ge=1, description="Page number to retrieve")
 ):
+    if page == 1:
+        suggestion_index.record_query(q)
     try:
-        enhanced_query = f"{q}"
-        
         # To support pagination, we need to fetch more results upfront.
-        # youtube-search doesn't have a 'page' param, so we simulate it.
-        # Fetching 50 gives us a good pool to serve several pages from.
-        results_raw = YoutubeSearch(enhanced_query, max_results=50).to_dict()
-
-        if not results_raw:
-            return {"status": "OK", "query": q, "results": [], "has_more": False}
-
-        tasks = [is_embeddable(video.get("id")) for video in results_raw if video.get("id")]
-        embeddability_results = await asyncio.gather(*tasks)
-
-        all_embeddable_videos = [
-            video for video, is_embeddable_flag in zip(results_raw, embeddability_results) if is_embeddable_flag
-        ]
+        # The filtered list is cached per query, so pages 2..N are served from memory.
+        all_embeddable_videos = await search_cache.get_or_fetch(q, lambda: find_songs(q))
 
         # Calculate the slice for the requested page.
         start_index = (page - 1) * limit
@@ -78,6 +51,58 @@ async def search_youtube(
             "has_more": has_more  # Explicitly tell the frontend if there are more.
         }
 
+    except SearchOverloadedError:
+        logger.warning(f"Search pool is saturated, rejecting query '{q}'")
+        raise HTTPException(
+            status_code=503,
+            detail="Search is busy right now. Please try again in a moment.",
+            headers={"Retry-After": "2"},
+        )
+    except SearchTimeoutError:
+        logger.warning(f"YouTube search timed out for query '{q}'")
+        raise HTTPException(status_code=504, detail="YouTube took too long to respond. Please try again.")
     except Exception as e:
         logger.error(f"An unexpected error occurred during YouTube search for query '{q}': {e}")
-        return {"status": "error", "message": "An error occurred while searching. Please try again."}
\ No newline at end of file
+        return {"status": "error", "message": "An error occurred while searching. Please try again."}
+
+@router.get("/suggest", tags=["YouTube"], summary="Search Suggestions")
+async def suggest_songs(
+    q: str = Query(..., min_length=1, description="What the user has typed so far"),
+    limit: int = Query(8, ge=1, le=20, description="Suggestions to return"),
+):
+    """
+    Typeahead from an in-memory index of past searches and song titles, most popular
+    first. Never touches YouTube.
+    """
+    return {"status": "OK", "query": q, "suggestions": suggestion_index.suggest(q, limit)}
+
+@router.get("/search-pool", tags=["Debug"], summary="[Debug] Search Worker Pool Stats")
+def search_pool_stats():
+    """
+    Reports the search pool's queue depth, wait times and rejection counts.
+    """
+    return {"status": "OK", "data": get_search_pool_stats()}
+
+
+@router.get("/search-cache", tags=["Debug"], summary="[Debug] Search Result Cache Stats")
+def search_cache_stats():
+    """
+    Reports the search result cache's size, hit rate and in-flight fetches.
+    """
+    return {"status": "OK", "data": search_cache.stats()}
+
+
+@router.get("/embed-cache", tags=["Debug"], summary="[Debug] Embeddability Cache Stats")
+def embed_cache_stats():
+    """
+    Reports the oEmbed embeddability cache's size, hit rate and probe errors.
+    """
+    return {"status": "OK", "data": embeddability_checker.stats()}
+
+
+@router.get("/catalog", tags=["Debug"], summary="[Debug] Local Song Catalog Stats")
+async def song_catalog_stats():
+    """
+    Reports how many songs the local catalog holds and how often it answers searches.
+    """
+    return {"status": "OK", "data": await song_catalog.stats()}
@@ -4,20 +4,62 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-from fastapi import FastAPI
+from .services.logging_setup import configure_logging, shutdown_logging
+
+# Before anything else is imported, so module-level log lines go through it too.
+configure_logging()
+
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware # <--- RE-IMPORT THIS
 from socketio import ASGIApp
 from .api.youtube import router as youtube_router
 from .api.session import router as session_router
 from .api.user import router as user_router
 from .api.network import router as network_router
+from .api.avatar import router as avatar_router
+from .api.metrics import router as metrics_router
+from .api.leaderboard import router as leaderboard_router
 from .sockets.socket_server import sio
+from .sockets.session_sync import patch_coalescer
+from .sockets.session_reaper import session_reaper
+from .services.embeddability import embeddability_checker
+from .services.song_catalog import song_catalog
+from .services.hall_of_fame import hall_of_fame
+from .services.suggestions import suggestion_index
+from .services.metrics import http_request_duration
+from .services.search_executor import shutdown_search_executor
+from .state import session_snapshotter, session_store
 
 
 origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sessions are back in the store before the first request or socket is served.
+    await session_snapshotter.start()
+    await embeddability_checker.start()
+    await song_catalog.start()
+    await hall_of_fame.start()
+    await suggestion_index.seed()
+    suggestion_index.start()
+    session_reaper.start()
+    yield
+    await session_reaper.close()
+    await suggestion_index.close()
+    await patch_coalescer.flush_all()
+    await session_snapshotter.close()
+    await embeddability_checker.close()
+    await song_catalog.close()
+    await hall_of_fame.close()
+    shutdown_search_executor()
+    await session_store.close()
+    shutdown_logging()
+
+
 # Main FastAPI app
-fastapi_app = FastAPI()
+fastapi_app = FastAPI(lifespan=lifespan)
 
 
 fastapi_app.add_middleware(
@@ -29,11 +71,39 @@ fastapi_app.add_middleware(
 )
 # ------------------------------------
 
+
+@fastapi_app.middleware("http")
+async def record_request_duration(request: Request, call_next):
+    started = time.perf_counter()
+    response = await call_next(request)
+    http_request_duration.observe(
+        time.perf_counter() - started,
+        method=request.method,
+        route=route_template(request),
+        status=response.status_code,
+    )
+    return response
+
+
+def route_template(request: Request) -> str:
+    """
+    The matched route with its path parameters put back (e.g. /api/session/{session_code}),
+    so metric labels don't grow with every session code.
+    """
+    if request.scope.get("route") is None:
+        return "unmatched"
+    segments = request.url.path.split("/")
+    names = {str(value): name for name, value in request.path_params.items()}
+    return "/".join(f"{{{names[segment]}}}" if segment in names else segment for segment in segments)
+
 # Register API routes (this is unchanged)
 fastapi_app.include_router(youtube_router, prefix="/api/youtube")
 fastapi_app.include_router(session_router, prefix="/api/session")
 fastapi_app.include_router(user_router, prefix="/api/user")
 fastapi_app.include_router(network_router, prefix="/api/debug")
+fastapi_app.include_router(avatar_router, prefix="/api/avatar")
+fastapi_app.include_router(leaderboard_router, prefix="/api/leaderboard")
+fastapi_app.include_router(metrics_router)
 
 # Socket.IO app (ASGI compatible)
 # The `sio` object already has its own CORS config for /socket.io/ routes
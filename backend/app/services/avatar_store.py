@@ -0,0 +1,163 @@
+# backend/app/services/avatar_store.py
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+import re
+
+try:
+    from PIL import Image
+except ImportError:  # Downscaling is skipped without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+# Directory holding uploaded avatars, one file per distinct image.
+AVATAR_DIR = os.getenv("AVATAR_DIR", "avatars")
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", str(512 * 1024)))
+# Raster avatars larger than this (in pixels, either side) are downscaled when Pillow is installed.
+AVATAR_MAX_DIMENSION = int(os.getenv("AVATAR_MAX_DIMENSION", "256"))
+
+AVATAR_URL_PREFIX = "/api/avatar/"
+
+CONTENT_TYPES = {
+    "png": "image/png",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+}
+PIL_FORMATS = {"png": "PNG", "jpg": "JPEG", "gif": "GIF", "webp": "WEBP"}
+
+AVATAR_ID_PATTERN = re.compile(r"^[0-9a-f]{32}\.(png|jpg|gif|webp|svg)$")
+# Avatars bundled with the frontend, e.g. /Avatars/12.svg.
+BUNDLED_AVATAR_PATTERN = re.compile(r"^/Avatars/[\w-]{1,64}\.svg$")
+DATA_URL_PATTERN = re.compile(r"^data:image/[\w.+-]+;base64,(.*)$", re.DOTALL)
+
+
+class AvatarError(ValueError):
+    """The upload isn't an image we accept."""
+
+
+class AvatarTooLargeError(AvatarError):
+    pass
+
+
+def sniff_extension(data: bytes) -> str | None:
+    """Works out the image type from its leading bytes instead of trusting the client."""
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if data.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    head = data[:1024].lstrip().lower()
+    if head.startswith((b"<svg", b"<?xml")) and b"<svg" in head:
+        return "svg"
+    return None
+
+
+def is_avatar_reference(value: str | None) -> bool:
+    return bool(value) and value.startswith(AVATAR_URL_PREFIX) and bool(AVATAR_ID_PATTERN.match(value[len(AVATAR_URL_PREFIX):]))
+
+
+class AvatarStore:
+    """
+    Content-addressed avatar storage.
+
+    Each image is stored once under the hash of its uploaded bytes, so the same
+    avatar uploaded by many users (or re-sent on every join) costs one file, and
+    its URL never changes meaning — clients and proxies may cache it forever.
+    Session payloads carry only the short `/api/avatar/<id>` reference.
+    """
+
+    def __init__(self, directory: str = AVATAR_DIR):
+        self.directory = directory
+        self._ensured_directory = False
+
+    def _path(self, avatar_id: str) -> str:
+        return os.path.join(self.directory, avatar_id)
+
+    def _write(self, avatar_id: str, data: bytes):
+        if not self._ensured_directory:
+            os.makedirs(self.directory, exist_ok=True)
+            self._ensured_directory = True
+        path = self._path(avatar_id)
+        if os.path.exists(path):
+            return
+        # Write then rename, so a concurrent reader never sees a half-written file.
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _downscale(self, data: bytes, extension: str) -> bytes:
+        if Image is None or extension not in PIL_FORMATS:
+            return data
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                if max(image.size) <= AVATAR_MAX_DIMENSION or getattr(image, "is_animated", False):
+                    return data
+                image.thumbnail((AVATAR_MAX_DIMENSION, AVATAR_MAX_DIMENSION))
+                if extension == "jpg" and image.mode not in ("RGB", "L"):
+                    image = image.convert("RGB")
+                output = io.BytesIO()
+                image.save(output, format=PIL_FORMATS[extension], optimize=True)
+                return output.getvalue()
+        except Exception as e:
+            raise AvatarError(f"Could not read the image: {e}")
+
+    def _store(self, data: bytes) -> str:
+        if len(data) > AVATAR_MAX_BYTES:
+            raise AvatarTooLargeError(f"Avatar is larger than {AVATAR_MAX_BYTES} bytes.")
+        extension = sniff_extension(data)
+        if extension is None:
+            raise AvatarError("Avatar must be a PNG, JPEG, GIF, WebP or SVG image.")
+        avatar_id = f"{hashlib.sha256(data).hexdigest()[:32]}.{extension}"
+        if not os.path.exists(self._path(avatar_id)):
+            self._write(avatar_id, self._downscale(data, extension))
+        return avatar_id
+
+    async def store(self, data: bytes) -> str:
+        """Stores the image (once) and returns its id."""
+        return await asyncio.to_thread(self._store, data)
+
+    async def load(self, avatar_id: str) -> bytes | None:
+        if not AVATAR_ID_PATTERN.match(avatar_id):
+            return None
+        try:
+            return await asyncio.to_thread(self._read, avatar_id)
+        except FileNotFoundError:
+            return None
+
+    def _read(self, avatar_id: str) -> bytes:
+        with open(self._path(avatar_id), "rb") as f:
+            return f.read()
+
+    async def to_reference(self, avatar: str | None) -> str | None:
+        """
+        Turns an inline `data:image/...;base64,` avatar into a short stored reference.
+        Bundled `/Avatars/*.svg` paths and existing references pass through; anything
+        else is refused, so no avatar can grow the payloads every client receives.
+        """
+        if not avatar or BUNDLED_AVATAR_PATTERN.match(avatar) or is_avatar_reference(avatar):
+            return avatar
+        match = DATA_URL_PATTERN.match(avatar)
+        if match is None:
+            raise AvatarError("Avatar must be a bundled avatar, an uploaded avatar or a base64 image data URL.")
+        # Base64 is 4/3 of the raw size; refuse oversized payloads before decoding them.
+        if len(match.group(1)) > AVATAR_MAX_BYTES * 4 // 3 + 4:
+            raise AvatarTooLargeError(f"Avatar is larger than {AVATAR_MAX_BYTES} bytes.")
+        try:
+            data = base64.b64decode(match.group(1), validate=True)
+        except (binascii.Error, ValueError):
+            raise AvatarError("Avatar data URL is not valid base64.")
+        return AVATAR_URL_PREFIX + await self.store(data)
+
+
+avatar_store = AvatarStore()
@@ -0,0 +1,185 @@
+# backend/app/services/embeddability.py
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+import aiosqlite
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OEMBED_URL = "https://www.youtube.com/oembed"
+OEMBED_CONCURRENCY = int(os.getenv("OEMBED_CONCURRENCY", "8"))
+OEMBED_TIMEOUT_SECONDS = float(os.getenv("OEMBED_TIMEOUT_SECONDS", "5"))
+EMBED_CACHE_SIZE = int(os.getenv("EMBED_CACHE_SIZE", "20000"))
+EMBED_CACHE_TTL_SECONDS = float(os.getenv("EMBED_CACHE_TTL_SECONDS", "86400"))
+# Timeouts, throttling and server errors say nothing about the video itself,
+# so they are only remembered briefly.
+EMBED_ERROR_TTL_SECONDS = float(os.getenv("EMBED_ERROR_TTL_SECONDS", "60"))
+# Path of an SQLite file that keeps definitive answers across restarts. Empty disables it.
+EMBED_CACHE_DB = os.getenv("EMBED_CACHE_DB", "")
+EMBED_CACHE_FLUSH_SECONDS = float(os.getenv("EMBED_CACHE_FLUSH_SECONDS", "5"))
+
+# oEmbed answers 401/403 for videos with embedding disabled and 404 for missing ones.
+DEFINITIVE_NOT_EMBEDDABLE = {401, 403, 404}
+
+
+class EmbeddabilityChecker:
+    """
+    Answers "can this video be embedded?" through YouTube's oEmbed endpoint.
+
+    Uses one keep-alive HTTP client for every probe, caps concurrent probes with a
+    semaphore, and keeps answers in a bounded LRU cache that can be backed by SQLite.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        self._semaphore = asyncio.Semaphore(OEMBED_CONCURRENCY)
+        # video_id -> (is_embeddable, expires_at)
+        self._cache: OrderedDict[str, tuple[bool, float]] = OrderedDict()
+        self._db: aiosqlite.Connection | None = None
+        self._pending_writes: dict[str, tuple[bool, float]] = {}
+        self._flush_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    async def start(self):
+        self._ensure_client()
+        if EMBED_CACHE_DB:
+            self._db = await aiosqlite.connect(EMBED_CACHE_DB)
+            await self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddability ("
+                "video_id TEXT PRIMARY KEY, embeddable INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            await self._db.commit()
+            await self._warm_from_db()
+            self._flush_task = asyncio.create_task(self._flush_periodically())
+
+    async def close(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._db:
+            await self.flush()
+            await self._db.close()
+            self._db = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    async def is_embeddable(self, video_id: str) -> bool:
+        cached = self._get_cached(video_id)
+        if cached is None and self._db:
+            cached = await self._get_from_db(video_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        async with self._semaphore:
+            is_ok, definitive = await self._probe(video_id)
+        if definitive:
+            expires_at = time.time() + EMBED_CACHE_TTL_SECONDS
+            if self._db:
+                self._pending_writes[video_id] = (is_ok, expires_at)
+        else:
+            expires_at = time.time() + EMBED_ERROR_TTL_SECONDS
+        self._remember(video_id, is_ok, expires_at)
+        return is_ok
+
+    def _ensure_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=OEMBED_TIMEOUT_SECONDS,
+                limits=httpx.Limits(max_connections=OEMBED_CONCURRENCY, max_keepalive_connections=OEMBED_CONCURRENCY),
+            )
+        return self._client
+
+    async def _probe(self, video_id: str) -> tuple[bool, bool]:
+        """Returns (is_embeddable, whether the answer is about the video rather than a transient failure)."""
+        params = {"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"}
+        try:
+            response = await self._ensure_client().get(OEMBED_URL, params=params)
+        except httpx.RequestError:
+            self.errors += 1
+            return False, False
+        if response.status_code == 200:
+            return True, True
+        if response.status_code in DEFINITIVE_NOT_EMBEDDABLE:
+            return False, True
+        self.errors += 1
+        return False, False
+
+    def _get_cached(self, video_id: str) -> bool | None:
+        entry = self._cache.get(video_id)
+        if entry is None:
+            return None
+        is_ok, expires_at = entry
+        if expires_at <= time.time():
+            del self._cache[video_id]
+            return None
+        self._cache.move_to_end(video_id)
+        return is_ok
+
+    def _remember(self, video_id: str, is_ok: bool, expires_at: float):
+        self._cache[video_id] = (is_ok, expires_at)
+        self._cache.move_to_end(video_id)
+        while len(self._cache) > EMBED_CACHE_SIZE:
+            self._cache.popitem(last=False)
+
+    async def _warm_from_db(self):
+        # The freshest rows are loaded last so they end up as the most recently used.
+        async with self._db.execute(
+            "SELECT * FROM (SELECT video_id, embeddable, expires_at FROM embeddability "
+            "WHERE expires_at > ? ORDER BY expires_at DESC LIMIT ?) ORDER BY expires_at",
+            (time.time(), EMBED_CACHE_SIZE),
+        ) as cursor:
+            async for video_id, embeddable, expires_at in cursor:
+                self._remember(video_id, bool(embeddable), expires_at)
+        logger.info(f"Loaded {len(self._cache)} embeddability entries from {EMBED_CACHE_DB}")
+
+    async def _get_from_db(self, video_id: str) -> bool | None:
+        async with self._db.execute(
+            "SELECT embeddable, expires_at FROM embeddability WHERE video_id = ?", (video_id,)
+        ) as cursor:
+            row = await cursor.fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        self._remember(video_id, bool(row[0]), row[1])
+        return bool(row[0])
+
+    async def flush(self):
+        """Writes the definitive answers gathered since the last flush to SQLite in one transaction."""
+        if not self._db or not self._pending_writes:
+            return
+        rows = [(video_id, int(is_ok), expires_at) for video_id, (is_ok, expires_at) in self._pending_writes.items()]
+        self._pending_writes.clear()
+        await self._db.executemany("INSERT OR REPLACE INTO embeddability VALUES (?, ?, ?)", rows)
+        await self._db.execute("DELETE FROM embeddability WHERE expires_at <= ?", (time.time(),))
+        await self._db.commit()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(EMBED_CACHE_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to persist embeddability cache: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._cache),
+            "max_entries": EMBED_CACHE_SIZE,
+            "concurrency": OEMBED_CONCURRENCY,
+            "persistent": bool(EMBED_CACHE_DB),
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+embeddability_checker = EmbeddabilityChecker()
@@ -0,0 +1,163 @@
+# backend/app/services/fair_queue.py
+import bisect
+import os
+
+# Queue modes, picked per session through the `queueMode` setting.
+FIFO = "fifo"
+FAIR = "fair"
+# Like FAIR, but people who have already sung more start further back.
+FAIR_WEIGHTED = "fair_weighted"
+QUEUE_MODES = (FIFO, FAIR, FAIR_WEIGHTED)
+
+# Rounds a singer is pushed back per song they have already sung, in FAIR_WEIGHTED mode.
+FAIR_SUNG_WEIGHT = float(os.getenv("FAIR_SUNG_WEIGHT", "0.5"))
+
+
+class FairScheduler:
+    """
+    Round-robin order for the song queue by `added_by`, as start-time fair queuing.
+
+    Every entry gets a tag when it is queued: the round after its singer's previous
+    entry, and never earlier than the round now playing. The queue is kept sorted
+    by (tag, arrival), so a singer with fifteen songs gets one per round while
+    newcomers slot in at the next round. Tags don't change afterwards, so adding or
+    removing a song never reorders the others. Finding where a song goes is a binary
+    search over the sorted tags.
+
+    Songs sung are counted in every mode; tags are only kept while a fair mode is on.
+    """
+
+    def __init__(self, sung: dict[str, int] | None = None):
+        # user_id -> songs of theirs that reached the front of the queue and left it
+        self.sung: dict[str, int] = dict(sung or {})
+        self.mode = FIFO
+        # queue_id -> (tag, arrival); _order holds the same as sorted (tag, arrival, queue_id).
+        self._keys: dict[str, tuple[float, int]] = {}
+        self._order: list[tuple[float, int, str]] = []
+        # user_id -> round their next entry may start in
+        self._next_round: dict[str, float] = {}
+        # Tag of the last entry to leave the front of the queue.
+        self._virtual_time = 0.0
+        self._arrivals = 0
+
+    @property
+    def active(self) -> bool:
+        return self.mode != FIFO
+
+    def _tag_for(self, user_id: str) -> float:
+        start = self._virtual_time
+        if self.mode == FAIR_WEIGHTED:
+            start += FAIR_SUNG_WEIGHT * self.sung.get(user_id, 0)
+        tag = max(start, self._next_round.get(user_id, start))
+        self._next_round[user_id] = tag + 1
+        return tag
+
+    def _insert(self, queue_id: str, tag: float) -> int:
+        self._arrivals += 1
+        key = (tag, self._arrivals)
+        self._keys[queue_id] = key
+        index = bisect.bisect_right(self._order, (*key, queue_id))
+        self._order.insert(index, (*key, queue_id))
+        return index
+
+    def place(self, entry: dict) -> str | None:
+        """
+        Schedules a new entry. Returns the queue_id it goes in front of, or None
+        for the end of the queue. The entry playing at the front is never displaced.
+        """
+        if not self.active:
+            return None
+        index = self._insert(entry["queue_id"], self._tag_for(entry.get("added_by")))
+        if index == 0 and len(self._order) > 1:
+            # Re-key it just behind the playing song.
+            del self._order[0]
+            index = self._rekey(entry["queue_id"], 1)
+        return self._order[index + 1][2] if index + 1 < len(self._order) else None
+
+    def _rekey(self, queue_id: str, index: int) -> int:
+        """Gives an entry (not in `_order`) a key sorting just in front of `_order[index]`."""
+        if index >= len(self._order):
+            last_tag = self._order[-1][0] if self._order else self._virtual_time
+            key = (last_tag + 1, 0)
+        else:
+            next_key = self._order[index][:2]
+            prev_key = self._order[index - 1][:2] if index > 0 else (next_key[0] - 1, next_key[1])
+            # Halfway between its new neighbours: between their tags, or their arrivals on a tie.
+            if prev_key[0] < next_key[0]:
+                key = ((prev_key[0] + next_key[0]) / 2, 0)
+            else:
+                key = (prev_key[0], (prev_key[1] + next_key[1]) / 2)
+        self._keys[queue_id] = key
+        self._order.insert(index, (*key, queue_id))
+        return index
+
+    def removed(self, entry: dict, was_playing: bool):
+        """
+        Forgets an entry. One that was played counts as sung for its singer; withdrawing
+        a singer's latest song gives its round back to their next one.
+        """
+        user_id = entry.get("added_by")
+        if was_playing:
+            self.sung[user_id] = self.sung.get(user_id, 0) + 1
+        key = self._keys.pop(entry["queue_id"], None)
+        if key is None:
+            return
+        index = bisect.bisect_left(self._order, (*key, entry["queue_id"]))
+        del self._order[index]
+        if was_playing:
+            self._virtual_time = max(self._virtual_time, key[0])
+        elif self._next_round.get(user_id) == key[0] + 1:
+            self._next_round[user_id] = key[0]
+
+    def moved(self, queue_id: str, before: str | None):
+        """Re-keys an entry the host moved by hand so it sorts where it was put."""
+        if queue_id == before or queue_id not in self._keys:
+            return
+        key = self._keys.pop(queue_id)
+        del self._order[bisect.bisect_left(self._order, (*key, queue_id))]
+        if before is None:
+            self._rekey(queue_id, len(self._order))
+        else:
+            self._rekey(queue_id, bisect.bisect_left(self._order, (*self._keys[before], before)))
+
+    def set_mode(self, mode: str, queue) -> list[str]:
+        """
+        Switches modes. Turning a fair mode on schedules the waiting songs as if they
+        had been queued in their current order; returns the resulting queue order.
+        """
+        self.mode = mode
+        self._keys, self._order, self._next_round = {}, [], {}
+        if not self.active:
+            return [entry["queue_id"] for entry in queue]
+        entries = list(queue)
+        if entries:
+            # The song at the front keeps playing; the rest are rotated behind it.
+            self._virtual_time = 0.0
+            self._tag_for(entries[0].get("added_by"))
+            self._insert(entries[0]["queue_id"], self._virtual_time)
+            for entry in entries[1:]:
+                self._insert(entry["queue_id"], self._tag_for(entry.get("added_by")))
+        return [queue_id for _, _, queue_id in self._order]
+
+    def to_dict(self) -> dict:
+        data = {"sung": self.sung, "mode": self.mode}
+        if self.active:
+            data.update({
+                "keys": {queue_id: list(key) for queue_id, key in self._keys.items()},
+                "next_round": self._next_round,
+                "virtual_time": self._virtual_time,
+                "arrivals": self._arrivals,
+            })
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "FairScheduler":
+        data = data or {}
+        scheduler = cls(sung=data.get("sung"))
+        scheduler.mode = data.get("mode", FIFO)
+        scheduler._keys = {queue_id: tuple(key) for queue_id, key in data.get("keys", {}).items()}
+        scheduler._order = sorted((*key, queue_id) for queue_id, key in scheduler._keys.items())
+        scheduler._next_round = dict(data.get("next_round", {}))
+        scheduler._virtual_time = data.get("virtual_time", 0.0)
+        scheduler._arrivals = data.get("arrivals", 0)
+        return scheduler
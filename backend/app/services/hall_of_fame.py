@@ -0,0 +1,89 @@
+# backend/app/services/hall_of_fame.py
+import logging
+import os
+import time
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# SQLite file with the best performances across every session. Empty disables it.
+HALL_OF_FAME_DB = os.getenv("HALL_OF_FAME_DB", "hall_of_fame.sqlite3")
+# Performances kept; the lowest scores are dropped beyond this.
+HALL_OF_FAME_MAX_ROWS = int(os.getenv("HALL_OF_FAME_MAX_ROWS", "10000"))
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS performances ("
+    "id INTEGER PRIMARY KEY, session_code TEXT NOT NULL, user_name TEXT NOT NULL, "
+    "song_id TEXT NOT NULL, title TEXT NOT NULL, score INTEGER NOT NULL, sung_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS performances_score ON performances (score DESC, sung_at)",
+)
+
+
+class HallOfFame:
+    """
+    Best performances across all sessions on this server, in a local SQLite table.
+
+    Sessions end and their leaderboards with them; the performances recorded here
+    stay. Reads are served by the score index, and the table is trimmed to the best
+    HALL_OF_FAME_MAX_ROWS as it grows.
+    """
+
+    def __init__(self, path: str = HALL_OF_FAME_DB):
+        self.path = path
+        self._db: aiosqlite.Connection | None = None
+        self._inserts = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    async def start(self):
+        if not self.path:
+            return
+        self._db = await aiosqlite.connect(self.path)
+        for statement in SCHEMA:
+            await self._db.execute(statement)
+        await self._db.commit()
+
+    async def close(self):
+        if self._db:
+            await self._db.close()
+            self._db = None
+
+    async def add(self, session_code: str, user_name: str, song: dict, score: int):
+        if not self._db:
+            return
+        try:
+            await self._db.execute(
+                "INSERT INTO performances (session_code, user_name, song_id, title, score, sung_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (session_code, user_name, song.get("song_id") or "", song.get("title") or "", score, time.time()),
+            )
+            self._inserts += 1
+            # Trimming scans the index, so only do it every so often.
+            if self._inserts % 100 == 0:
+                await self._db.execute(
+                    "DELETE FROM performances WHERE id IN "
+                    "(SELECT id FROM performances ORDER BY score DESC, sung_at LIMIT -1 OFFSET ?)",
+                    (HALL_OF_FAME_MAX_ROWS,),
+                )
+            await self._db.commit()
+        except Exception as e:
+            logger.error(f"Failed to record a performance in the hall of fame: {e}")
+
+    async def top(self, limit: int) -> list[dict]:
+        if not self._db:
+            return []
+        async with self._db.execute(
+            "SELECT user_name, title, song_id, score, session_code, sung_at FROM performances "
+            "ORDER BY score DESC, sung_at LIMIT ?",
+            (limit,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+        return [
+            {"name": name, "title": title, "song_id": song_id, "score": score, "session_code": code, "sung_at": sung_at}
+            for name, title, song_id, score, code, sung_at in rows
+        ]
+
+
+hall_of_fame = HallOfFame()
@@ -0,0 +1,119 @@
+# backend/app/services/leaderboard.py
+import bisect
+import random
+from collections import OrderedDict
+
+# Scored queue ids remembered per session, so a repeated `song_finished` isn't counted twice.
+RECENT_PERFORMANCES = 64
+
+
+def draw_score() -> int:
+    """
+    The score for a performance, 1-100. Mostly middling, with the odd perfect run;
+    drawn on the server so every screen shows the same number.
+    """
+    roll = random.random() * 100
+    if roll <= 20:
+        return random.randint(1, 20)
+    if roll <= 50:
+        return random.randint(21, 50)
+    if roll <= 90:
+        return random.randint(51, 79)
+    return random.randint(91, 100)
+
+
+class Leaderboard:
+    """
+    A session's standings: every singer's total score over their performances.
+
+    Entries are kept in a list sorted by (-score, when that score was reached), so
+    the top K is a slice and a singer's rank is one binary search. Recording a score
+    only moves that singer up, and returns just the entries whose rank or score
+    changed, which is what the room is sent.
+    """
+
+    def __init__(self, entries=(), scored=()):
+        # user_id -> {"id", "name", "score", "performances"}
+        self._entries: dict[str, dict] = {}
+        # user_id -> (-score, sequence); _order holds the same as sorted (-score, sequence, user_id).
+        self._keys: dict[str, tuple[int, int]] = {}
+        self._order: list[tuple[int, int, str]] = []
+        self._sequence = 0
+        # queue_id -> score, for the last few performances, oldest first. Saved with the
+        # session (see `scored_list`) so a replayed `song_finished` isn't counted twice
+        # after the session is reloaded from Redis or a snapshot.
+        self._scored: OrderedDict[str, int] = OrderedDict(
+            (queue_id, score) for queue_id, score in scored
+        )
+        # Entries come in rank order, so earlier ones keep winning ties.
+        for entry in entries:
+            self._entries[entry["id"]] = {
+                "id": entry["id"],
+                "name": entry.get("name", ""),
+                "score": int(entry.get("score", 0)),
+                "performances": int(entry.get("performances", 0)),
+            }
+            self._insert(entry["id"])
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _insert(self, user_id: str) -> int:
+        self._sequence += 1
+        key = (-self._entries[user_id]["score"], self._sequence)
+        self._keys[user_id] = key
+        index = bisect.bisect_left(self._order, (*key, user_id))
+        self._order.insert(index, (*key, user_id))
+        return index
+
+    def _ranked(self, index: int) -> dict:
+        return {**self._entries[self._order[index][2]], "rank": index + 1}
+
+    def scored(self, queue_id: str) -> int | None:
+        """The score already recorded for this queue entry, if any."""
+        return self._scored.get(queue_id)
+
+    def record(self, queue_id: str, user_id: str, name: str, score: int) -> list[dict]:
+        """
+        Adds a performance to the singer's total. Returns the entries whose rank or
+        score changed, each with its new 1-based `rank`, best first.
+        """
+        self._scored[queue_id] = score
+        while len(self._scored) > RECENT_PERFORMANCES:
+            self._scored.popitem(last=False)
+
+        entry = self._entries.get(user_id)
+        if entry is None:
+            entry = self._entries[user_id] = {"id": user_id, "name": name, "score": 0, "performances": 0}
+            previous = None
+        else:
+            previous = bisect.bisect_left(self._order, (*self._keys[user_id], user_id))
+        entry["name"] = name or entry["name"]
+        entry["performances"] += 1
+        if previous is not None and score == 0:
+            # Same total, same place: re-keying would drop them below singers they tie with.
+            return [self._ranked(previous)]
+        if previous is not None:
+            del self._order[previous]
+        entry["score"] += score
+        index = self._insert(user_id)
+        # Everyone between the old and the new position moved down one place.
+        last = previous if previous is not None else len(self._order) - 1
+        return [self._ranked(i) for i in range(index, last + 1)]
+
+    def scored_list(self) -> list[list]:
+        """The recently scored [queue_id, score] pairs, oldest first, as saved with the session."""
+        return [[queue_id, score] for queue_id, score in self._scored.items()]
+
+    def rank_of(self, user_id: str) -> int | None:
+        key = self._keys.get(user_id)
+        if key is None:
+            return None
+        return bisect.bisect_left(self._order, (*key, user_id)) + 1
+
+    def top(self, limit: int) -> list[dict]:
+        return [self._ranked(i) for i in range(min(limit, len(self._order)))]
+
+    def to_list(self) -> list[dict]:
+        """Entries best first, the shape sessions are saved and sent in."""
+        return [self._entries[user_id] for _, _, user_id in self._order]
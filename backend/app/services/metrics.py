@@ -0,0 +1,176 @@
+# backend/app/services/metrics.py
+import bisect
+import math
+from typing import Callable, Iterable
+
+# Seconds. Covers sub-millisecond socket handlers up to slow YouTube scrapes.
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Recipients per emit.
+FANOUT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 250, 500)
+# Serialized payload sizes.
+BYTES_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        self._values[self._key(labels)] = value
+
+    def samples(self):
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._values: dict[tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        entry[0][bisect.bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def samples(self):
+        for key, (counts, total) in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    """
+    Metrics in the Prometheus text exposition format.
+
+    Everything here is updated from the event loop thread, so there is no locking.
+    Values that already live elsewhere (cache counters, pool stats) are read by
+    collectors when `/metrics` is scraped instead of being mirrored on every change.
+    """
+
+    def __init__(self):
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DURATION_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector: Callable):
+        """`collector` is an async callable run before every scrape to refresh gauges."""
+        self._collectors.append(collector)
+
+    async def render(self) -> str:
+        for collector in self._collectors:
+            await collector()
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+socket_event_duration = registry.histogram(
+    "karayouke_socket_event_duration_seconds", "Time spent in Socket.IO event handlers.", ("event",))
+socket_event_errors = registry.counter(
+    "karayouke_socket_event_errors_total", "Socket.IO event handlers that raised.", ("event",))
+socket_rate_limited = registry.counter(
+    "karayouke_socket_rate_limited_total", "Socket.IO events dropped by a rate limit.", ("event", "scope"))
+socket_backlog_shed = registry.counter(
+    "karayouke_socket_backlog_shed_total", "Outbound backlogs dropped for slow sockets.", ("action",))
+socket_emits = registry.counter(
+    "karayouke_socket_emits_total", "Socket.IO events emitted by the server.", ("event",))
+socket_emit_fanout = registry.histogram(
+    "karayouke_socket_emit_fanout", "Local recipients per emitted event.", ("event",), FANOUT_BUCKETS)
+socket_payload_bytes = registry.histogram(
+    "karayouke_socket_payload_bytes", "Serialized size of emitted events.", ("event",), BYTES_BUCKETS)
+http_request_duration = registry.histogram(
+    "karayouke_http_request_duration_seconds", "Time spent serving HTTP requests.", ("method", "route", "status"))
+active_sessions = registry.gauge("karayouke_active_sessions", "Sessions in the session store.")
+connected_sockets = registry.gauge("karayouke_connected_sockets", "Sockets connected to this worker.")
+cache_hits = registry.gauge("karayouke_cache_hits", "Cache hits since start.", ("cache",))
+cache_misses = registry.gauge("karayouke_cache_misses", "Cache misses since start.", ("cache",))
+cache_hit_ratio = registry.gauge("karayouke_cache_hit_ratio", "Hits over lookups since start.", ("cache",))
+search_pool = registry.gauge("karayouke_search_pool", "YouTube search pool counters.", ("stat",))
+
+
+def record_cache(cache: str, hits: int, misses: int):
+    cache_hits.set(hits, cache=cache)
+    cache_misses.set(misses, cache=cache)
+    lookups = hits + misses
+    cache_hit_ratio.set(round(hits / lookups, 4) if lookups else 0, cache=cache)
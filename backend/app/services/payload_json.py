@@ -0,0 +1,109 @@
+# backend/app/services/payload_json.py
+import json
+import os
+import zlib
+from app.services.metrics import socket_payload_bytes
+
+try:
+    import orjson
+except ImportError:  # Falls back to the standard library encoder
+    orjson = None
+
+# "orjson" or "json". Defaults to orjson when it is installed.
+SOCKET_JSON_ENCODER = os.getenv("SOCKET_JSON_ENCODER", "orjson" if orjson else "json")
+USE_ORJSON = SOCKET_JSON_ENCODER == "orjson" and orjson is not None
+# Every Nth encoded snapshot is also deflated to estimate the permessage-deflate ratio
+# for the debug stats; compressing each one would cost more than encoding it. 0 disables.
+PAYLOAD_DEFLATE_SAMPLE_EVERY = int(os.getenv("PAYLOAD_DEFLATE_SAMPLE_EVERY", "100"))
+
+
+class RawJSON:
+    """
+    A value that is already serialized. `dumps` splices its text in as-is, so a
+    payload that many clients receive is encoded once instead of on every emit.
+    """
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __reduce__(self):
+        # Crosses the Redis message queue as plain text.
+        return RawJSON, (self.text,)
+
+
+def encode(value) -> str:
+    if USE_ORJSON:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+    return json.dumps(value, separators=(",", ":"))
+
+
+def dumps(value, **kwargs) -> str:
+    """
+    The `dumps` Socket.IO uses for packets. Packets are `[event, *args]` lists,
+    so `RawJSON` arguments are handled at that level. A room broadcast is encoded
+    once for all recipients, which makes this the place to measure payload size.
+    """
+    if isinstance(value, list) and value and isinstance(value[0], str):
+        if any(isinstance(item, RawJSON) for item in value):
+            text = "[" + ",".join(item.text if isinstance(item, RawJSON) else encode(item) for item in value) + "]"
+        else:
+            text = encode(value)
+        socket_payload_bytes.observe(len(text), event=value[0])
+        return text
+    if isinstance(value, RawJSON):
+        return value.text
+    return encode(value)
+
+
+def loads(text, **kwargs):
+    if USE_ORJSON:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+class PayloadStats:
+    """Counters for the snapshot cache, exposed through the debug API."""
+
+    def __init__(self):
+        self.snapshots_encoded = 0
+        self.snapshots_reused = 0
+        self.bytes_encoded = 0
+        # Bytes that didn't have to be serialized again because a cached snapshot was reused.
+        self.bytes_reused = 0
+        # permessage-deflate estimate: what sampled snapshots shrink to under zlib.
+        self.bytes_sampled = 0
+        self.bytes_deflated = 0
+
+    def record_encoded(self, text: str, size: int):
+        self.snapshots_encoded += 1
+        self.bytes_encoded += size
+        if PAYLOAD_DEFLATE_SAMPLE_EVERY > 0 and (self.snapshots_encoded - 1) % PAYLOAD_DEFLATE_SAMPLE_EVERY == 0:
+            self.bytes_sampled += size
+            self.bytes_deflated += deflated_size(text)
+
+    def record_reused(self, size: int):
+        self.snapshots_reused += 1
+        self.bytes_reused += size
+
+    def to_dict(self) -> dict:
+        ratio = self.bytes_deflated / self.bytes_sampled if self.bytes_sampled else None
+        return {
+            "encoder": "orjson" if USE_ORJSON else "json",
+            "snapshots_encoded": self.snapshots_encoded,
+            "snapshots_reused": self.snapshots_reused,
+            "bytes_encoded": self.bytes_encoded,
+            "bytes_reused": self.bytes_reused,
+            "deflate_ratio": round(ratio, 3) if ratio is not None else None,
+            "bytes_saved_by_deflate_estimate": round(self.bytes_encoded * (1 - ratio)) if ratio is not None else None,
+        }
+
+
+def deflated_size(text: str) -> int:
+    """Size of `text` after raw deflate, as permessage-deflate would send it."""
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return len(compressor.compress(text.encode()) + compressor.flush(zlib.Z_SYNC_FLUSH))
+
+
+payload_stats = PayloadStats()
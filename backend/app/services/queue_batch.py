@@ -0,0 +1,97 @@
+# backend/app/services/queue_batch.py
+import uuid
+from app.services.session_limits import MAX_QUEUE_BATCH, MAX_QUEUE_LENGTH, over_limit
+from app.services.session_model import Session
+from app.services.suggestions import suggestion_index
+
+# Batch edits of a session's queue, shared by the socket events and the REST routes.
+# Each call validates the whole batch before touching the queue, so a batch is
+# applied completely or not at all. Callers hold the session through
+# `session_store.edit` and broadcast the returned payload as a single patch.
+
+
+class QueueBatchError(ValueError):
+    """The batch is malformed or refers to songs that aren't queued."""
+
+
+class QueueBatchForbiddenError(QueueBatchError):
+    """The caller may not make one of the changes."""
+
+
+class QueueFullError(QueueBatchError):
+    """Adding the songs would take the queue past MAX_QUEUE_LENGTH."""
+
+
+def _check_size(items, name: str):
+    if not isinstance(items, list) or not items:
+        raise QueueBatchError(f"'{name}' must be a non-empty list.")
+    if over_limit(0, MAX_QUEUE_BATCH, len(items)):
+        raise QueueBatchError(f"At most {MAX_QUEUE_BATCH} {name} can be sent at once.")
+
+
+def add_songs(session: Session, songs: list) -> tuple[list[dict], list[dict]]:
+    """
+    Queues the songs, each with a fresh `queue_id`. Returns the new entries and, for
+    those the fair-rotation scheduler didn't put at the end, the moves that place
+    them once all are appended.
+    """
+    _check_size(songs, "songs")
+    for song in songs:
+        if not isinstance(song, dict) or not song.get("song_id"):
+            raise QueueBatchError("Every song needs a song_id.")
+        if not session.has_user(song.get("added_by")):
+            raise QueueBatchForbiddenError("Songs can only be added by users in the session.")
+    if over_limit(len(session.queue), MAX_QUEUE_LENGTH, len(songs)):
+        raise QueueFullError("The queue doesn't have room for all of these songs.")
+
+    items = [{**song, "queue_id": str(uuid.uuid4())} for song in songs]
+    moves = []
+    for item in items:
+        before = session.enqueue(item)
+        if before is not None:
+            moves.append({"queue_id": item["queue_id"], "before": before})
+        suggestion_index.record_queued(item.get("title") or "")
+    return items, moves
+
+
+def remove_songs(session: Session, queue_ids: list, user_id: str | None, is_host: bool = False) -> list[str]:
+    """
+    Unlinks the entries. Remotes may only remove songs they added; the host may
+    remove any. Returns the removed ids, without duplicates.
+    """
+    _check_size(queue_ids, "queue_ids")
+    # Checked before de-duplicating: unhashable ids (lists, dicts) would break dict.fromkeys.
+    if not all(isinstance(queue_id, str) for queue_id in queue_ids):
+        raise QueueBatchError("Every queue_id must be a string.")
+    queue_ids = list(dict.fromkeys(queue_ids))
+    for queue_id in queue_ids:
+        entry = session.queue.get(queue_id)
+        if entry is None:
+            raise QueueBatchError(f"Song {queue_id} isn't in the queue.")
+        if not is_host and entry.get("added_by") != user_id:
+            raise QueueBatchForbiddenError("Only the host can remove songs added by someone else.")
+
+    for queue_id in queue_ids:
+        session.dequeue(queue_id)
+    return queue_ids
+
+
+def move_songs(session: Session, moves: list) -> list[dict]:
+    """
+    Applies moves in order; each puts `queue_id` in front of `before` (None: at the
+    end). Entries are relinked in place, so nothing else in the queue is touched.
+    Returns the moves as applied, for clients to replay.
+    """
+    _check_size(moves, "moves")
+    applied = []
+    for move in moves:
+        queue_id = move.get("queue_id") if isinstance(move, dict) else None
+        before = move.get("before") if isinstance(move, dict) else None
+        queued = isinstance(queue_id, str) and queue_id in session.queue
+        if not queued or (before is not None and not (isinstance(before, str) and before in session.queue)):
+            raise QueueBatchError(f"Can't move {queue_id}: it or its target isn't in the queue.")
+        applied.append({"queue_id": queue_id, "before": before})
+
+    for move in applied:
+        session.move_entry(move["queue_id"], move["before"])
+    return applied
@@ -0,0 +1,98 @@
+# backend/app/services/search_cache.py
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable
+
+SEARCH_CACHE_SIZE = int(os.getenv("SEARCH_CACHE_SIZE", "256"))
+SEARCH_CACHE_TTL_SECONDS = float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "900"))
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive cache key, so "Bohemian  Rhapsody" and "bohemian rhapsody" share an entry."""
+    return " ".join(query.lower().split())
+
+
+class SearchResultCache:
+    """
+    LRU + TTL cache of filtered search results, keyed by normalized query.
+
+    Concurrent lookups for the same query share a single in-flight fetch, so a burst
+    of identical searches (or pages 2..N requested while page 1 is still loading)
+    costs one scrape.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[str, tuple[list[dict], float]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get(self, query: str) -> list[dict] | None:
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        results, stored_at = entry
+        if time.monotonic() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return results
+
+    def put(self, query: str, results: list[dict]):
+        key = normalize_query(query)
+        self._entries[key] = (results, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def get_or_fetch(self, query: str, fetch: Callable[[], Awaitable[list[dict]]]) -> list[dict]:
+        """Returns cached results for `query`, or awaits `fetch()` once for all concurrent callers."""
+        cached = self.get(query)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        key = normalize_query(query)
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._fetch_and_store(query, fetch))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        # Shielded so one caller going away doesn't cancel the fetch for everyone else.
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, query: str, fetch: Callable[[], Awaitable[list[dict]]]) -> list[dict]:
+        results = await fetch()
+        self.put(query, results)
+        return results
+
+    def _release(self, key: str, task: asyncio.Task):
+        self._in_flight.pop(key, None)
+        # Mark a failure as retrieved even if every waiter has already gone away.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._in_flight),
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+        }
+
+
+search_cache = SearchResultCache(SEARCH_CACHE_SIZE, SEARCH_CACHE_TTL_SECONDS)
@@ -0,0 +1,109 @@
+# backend/app/services/search_executor.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from youtube_search import YoutubeSearch
+
+# `YoutubeSearch` is a blocking HTTP scrape, so it runs on its own small thread pool
+# instead of the event loop. Requests beyond the pool plus a short waiting line are
+# rejected immediately rather than piling up behind slow scrapes.
+SEARCH_WORKERS = int(os.getenv("SEARCH_WORKERS", "4"))
+SEARCH_MAX_PENDING = int(os.getenv("SEARCH_MAX_PENDING", "8"))
+SEARCH_TIMEOUT_SECONDS = float(os.getenv("SEARCH_TIMEOUT_SECONDS", "10"))
+
+
+class SearchOverloadedError(Exception):
+    """Raised when every worker is busy and the waiting line is full."""
+
+
+class SearchTimeoutError(Exception):
+    """Raised when a scrape doesn't finish within SEARCH_TIMEOUT_SECONDS."""
+
+
+_executor = ThreadPoolExecutor(max_workers=SEARCH_WORKERS, thread_name_prefix="youtube-search")
+
+# Counters for the /search-pool debug endpoint. Updated from worker threads, hence the lock.
+_stats_lock = threading.Lock()
+_stats = {
+    "in_flight": 0,    # submitted and not yet finished (running + queued)
+    "running": 0,
+    "completed": 0,
+    "rejected": 0,
+    "timed_out": 0,
+    "failed": 0,
+    "total_wait_seconds": 0.0,
+    "max_wait_seconds": 0.0,
+}
+
+
+def _scrape(query: str, max_results: int, submitted_at: float) -> list[dict]:
+    wait = time.monotonic() - submitted_at
+    with _stats_lock:
+        _stats["total_wait_seconds"] += wait
+        _stats["max_wait_seconds"] = max(_stats["max_wait_seconds"], wait)
+        _stats["running"] += 1
+    try:
+        return YoutubeSearch(query, max_results=max_results).to_dict()
+    finally:
+        with _stats_lock:
+            _stats["running"] -= 1
+
+
+def _on_done(future):
+    # Runs for finished and for cancelled-before-start jobs alike, so a timed out
+    # request keeps counting against capacity until its thread is actually free.
+    with _stats_lock:
+        _stats["in_flight"] -= 1
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            _stats["failed"] += 1
+        else:
+            _stats["completed"] += 1
+
+
+async def run_search(query: str, max_results: int = 50) -> list[dict]:
+    """
+    Runs a YouTube scrape on the search pool and returns its raw results.
+    Raises SearchOverloadedError when the pool is saturated and SearchTimeoutError
+    when the scrape takes longer than SEARCH_TIMEOUT_SECONDS.
+    """
+    with _stats_lock:
+        if _stats["in_flight"] >= SEARCH_WORKERS + SEARCH_MAX_PENDING:
+            _stats["rejected"] += 1
+            raise SearchOverloadedError()
+        _stats["in_flight"] += 1
+
+    future = _executor.submit(_scrape, query, max_results, time.monotonic())
+    future.add_done_callback(_on_done)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=SEARCH_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        with _stats_lock:
+            _stats["timed_out"] += 1
+        raise SearchTimeoutError()
+
+
+def get_search_pool_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    started = stats["completed"] + stats["failed"] + stats["running"]
+    return {
+        "workers": SEARCH_WORKERS,
+        "max_pending": SEARCH_MAX_PENDING,
+        "timeout_seconds": SEARCH_TIMEOUT_SECONDS,
+        "running": stats["running"],
+        "queue_depth": max(stats["in_flight"] - stats["running"], 0),
+        "completed": stats["completed"],
+        "failed": stats["failed"],
+        "rejected": stats["rejected"],
+        "timed_out": stats["timed_out"],
+        "avg_wait_ms": round(stats["total_wait_seconds"] / started * 1000, 2) if started else 0.0,
+        "max_wait_ms": round(stats["max_wait_seconds"] * 1000, 2),
+    }
+
+
+def shutdown_search_executor():
+    _executor.shutdown(wait=False, cancel_futures=True)
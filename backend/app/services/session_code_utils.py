@@ -1,6 +1,98 @@
 # backend/app/services/session_code_utils.py
-import random
+import secrets
 import string
 
-def generate_session_code(length: int = 5) -> str:
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
+CODE_ALPHABET = string.ascii_uppercase + string.digits
+CODE_LENGTH = 5
+CODE_SPACE = len(CODE_ALPHABET) ** CODE_LENGTH  # 36^5, about 60 million codes
+# Random draws tried before falling back to a scan for a free code.
+MAX_RANDOM_PROBES = 32
+
+# Maps a bitmap byte to 1 when all eight of its codes are taken, for the fallback scan.
+_FULL_BYTE = bytes(1 if value == 0xFF else 0 for value in range(256))
+
+
+def generate_session_code(length: int = CODE_LENGTH) -> str:
+    """An unpredictable code. It may already be in use; see `SessionCodeAllocator`."""
+    return ''.join(secrets.choice(CODE_ALPHABET) for _ in range(length))
+
+
+def code_to_index(code: str) -> int | None:
+    """Position of `code` in the code space, or None if it isn't a well-formed code."""
+    if len(code) != CODE_LENGTH:
+        return None
+    index = 0
+    for char in code:
+        digit = CODE_ALPHABET.find(char)
+        if digit < 0:
+            return None
+        index = index * len(CODE_ALPHABET) + digit
+    return index
+
+
+def index_to_code(index: int) -> str:
+    chars = []
+    for _ in range(CODE_LENGTH):
+        index, digit = divmod(index, len(CODE_ALPHABET))
+        chars.append(CODE_ALPHABET[digit])
+    return ''.join(reversed(chars))
+
+
+class SessionCodeAllocator:
+    """
+    Hands out session codes that are guaranteed not to be in use.
+
+    Keeps one bit per possible code (about 7.5 MB, allocated on first use). Codes are
+    drawn with `secrets`, so they stay unguessable, and a draw that hits a taken code
+    is simply retried; at any realistic occupancy that costs O(1) on average. If the
+    space is nearly full, a scan from a random starting point finds the next free code
+    instead. Releasing a code makes it available again.
+    """
+
+    def __init__(self):
+        self._bitmap: bytearray | None = None
+        self.in_use = 0
+
+    def _bits(self) -> bytearray:
+        if self._bitmap is None:
+            self._bitmap = bytearray((CODE_SPACE + 7) // 8)
+        return self._bitmap
+
+    def _is_taken(self, index: int) -> bool:
+        return bool(self._bits()[index >> 3] & (1 << (index & 7)))
+
+    def _take(self, index: int):
+        self._bits()[index >> 3] |= 1 << (index & 7)
+        self.in_use += 1
+
+    def allocate(self) -> str:
+        if self.in_use >= CODE_SPACE:
+            raise RuntimeError("Every session code is in use.")
+        for _ in range(MAX_RANDOM_PROBES):
+            index = secrets.randbelow(CODE_SPACE)
+            if not self._is_taken(index):
+                self._take(index)
+                return index_to_code(index)
+        index = self._scan_from(secrets.randbelow(CODE_SPACE))
+        self._take(index)
+        return index_to_code(index)
+
+    def _scan_from(self, start: int) -> int:
+        # 36^5 is a multiple of 8, so every bit of every byte is a real code.
+        full = self._bits().translate(_FULL_BYTE)
+        byte = full.find(0, start >> 3)
+        if byte < 0:
+            byte = full.find(0)
+        return next((byte << 3) | bit for bit in range(8) if not self._is_taken((byte << 3) | bit))
+
+    def reserve(self, code: str):
+        """Marks a code chosen elsewhere (restored sessions) as taken."""
+        index = code_to_index(code)
+        if index is not None and not self._is_taken(index):
+            self._take(index)
+
+    def release(self, code: str):
+        index = code_to_index(code)
+        if index is not None and self._is_taken(index):
+            self._bits()[index >> 3] &= ~(1 << (index & 7)) & 0xFF
+            self.in_use -= 1
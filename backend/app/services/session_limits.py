@@ -0,0 +1,14 @@
+# backend/app/services/session_limits.py
+import os
+
+# Global caps that keep one process's memory bounded. 0 disables a cap.
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "1000"))
+MAX_QUEUE_LENGTH = int(os.getenv("MAX_QUEUE_LENGTH", "200"))
+MAX_USERS_PER_SESSION = int(os.getenv("MAX_USERS_PER_SESSION", "50"))
+# Operations accepted in one add_songs / remove_songs / reorder_queue call.
+MAX_QUEUE_BATCH = int(os.getenv("MAX_QUEUE_BATCH", "200"))
+
+
+def over_limit(current: int, limit: int, adding: int = 1) -> bool:
+    """True if adding `adding` more would exceed `limit`."""
+    return limit > 0 and current + adding > limit
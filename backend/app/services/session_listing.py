@@ -0,0 +1,77 @@
+# backend/app/services/session_listing.py
+from typing import AsyncIterator
+from app.services.session_model import Session
+from app.services.session_store import SessionStore
+
+# What each listed session includes: everything clients see, that without the
+# member and song lists, or just the numbers.
+VIEWS = ("full", "compact", "counts")
+# "idle" sessions are lobbies whose host hasn't started the party.
+STATES = ("started", "idle", "password")
+# Store pages looked at per listing request before handing back a short page, so a
+# filter that matches almost nothing can't walk every session in one request.
+MAX_PAGES_PER_REQUEST = 10
+# Sessions fetched from the store at a time while exporting.
+EXPORT_PAGE_SIZE = 100
+
+
+def matches(session: Session, state: str | None) -> bool:
+    if state == "started":
+        return session.is_started
+    if state == "idle":
+        return not session.is_started
+    if state == "password":
+        return bool(session.password)
+    return True
+
+
+def project(code: str, session: Session, view: str) -> dict:
+    """One session as listed. Counts are read off the session without copying it."""
+    if view == "counts":
+        return {
+            "session_code": code,
+            "is_started": session.is_started,
+            "has_password": bool(session.password),
+            "host_connected": session.host_sid is not None,
+            "revision": session.revision,
+            "users": len(session.users),
+            "queue": len(session.queue),
+            "leaderboard": len(session.leaderboard),
+        }
+    data = session.to_public_dict()
+    if view == "compact":
+        data.pop("users", None)
+        data.pop("queue", None)
+    return {
+        "session_code": code,
+        "has_password": bool(session.password),
+        "host_connected": session.host_sid is not None,
+        **data,
+    }
+
+
+async def list_page(
+    store: SessionStore, cursor: str | None, limit: int, state: str | None, view: str
+) -> tuple[list[dict], str | None]:
+    """Up to about `limit` matching sessions after `cursor`, and the cursor to continue from."""
+    items = []
+    for _ in range(MAX_PAGES_PER_REQUEST):
+        page, cursor = await store.page_sessions(cursor, limit - len(items))
+        items.extend(project(code, session, view) for code, session in page if matches(session, state))
+        if cursor is None or len(items) >= limit:
+            break
+    return items, cursor
+
+
+async def iter_listing(
+    store: SessionStore, state: str | None, view: str, page_size: int = EXPORT_PAGE_SIZE
+) -> AsyncIterator[dict]:
+    """Every matching session, fetched a page at a time so only one page is held at once."""
+    cursor = None
+    while True:
+        page, cursor = await store.page_sessions(cursor, page_size)
+        for code, session in page:
+            if matches(session, state):
+                yield project(code, session, view)
+        if cursor is None:
+            return
@@ -0,0 +1,280 @@
+# backend/app/services/session_model.py
+import secrets
+import uuid
+from app.services.fair_queue import FIFO, FairScheduler
+from app.services.leaderboard import Leaderboard
+
+
+class IndexedQueue:
+    """
+    The song queue as a doubly linked list indexed by `queue_id`.
+
+    Lookups, appends and removals by `queue_id` are O(1) and never rebuild the
+    queue; iteration yields entries in play order.
+    """
+
+    __slots__ = ("_entries", "_next", "_prev", "_head", "_tail")
+
+    def __init__(self, entries=()):
+        self._entries: dict[str, dict] = {}
+        self._next: dict[str, str | None] = {}
+        self._prev: dict[str, str | None] = {}
+        self._head: str | None = None
+        self._tail: str | None = None
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, queue_id):
+        return queue_id in self._entries
+
+    def __iter__(self):
+        queue_id = self._head
+        while queue_id is not None:
+            yield self._entries[queue_id]
+            queue_id = self._next[queue_id]
+
+    def get(self, queue_id: str) -> dict | None:
+        return self._entries.get(queue_id)
+
+    def first(self) -> dict | None:
+        return self._entries[self._head] if self._head is not None else None
+
+    def append(self, entry: dict):
+        queue_id = entry["queue_id"]
+        if queue_id in self._entries:
+            raise ValueError(f"Duplicate queue_id {queue_id}")
+        self._entries[queue_id] = entry
+        self._prev[queue_id] = self._tail
+        self._next[queue_id] = None
+        if self._tail is None:
+            self._head = queue_id
+        else:
+            self._next[self._tail] = queue_id
+        self._tail = queue_id
+
+    def remove(self, queue_id: str) -> dict | None:
+        """Unlinks and returns the entry, or None if it isn't queued."""
+        entry = self._entries.pop(queue_id, None)
+        if entry is None:
+            return None
+        prev_id, next_id = self._prev.pop(queue_id), self._next.pop(queue_id)
+        if prev_id is None:
+            self._head = next_id
+        else:
+            self._next[prev_id] = next_id
+        if next_id is None:
+            self._tail = prev_id
+        else:
+            self._prev[next_id] = prev_id
+        return entry
+
+    def move(self, queue_id: str, before: str | None = None):
+        """Relinks an entry in front of `before`, or at the end when `before` is None."""
+        if queue_id not in self._entries or (before is not None and before not in self._entries):
+            raise KeyError(before if queue_id in self._entries else queue_id)
+        if queue_id == before or self._next[queue_id] == before:
+            return
+        entry = self.remove(queue_id)
+        if before is None:
+            self.append(entry)
+            return
+        prev_id = self._prev[before]
+        self._entries[queue_id] = entry
+        self._prev[queue_id], self._next[queue_id] = prev_id, before
+        self._prev[before] = queue_id
+        if prev_id is None:
+            self._head = queue_id
+        else:
+            self._next[prev_id] = queue_id
+
+    def reorder(self, order: list[str]) -> list[dict]:
+        """
+        Relinks the entries into `order` (every queued id, once each) and returns the
+        moves that did it, as for `move`. Entries already in place aren't moved.
+        """
+        moves = []
+        following = None
+        for queue_id in reversed(order):
+            if self._next[queue_id] != following:
+                self.move(queue_id, following)
+                moves.append({"queue_id": queue_id, "before": following})
+            following = queue_id
+        return moves
+
+    def to_list(self) -> list[dict]:
+        return list(self)
+
+
+class Session:
+    """
+    A karaoke session.
+
+    Users are indexed by id and the queue by `queue_id`, so membership checks,
+    joins, leaves and queue edits don't scan or rebuild lists. `to_dict` produces
+    the wire shape clients receive (users and queue as ordered lists).
+
+    Songs are added, removed and moved through `enqueue`, `dequeue` and `move_entry`
+    so the fair-rotation scheduler (the `queueMode` setting) sees every change.
+    """
+
+    __slots__ = (
+        "users", "queue", "leaderboard", "settings", "password", "is_started", "revision", "host_sid", "player",
+        "scheduler", "host_token",
+    )
+
+    def __init__(
+        self,
+        users=(),
+        queue=(),
+        leaderboard=(),
+        settings: dict | None = None,
+        password: str | None = None,
+        is_started: bool = False,
+        revision: int = 0,
+        host_sid: str | None = None,
+        player: dict | None = None,
+        scheduler: FairScheduler | None = None,
+        host_token: str | None = None,
+        leaderboard_scored=(),
+    ):
+        self.users: dict[str, dict] = {user["id"]: user for user in users}
+        self.queue = IndexedQueue(queue)
+        self.leaderboard = Leaderboard(leaderboard, leaderboard_scored)
+        self.settings: dict = settings if settings is not None else {"showScore": True}
+        self.password = password
+        # The flag to track if the session is live
+        self.is_started = is_started
+        # Incremented by every patch broadcast; clients use it to detect missed updates
+        self.revision = revision
+        self.host_sid = host_sid
+        # Last playback state reported by the host; see `app.sockets.player_events`
+        self.player = player
+        if scheduler is None:
+            scheduler = FairScheduler()
+            scheduler.set_mode(self.settings.get("queueMode", FIFO), self.queue)
+        self.scheduler = scheduler
+        # Secret handed to whoever created the session; host-only REST calls must present it.
+        self.host_token = host_token
+
+    @staticmethod
+    def new_host_token() -> str:
+        return secrets.token_urlsafe(32)
+
+    def is_host_token(self, token: str | None) -> bool:
+        return (
+            isinstance(token, str) and bool(token) and self.host_token is not None
+            # As bytes: compare_digest refuses non-ASCII strings.
+            and secrets.compare_digest(token.encode(), self.host_token.encode())
+        )
+
+    def has_user(self, user_id: str) -> bool:
+        # Ids come straight from clients; a list or dict would make the lookup raise.
+        return isinstance(user_id, str) and user_id in self.users
+
+    def add_user(self, user: dict):
+        self.users[user["id"]] = user
+
+    def remove_user(self, user_id: str) -> dict | None:
+        return self.users.pop(user_id, None)
+
+    def enqueue(self, entry: dict) -> str | None:
+        """
+        Queues an entry where the queue mode puts it: at the end, or in its singer's
+        turn when rotating fairly. Returns the queue_id it was put in front of, if any.
+        """
+        self.queue.append(entry)
+        before = self.scheduler.place(entry)
+        if before is not None:
+            self.queue.move(entry["queue_id"], before)
+        return before
+
+    def dequeue(self, queue_id: str, sung: bool = False) -> dict | None:
+        """
+        Unlinks an entry. `sung` says it was performed (the host finished or skipped
+        it), which is what charges the singer a turn in fair rotation; songs scored
+        through `song_finished` always count. Withdrawn songs don't.
+        """
+        sung = sung or self.leaderboard.scored(queue_id) is not None
+        entry = self.queue.remove(queue_id)
+        if entry is not None:
+            self.scheduler.removed(entry, was_playing=sung)
+        return entry
+
+    def move_entry(self, queue_id: str, before: str | None = None):
+        self.queue.move(queue_id, before)
+        self.scheduler.moved(queue_id, before)
+
+    def set_queue_mode(self, mode: str) -> list[dict]:
+        """Switches the queue mode and reorders the queue to match. Returns the moves made."""
+        self.settings["queueMode"] = mode
+        return self.queue.reorder(self.scheduler.set_mode(mode, self.queue))
+
+    def replace_with(self, other: "Session"):
+        """
+        Takes over every field of `other`. Stores hand `edit` callers the object they
+        write back, so replacing a session wholesale has to happen in place.
+        """
+        for name in self.__slots__:
+            setattr(self, name, getattr(other, name))
+
+    def to_dict(self) -> dict:
+        data = {
+            "users": list(self.users.values()),
+            "queue": self.queue.to_list(),
+            "leaderboard": self.leaderboard.to_list(),
+            "settings": self.settings,
+            "password": self.password,
+            "is_started": self.is_started,
+            "revision": self.revision,
+            "scheduler": self.scheduler.to_dict(),
+            "leaderboard_scored": self.leaderboard.scored_list(),
+        }
+        if self.host_sid is not None:
+            data["host_sid"] = self.host_sid
+        if self.player is not None:
+            data["player"] = self.player
+        if self.host_token is not None:
+            data["host_token"] = self.host_token
+        return data
+
+    def to_public_dict(self) -> dict:
+        """
+        The snapshot clients receive: no password, no host socket id or token, no scheduler
+        or scoring bookkeeping and no player state (that has its own event). Everything in it only changes through
+        revisioned patches, so it is fully determined by `revision`.
+        """
+        data = self.to_dict()
+        data.pop("password", None)
+        data.pop("host_sid", None)
+        data.pop("host_token", None)
+        data.pop("scheduler", None)
+        data.pop("leaderboard_scored", None)
+        data.pop("player", None)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Session":
+        # Entries restored by clients may predate queue ids (or repeat one); give those a fresh id.
+        queue, seen = [], set()
+        for entry in data.get("queue", ()):
+            if not entry.get("queue_id") or entry["queue_id"] in seen:
+                entry = {**entry, "queue_id": str(uuid.uuid4())}
+            seen.add(entry["queue_id"])
+            queue.append(entry)
+        return cls(
+            users=data.get("users", ()),
+            queue=queue,
+            leaderboard=data.get("leaderboard", ()),
+            settings=data.get("settings"),
+            password=data.get("password"),
+            is_started=data.get("is_started", False),
+            revision=data.get("revision", 0),
+            host_sid=data.get("host_sid"),
+            player=data.get("player"),
+            scheduler=FairScheduler.from_dict(data["scheduler"]) if "scheduler" in data else None,
+            host_token=data.get("host_token"),
+            leaderboard_scored=data.get("leaderboard_scored", ()),
+        )
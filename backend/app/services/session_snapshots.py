@@ -0,0 +1,165 @@
+# backend/app/services/session_snapshots.py
+import asyncio
+import json
+import logging
+import os
+from app.services.session_model import Session
+from app.services.session_store import MemorySessionStore, SessionStore
+
+logger = logging.getLogger(__name__)
+
+# Append-only log of session changes on local disk. Empty disables snapshotting.
+SESSION_SNAPSHOT_PATH = os.getenv("SESSION_SNAPSHOT_PATH", "sessions.snapshot.jsonl")
+SESSION_SNAPSHOT_INTERVAL_SECONDS = float(os.getenv("SESSION_SNAPSHOT_INTERVAL_SECONDS", "5"))
+# The log is rewritten with only live sessions once it holds this many records
+# and more than twice as many as there are sessions.
+SESSION_SNAPSHOT_COMPACT_RECORDS = int(os.getenv("SESSION_SNAPSHOT_COMPACT_RECORDS", "1000"))
+
+
+def _record(op: str, code: str, session: Session | None = None) -> str:
+    record = {"op": op, "code": code}
+    if session is not None:
+        data = session.to_dict()
+        # Sockets don't survive a restart; the host registers again when it reconnects
+        # and reports its player state afresh.
+        data.pop("host_sid", None)
+        data.pop("player", None)
+        record["session"] = data
+    return json.dumps(record, separators=(",", ":")) + "\n"
+
+
+class SessionSnapshotter:
+    """
+    Keeps in-memory sessions on local disk so a deploy or crash doesn't end every party.
+
+    Every interval, the sessions the store reports as saved, edited or deleted since
+    the last write are looked at: those whose revision moved are appended to the log
+    as `put` records and vanished ones as `del` records, so the cost follows what
+    changed rather than how many sessions exist. The log is compacted to one
+    record per live session when it grows, and at shutdown. On startup the log is
+    replayed into the store before any request is served.
+
+    Only needed for the in-memory store; Redis already outlives the process.
+    """
+
+    def __init__(self, store: SessionStore, path: str = SESSION_SNAPSHOT_PATH):
+        self.store = store
+        self.path = path
+        # session_code -> revision last written to the log
+        self._written: dict[str, int] = {}
+        # Codes taken from the store but not yet written, kept if an append fails.
+        self._pending: set[str] = set()
+        self._records = 0
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path) and isinstance(self.store, MemorySessionStore)
+
+    async def start(self):
+        if not self.enabled:
+            return
+        restored = await self._load()
+        if restored:
+            logger.info(f"Restored {restored} session(s) from {self.path}")
+        self._task = asyncio.create_task(self._write_periodically())
+
+    async def close(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        await self.compact()
+
+    async def _load(self) -> int:
+        sessions = await asyncio.to_thread(self._replay)
+        for code, data in sessions.items():
+            session = Session.from_dict(data)
+            await self.store.save(code, session)
+            self._written[code] = session.revision
+        # Restored sessions are already in the log.
+        self.store.take_changed()
+        return len(sessions)
+
+    def _replay(self) -> dict[str, dict]:
+        sessions: dict[str, dict] = {}
+        try:
+            f = open(self.path, encoding="utf-8")
+        except FileNotFoundError:
+            return sessions
+        with f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-append leaves a torn last line; everything before it is good.
+                    logger.warning(f"Skipping unreadable record in {self.path}")
+                    continue
+                self._records += 1
+                if record.get("op") == "put":
+                    sessions[record["code"]] = record["session"]
+                elif record.get("op") == "del":
+                    sessions.pop(record["code"], None)
+        return sessions
+
+    async def _write_periodically(self):
+        while True:
+            await asyncio.sleep(SESSION_SNAPSHOT_INTERVAL_SECONDS)
+            try:
+                await self.write_changes()
+                live = len(self._written)
+                if self._records >= SESSION_SNAPSHOT_COMPACT_RECORDS and self._records > 2 * live:
+                    await self.compact()
+            except Exception as e:
+                logger.error(f"Failed to write session snapshot to {self.path}: {e}")
+
+    async def write_changes(self):
+        """Appends the sessions that changed (or disappeared) since the last write."""
+        async with self._lock:
+            self._pending |= self.store.take_changed()
+            lines, written = [], {}
+            for code in self._pending:
+                session = await self.store.get(code)
+                if session is None:
+                    if code in self._written:
+                        lines.append(_record("del", code))
+                        written[code] = None
+                elif self._written.get(code) != session.revision:
+                    lines.append(_record("put", code, session))
+                    written[code] = session.revision
+            if lines:
+                await asyncio.to_thread(self._append, "".join(lines))
+                self._records += len(lines)
+            for code, revision in written.items():
+                if revision is None:
+                    del self._written[code]
+                else:
+                    self._written[code] = revision
+            self._pending.clear()
+
+    def _append(self, text: str):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(text)
+
+    async def compact(self):
+        """Rewrites the log as one `put` per live session."""
+        async with self._lock:
+            # Everything live is rewritten, so earlier changes need no records of their own.
+            self._pending |= self.store.take_changed()
+            lines, written = [], {}
+            async for code, session in self.store.iter_sessions():
+                lines.append(_record("put", code, session))
+                written[code] = session.revision
+            await asyncio.to_thread(self._replace, "".join(lines))
+            self._written = written
+            self._records = len(lines)
+            self._pending.clear()
+
+    def _replace(self, text: str):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
@@ -0,0 +1,416 @@
+# backend/app/services/session_store.py
+import asyncio
+import bisect
+import json
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+from app.services.session_code_utils import SessionCodeAllocator, generate_session_code
+from app.services.session_model import Session
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Only needed when REDIS_URL is set
+    redis = None
+
+# Redis-protocol server shared by every worker. Empty keeps sessions in this process only.
+REDIS_URL = os.getenv("REDIS_URL", "")
+REDIS_KEY_PREFIX = os.getenv("REDIS_KEY_PREFIX", "karayouke:")
+# How long a worker may hold a session's edit lock before Redis releases it anyway.
+REDIS_LOCK_TIMEOUT_SECONDS = float(os.getenv("REDIS_LOCK_TIMEOUT_SECONDS", "5"))
+
+
+class SessionStore:
+    """
+    Where sessions and connected sockets live.
+
+    Sessions are `Session` objects. What `get` (and the iterators) return is for
+    reading only: the Redis store hands back a fresh copy, but the memory store hands
+    back the live object, so anything changed on it would skip the lock. Every change
+    goes through `edit`, which serializes writers per session so revisions and patch
+    broadcasts stay in order.
+
+    Connected sockets are tracked as {sid: {"session_code": str, "user_id": str | None}},
+    with a reverse (session_code, user_id) -> sid index so a user's socket can be
+    found without walking every connected client.
+
+    Each session's last activity is indexed in time order, as is the creation time of
+    sessions no host has registered for yet, so `expired` finds abandoned sessions
+    in time proportional to how many there are rather than by scanning them all.
+    """
+
+    async def get(self, code: str) -> Session | None:
+        raise NotImplementedError
+
+    async def exists(self, code: str) -> bool:
+        raise NotImplementedError
+
+    async def create(self, session: Session) -> str:
+        """Stores a new session under a fresh code that no live session uses, and returns the code."""
+        raise NotImplementedError
+
+    async def save(self, code: str, session: Session):
+        raise NotImplementedError
+
+    async def delete(self, code: str):
+        raise NotImplementedError
+
+    async def count(self) -> int:
+        raise NotImplementedError
+
+    def iter_sessions(self) -> AsyncIterator[tuple[str, Session]]:
+        raise NotImplementedError
+
+    async def page_sessions(self, cursor: str | None, limit: int) -> tuple[list[tuple[str, Session]], str | None]:
+        """
+        About `limit` sessions following the opaque `cursor` (None starts over), and
+        the cursor for the page after (None once every session has been seen).
+        Sessions created or ended while paging may or may not show up.
+        """
+        raise NotImplementedError
+
+    def edit(self, code: str):
+        """
+        Async context manager yielding the session (or None if it doesn't exist) for
+        in-place changes, written back on exit. Don't nest edits of the same session.
+        """
+        raise NotImplementedError
+
+    async def touch(self, code: str):
+        """Records activity in a session. `save` and `edit` do this themselves."""
+        raise NotImplementedError
+
+    async def claim(self, code: str):
+        """Marks the session as having had a host, so the unclaimed TTL no longer applies."""
+        raise NotImplementedError
+
+    async def expired(self, idle_before: float, unclaimed_before: float) -> list[str]:
+        """
+        Codes of sessions idle since before `idle_before`, or created before
+        `unclaimed_before` without a host ever registering (both Unix times).
+        """
+        raise NotImplementedError
+
+    async def get_client(self, sid: str) -> dict | None:
+        raise NotImplementedError
+
+    async def set_client(self, sid: str, info: dict):
+        raise NotImplementedError
+
+    async def pop_client(self, sid: str) -> dict | None:
+        raise NotImplementedError
+
+    async def get_user_sid(self, code: str, user_id: str) -> str | None:
+        raise NotImplementedError
+
+    def iter_clients(self) -> AsyncIterator[tuple[str, dict]]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """Keeps everything in this process. Only valid for a single worker."""
+
+    def __init__(self):
+        self._sessions: dict[str, Session] = {}
+        self._clients: dict[str, dict] = {}
+        # session_code -> {user_id: sid}
+        self._user_sids: dict[str, dict[str, str]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        # code -> last activity, least recently active first
+        self._activity: OrderedDict[str, float] = OrderedDict()
+        # code -> creation time, for sessions no host has registered for yet, oldest first
+        self._unclaimed: OrderedDict[str, float] = OrderedDict()
+        # Live codes; deleted (and reaped) sessions give theirs back.
+        self._codes = SessionCodeAllocator()
+        # The same codes in sorted order, for `page_sessions`.
+        self._sorted_codes: list[str] = []
+        # Codes saved, edited or deleted since `take_changed` was last called.
+        self._changed: set[str] = set()
+
+    async def get(self, code):
+        # The live object rather than a copy, so reads stay cheap; callers only read it.
+        return self._sessions.get(code)
+
+    async def exists(self, code):
+        return code in self._sessions
+
+    async def create(self, session):
+        code = self._codes.allocate()
+        await self.save(code, session)
+        return code
+
+    async def save(self, code, session):
+        if code not in self._sessions:
+            self._codes.reserve(code)
+            bisect.insort(self._sorted_codes, code)
+            if session.host_sid is None:
+                self._unclaimed[code] = time.time()
+        self._sessions[code] = session
+        self._changed.add(code)
+        await self.touch(code)
+
+    async def delete(self, code):
+        if self._sessions.pop(code, None) is not None:
+            self._codes.release(code)
+            del self._sorted_codes[bisect.bisect_left(self._sorted_codes, code)]
+        self._user_sids.pop(code, None)
+        self._locks.pop(code, None)
+        self._activity.pop(code, None)
+        self._unclaimed.pop(code, None)
+        self._changed.add(code)
+
+    async def count(self):
+        return len(self._sessions)
+
+    async def iter_sessions(self):
+        for code, session in list(self._sessions.items()):
+            yield code, session
+
+    async def page_sessions(self, cursor, limit):
+        # Pages in code order; the cursor is the last code returned.
+        start = bisect.bisect_right(self._sorted_codes, cursor) if cursor is not None else 0
+        page = self._sorted_codes[start:start + limit]
+        next_cursor = page[-1] if start + limit < len(self._sorted_codes) else None
+        return [(code, self._sessions[code]) for code in page], next_cursor
+
+    @asynccontextmanager
+    async def edit(self, code):
+        if code not in self._sessions:
+            yield None
+            return
+        lock = self._locks.setdefault(code, asyncio.Lock())
+        async with lock:
+            await self.touch(code)
+            try:
+                # The live object is handed out, so there is nothing to write back.
+                yield self._sessions.get(code)
+            finally:
+                self._changed.add(code)
+
+    def take_changed(self) -> set[str]:
+        """Codes saved, edited or deleted since the last call, for incremental snapshots."""
+        changed, self._changed = self._changed, set()
+        return changed
+
+    async def touch(self, code):
+        if code in self._sessions:
+            self._activity[code] = time.time()
+            self._activity.move_to_end(code)
+
+    async def claim(self, code):
+        self._unclaimed.pop(code, None)
+
+    async def expired(self, idle_before, unclaimed_before):
+        codes = []
+        for code, last_active in self._activity.items():
+            if last_active >= idle_before:
+                break
+            codes.append(code)
+        for code, created in self._unclaimed.items():
+            if created >= unclaimed_before:
+                break
+            codes.append(code)
+        return list(dict.fromkeys(codes))
+
+    async def get_client(self, sid):
+        return self._clients.get(sid)
+
+    async def set_client(self, sid, info):
+        previous = self._clients.get(sid)
+        if previous is not None:
+            self._unindex_client(sid, previous)
+        self._clients[sid] = info
+        if info.get("session_code") and info.get("user_id"):
+            self._user_sids.setdefault(info["session_code"], {})[info["user_id"]] = sid
+
+    async def pop_client(self, sid):
+        info = self._clients.pop(sid, None)
+        if info is not None:
+            self._unindex_client(sid, info)
+        return info
+
+    def _unindex_client(self, sid, info):
+        user_sids = self._user_sids.get(info.get("session_code"))
+        # Only drop the entry if a newer socket for the same user hasn't replaced it.
+        if user_sids and user_sids.get(info.get("user_id")) == sid:
+            del user_sids[info["user_id"]]
+            if not user_sids:
+                del self._user_sids[info["session_code"]]
+
+    async def get_user_sid(self, code, user_id):
+        return self._user_sids.get(code, {}).get(user_id)
+
+    async def iter_clients(self):
+        for sid, info in list(self._clients.items()):
+            yield sid, info
+
+
+class RedisSessionStore(SessionStore):
+    """
+    Keeps sessions as JSON strings in a Redis-protocol server so several workers
+    (or hosts) can serve the same parties and a worker restart loses nothing.
+    Takes a `redis.asyncio` client, so it works the same against fakeredis.
+    """
+
+    def __init__(self, client, prefix: str = REDIS_KEY_PREFIX):
+        self.redis = client
+        self.prefix = prefix
+
+    def _session_key(self, code):
+        return f"{self.prefix}session:{code}"
+
+    @property
+    def _clients_key(self):
+        return f"{self.prefix}clients"
+
+    def _user_sids_key(self, code):
+        return f"{self.prefix}user_sids:{code}"
+
+    @property
+    def _activity_key(self):
+        # Sorted set: code scored by last activity time.
+        return f"{self.prefix}activity"
+
+    @property
+    def _unclaimed_key(self):
+        # Sorted set: code scored by creation time, for sessions without a host yet.
+        return f"{self.prefix}unclaimed"
+
+    async def get(self, code):
+        raw = await self.redis.get(self._session_key(code))
+        return Session.from_dict(json.loads(raw)) if raw is not None else None
+
+    async def exists(self, code):
+        return bool(await self.redis.exists(self._session_key(code)))
+
+    async def create(self, session):
+        payload = json.dumps(session.to_dict())
+        while True:
+            code = generate_session_code()
+            # NX makes the claim atomic across workers; a taken code just means another draw.
+            if await self.redis.set(self._session_key(code), payload, nx=True):
+                break
+        now = time.time()
+        await self.redis.zadd(self._unclaimed_key, {code: now})
+        await self.redis.zadd(self._activity_key, {code: now})
+        return code
+
+    async def save(self, code, session):
+        now = time.time()
+        if session.host_sid is None:
+            # NX: restoring an existing session doesn't restart its unclaimed clock.
+            await self.redis.zadd(self._unclaimed_key, {code: now}, nx=True)
+        await self.redis.set(self._session_key(code), json.dumps(session.to_dict()))
+        await self.redis.zadd(self._activity_key, {code: now})
+
+    async def delete(self, code):
+        await self.redis.delete(self._session_key(code), self._user_sids_key(code))
+        await self.redis.zrem(self._activity_key, code)
+        await self.redis.zrem(self._unclaimed_key, code)
+
+    async def count(self):
+        # Every session is in the activity index, which Redis counts in O(1).
+        return await self.redis.zcard(self._activity_key)
+
+    async def iter_sessions(self):
+        key_prefix_length = len(self._session_key(""))
+        async for key in self.redis.scan_iter(match=self._session_key("*")):
+            raw = await self.redis.get(key)
+            if raw is None:
+                continue
+            key = key.decode() if isinstance(key, bytes) else key
+            yield key[key_prefix_length:], Session.from_dict(json.loads(raw))
+
+    async def page_sessions(self, cursor, limit):
+        # The cursor is Redis's SCAN cursor. SCAN hands back keys in batches of roughly
+        # `limit`, and a batch can't be split without losing keys, so a page may run over.
+        key_prefix_length = len(self._session_key(""))
+        scan_cursor, keys = int(cursor or 0), []
+        while True:
+            scan_cursor, batch = await self.redis.scan(scan_cursor, match=self._session_key("*"), count=limit)
+            keys.extend(batch)
+            if scan_cursor == 0 or len(keys) >= limit:
+                break
+        page = []
+        for key, raw in zip(keys, await self.redis.mget(keys) if keys else ()):
+            if raw is None:
+                continue
+            key = key.decode() if isinstance(key, bytes) else key
+            page.append((key[key_prefix_length:], Session.from_dict(json.loads(raw))))
+        return page, str(scan_cursor) if scan_cursor else None
+
+    @asynccontextmanager
+    async def edit(self, code):
+        async with self.redis.lock(f"{self.prefix}lock:{code}", timeout=REDIS_LOCK_TIMEOUT_SECONDS):
+            session = await self.get(code)
+            yield session
+            if session is not None:
+                # XX: don't resurrect a session that was deleted while we held it.
+                if await self.redis.set(self._session_key(code), json.dumps(session.to_dict()), xx=True):
+                    await self.redis.zadd(self._activity_key, {code: time.time()}, xx=True)
+
+    async def touch(self, code):
+        # XX: only sessions that still exist.
+        await self.redis.zadd(self._activity_key, {code: time.time()}, xx=True)
+
+    async def claim(self, code):
+        await self.redis.zrem(self._unclaimed_key, code)
+
+    async def expired(self, idle_before, unclaimed_before):
+        idle = await self.redis.zrangebyscore(self._activity_key, "-inf", f"({idle_before}")
+        unclaimed = await self.redis.zrangebyscore(self._unclaimed_key, "-inf", f"({unclaimed_before}")
+        codes = [code.decode() if isinstance(code, bytes) else code for code in idle + unclaimed]
+        return list(dict.fromkeys(codes))
+
+    async def get_client(self, sid):
+        raw = await self.redis.hget(self._clients_key, sid)
+        return json.loads(raw) if raw is not None else None
+
+    async def set_client(self, sid, info):
+        previous = await self.get_client(sid)
+        if previous is not None:
+            await self._unindex_client(sid, previous)
+        await self.redis.hset(self._clients_key, sid, json.dumps(info))
+        if info.get("session_code") and info.get("user_id"):
+            await self.redis.hset(self._user_sids_key(info["session_code"]), info["user_id"], sid)
+
+    async def pop_client(self, sid):
+        info = await self.get_client(sid)
+        await self.redis.hdel(self._clients_key, sid)
+        if info is not None:
+            await self._unindex_client(sid, info)
+        return info
+
+    async def _unindex_client(self, sid, info):
+        if not info.get("session_code") or not info.get("user_id"):
+            return
+        key = self._user_sids_key(info["session_code"])
+        current = await self.redis.hget(key, info["user_id"])
+        # Only drop the entry if a newer socket for the same user hasn't replaced it.
+        if current is not None and (current.decode() if isinstance(current, bytes) else current) == sid:
+            await self.redis.hdel(key, info["user_id"])
+
+    async def get_user_sid(self, code, user_id):
+        sid = await self.redis.hget(self._user_sids_key(code), user_id)
+        return sid.decode() if isinstance(sid, bytes) else sid
+
+    async def iter_clients(self):
+        async for sid, raw in self.redis.hscan_iter(self._clients_key):
+            sid = sid.decode() if isinstance(sid, bytes) else sid
+            yield sid, json.loads(raw)
+
+    async def close(self):
+        await self.redis.aclose()
+
+
+def create_session_store() -> SessionStore:
+    if not REDIS_URL:
+        return MemorySessionStore()
+    if redis is None:
+        raise RuntimeError("REDIS_URL is set but the 'redis' package is not installed.")
+    return RedisSessionStore(redis.from_url(REDIS_URL))
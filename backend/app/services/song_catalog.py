@@ -0,0 +1,246 @@
+# backend/app/services/song_catalog.py
+import asyncio
+import json
+import logging
+import os
+import re
+import sqlite3
+import time
+import aiosqlite
+
+logger = logging.getLogger(__name__)
+
+# SQLite file holding every embeddable video search has turned up. Empty (the default) disables the catalog.
+SONG_CATALOG_DB = os.getenv("SONG_CATALOG_DB", "")
+# A search is answered locally, without scraping YouTube, when at least this many catalog
+# titles contain every query word as a whole word (prefix and typo matches don't count).
+# 0 never answers locally: the catalog is then only a fallback for failed live searches.
+CATALOG_MIN_RESULTS = int(os.getenv("CATALOG_MIN_RESULTS", "10"))
+# Videos not seen in a live search for this long are no longer served (embedding may have changed).
+CATALOG_MAX_AGE_SECONDS = float(os.getenv("CATALOG_MAX_AGE_SECONDS", str(30 * 86400)))
+CATALOG_MAX_SONGS = int(os.getenv("CATALOG_MAX_SONGS", "100000"))
+CATALOG_FLUSH_SECONDS = float(os.getenv("CATALOG_FLUSH_SECONDS", "5"))
+# Share of the query's trigrams a title needs for a typo-tolerant match.
+CATALOG_FUZZY_THRESHOLD = float(os.getenv("CATALOG_FUZZY_THRESHOLD", "0.5"))
+
+# Words remotes add to every search (see RemotePage) that many titles lack; they don't narrow anything.
+IGNORED_TERMS = {"karaoke", "lyrics", "instrumental", "version", "official", "video"}
+# Candidates pulled from the trigram index before they are scored.
+FUZZY_CANDIDATES = 200
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS songs ("
+    "id INTEGER PRIMARY KEY, video_id TEXT NOT NULL UNIQUE, title TEXT NOT NULL, "
+    "channel TEXT NOT NULL DEFAULT '', data TEXT NOT NULL, seen_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS songs_seen_at ON songs (seen_at)",
+    # Word and prefix matching on title and channel.
+    "CREATE VIRTUAL TABLE IF NOT EXISTS songs_fts USING fts5("
+    "title, channel, content='songs', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    # Substrings of three characters, for misspelled queries.
+    "CREATE VIRTUAL TABLE IF NOT EXISTS songs_trigram USING fts5("
+    "title, content='songs', content_rowid='id', tokenize='trigram')",
+    "CREATE TRIGGER IF NOT EXISTS songs_ai AFTER INSERT ON songs BEGIN "
+    "INSERT INTO songs_fts (rowid, title, channel) VALUES (new.id, new.title, new.channel); "
+    "INSERT INTO songs_trigram (rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER IF NOT EXISTS songs_ad AFTER DELETE ON songs BEGIN "
+    "INSERT INTO songs_fts (songs_fts, rowid, title, channel) VALUES ('delete', old.id, old.title, old.channel); "
+    "INSERT INTO songs_trigram (songs_trigram, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER IF NOT EXISTS songs_au AFTER UPDATE OF title, channel ON songs BEGIN "
+    "INSERT INTO songs_fts (songs_fts, rowid, title, channel) VALUES ('delete', old.id, old.title, old.channel); "
+    "INSERT INTO songs_trigram (songs_trigram, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO songs_fts (rowid, title, channel) VALUES (new.id, new.title, new.channel); "
+    "INSERT INTO songs_trigram (rowid, title) VALUES (new.id, new.title); END",
+)
+
+
+def query_terms(query: str) -> list[str]:
+    terms = re.findall(r"\w+", query.lower())
+    return [term for term in terms if term not in IGNORED_TERMS]
+
+
+def trigrams(text: str) -> set[str]:
+    # Per word, so a typo doesn't also cost the trigrams spanning the gap to the next word.
+    return {term[i:i + 3] for term in query_terms(text) for i in range(len(term) - 2)}
+
+
+def _fts_string(text: str) -> str:
+    return '"' + text.replace('"', '""') + '"'
+
+
+class SongCatalog:
+    """
+    Local full-text index of every embeddable video a live search has returned.
+
+    Searches try it before scraping YouTube: first every query word as a prefix of
+    a word in the title or channel, ranked by BM25; when that finds too little,
+    titles sharing most of the query's trigrams, which tolerates typos. New videos
+    are buffered and written in one transaction every few seconds.
+    """
+
+    def __init__(self, path: str = SONG_CATALOG_DB):
+        self.path = path
+        self._db: aiosqlite.Connection | None = None
+        # video_id -> (result, seen_at)
+        self._pending_writes: dict[str, tuple[dict, float]] = {}
+        self._flush_task: asyncio.Task | None = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self._db is not None
+
+    async def start(self):
+        if not self.path:
+            return
+        db = await aiosqlite.connect(self.path)
+        try:
+            for statement in SCHEMA:
+                await db.execute(statement)
+            await db.commit()
+        except sqlite3.OperationalError as e:
+            # FTS5 and its trigram tokenizer (SQLite 3.34+) are compile-time options.
+            logger.warning(f"Song catalog disabled, this SQLite build can't index it: {e}")
+            await db.close()
+            return
+        self._db = db
+        self._flush_task = asyncio.create_task(self._flush_periodically())
+        async with db.execute("SELECT COUNT(*) FROM songs") as cursor:
+            (count,) = await cursor.fetchone()
+        logger.info(f"Song catalog at {self.path} holds {count} songs")
+
+    async def close(self):
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        if self._db:
+            await self.flush()
+            await self._db.close()
+            self._db = None
+
+    def add(self, results: list[dict]):
+        """Queues verified-embeddable search results for the next flush."""
+        if not self.enabled:
+            return
+        now = time.time()
+        for result in results:
+            if result.get("id") and result.get("title"):
+                self._pending_writes[result["id"]] = (result, now)
+
+    async def search(self, query: str, limit: int) -> tuple[list[dict], bool]:
+        """
+        Best local matches for `query`, most relevant first, and whether there are
+        enough whole-word matches (see CATALOG_MIN_RESULTS) to skip a live search.
+        Whole-word matches come first, then prefix and typo-tolerant ones.
+        """
+        if not self.enabled:
+            return [], False
+        terms = query_terms(query)
+        if not terms:
+            return [], False
+        fresh_after = time.time() - CATALOG_MAX_AGE_SECONDS
+
+        match = " ".join(f"{_fts_string(term)}*" for term in terms)
+        async with self._db.execute(
+            "SELECT songs.video_id, songs.data, songs.title, songs.channel FROM songs_fts "
+            "JOIN songs ON songs.id = songs_fts.rowid "
+            "WHERE songs_fts MATCH ? AND songs.seen_at > ? ORDER BY bm25(songs_fts, 10.0, 1.0) LIMIT ?",
+            (match, fresh_after, limit),
+        ) as cursor:
+            matches = await cursor.fetchall()
+
+        # "love" also prefix-matches "lovely" and "lover"; only titles with the words
+        # themselves are sure to be what was asked for.
+        wanted = set(terms)
+        whole, partial = [], []
+        for video_id, data, title, channel in matches:
+            (whole if wanted <= set(query_terms(f"{title} {channel}")) else partial).append((video_id, data))
+        rows = whole + partial
+        enough = CATALOG_MIN_RESULTS > 0 and len(whole) >= CATALOG_MIN_RESULTS
+
+        if not enough:
+            found = {video_id for video_id, _ in rows}
+            rows += [row for row in await self._fuzzy(query, fresh_after) if row[0] not in found]
+        results = [json.loads(data) for _, data in rows[:limit]]
+
+        if enough:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return results, enough
+
+    async def _fuzzy(self, query: str, fresh_after: float) -> list[tuple[str, str]]:
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+        match = " OR ".join(_fts_string(gram) for gram in wanted)
+        async with self._db.execute(
+            "SELECT songs.video_id, songs.data, songs.title FROM songs_trigram "
+            "JOIN songs ON songs.id = songs_trigram.rowid "
+            "WHERE songs_trigram MATCH ? AND songs.seen_at > ? ORDER BY rank LIMIT ?",
+            (match, fresh_after, FUZZY_CANDIDATES),
+        ) as cursor:
+            candidates = await cursor.fetchall()
+
+        scored = []
+        for video_id, data, title in candidates:
+            score = len(wanted & trigrams(title)) / len(wanted)
+            if score >= CATALOG_FUZZY_THRESHOLD:
+                scored.append((score, video_id, data))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [(video_id, data) for _, video_id, data in scored]
+
+    async def recent_titles(self, limit: int) -> list[str]:
+        if not self._db:
+            return []
+        async with self._db.execute("SELECT title FROM songs ORDER BY seen_at DESC LIMIT ?", (limit,)) as cursor:
+            return [title for (title,) in await cursor.fetchall()]
+
+    async def flush(self):
+        """Writes the videos gathered since the last flush in one transaction, then trims the catalog."""
+        if not self._db or not self._pending_writes:
+            return
+        rows = [
+            (video_id, result["title"], result.get("channel") or "", json.dumps(result), seen_at)
+            for video_id, (result, seen_at) in self._pending_writes.items()
+        ]
+        self._pending_writes.clear()
+        await self._db.executemany(
+            "INSERT INTO songs (video_id, title, channel, data, seen_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (video_id) DO UPDATE SET title = excluded.title, channel = excluded.channel, "
+            "data = excluded.data, seen_at = excluded.seen_at",
+            rows,
+        )
+        await self._db.execute(
+            "DELETE FROM songs WHERE seen_at <= ? OR id IN "
+            "(SELECT id FROM songs ORDER BY seen_at DESC LIMIT -1 OFFSET ?)",
+            (time.time() - CATALOG_MAX_AGE_SECONDS, CATALOG_MAX_SONGS),
+        )
+        await self._db.commit()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(CATALOG_FLUSH_SECONDS)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Failed to write to the song catalog: {e}")
+
+    async def stats(self) -> dict:
+        songs = 0
+        if self._db:
+            async with self._db.execute("SELECT COUNT(*) FROM songs") as cursor:
+                (songs,) = await cursor.fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "songs": songs,
+            "pending_writes": len(self._pending_writes),
+            "min_results": CATALOG_MIN_RESULTS,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+song_catalog = SongCatalog()
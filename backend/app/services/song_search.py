@@ -0,0 +1,107 @@
+# backend/app/services/song_search.py
+import asyncio
+import logging
+import os
+import time
+from typing import Awaitable, Callable
+from app.services.embeddability import embeddability_checker
+from app.services.search_executor import run_search
+from app.services.song_catalog import song_catalog
+from app.services.suggestions import suggestion_index
+
+logger = logging.getLogger(__name__)
+
+# youtube-search doesn't have a 'page' param, so we simulate it.
+# Fetching 50 gives us a good pool to serve several pages from.
+SEARCH_POOL_SIZE = 50
+# Progressive searches emit a batch once it holds this many videos, or once this much
+# time has passed since the previous batch, whichever comes first.
+SEARCH_BATCH_SIZE = int(os.getenv("SEARCH_BATCH_SIZE", "5"))
+SEARCH_BATCH_INTERVAL_SECONDS = float(os.getenv("SEARCH_BATCH_INTERVAL_SECONDS", "0.15"))
+
+OnBatch = Callable[[list[dict]], Awaitable[None]]
+
+
+async def find_songs(query: str, on_batch: OnBatch | None = None) -> list[dict]:
+    """
+    Results for `query` from the local song catalog when it has enough whole-word
+    matches, otherwise from a live YouTube search. If the live search fails (throttled,
+    busy, timed out), whatever the catalog had is served instead.
+    """
+    local, enough = await song_catalog.search(query, SEARCH_POOL_SIZE)
+    if enough:
+        if on_batch is not None:
+            await on_batch(local)
+        return local
+
+    try:
+        return await fetch_embeddable_results(query, on_batch)
+    except Exception as e:
+        if not local:
+            raise
+        logger.warning(f"Live search for '{query}' failed ({type(e).__name__}), serving {len(local)} catalog results")
+        if on_batch is not None:
+            await on_batch(local)
+        return local
+
+
+async def fetch_embeddable_results(query: str, on_batch: OnBatch | None = None) -> list[dict]:
+    """
+    Scrapes YouTube for `query` and keeps only the videos that can be embedded,
+    in YouTube's ranking order.
+
+    When `on_batch` is given, verified videos are also handed to it in small batches
+    as soon as their embeddability checks finish, so callers can show results before
+    the slowest check returns.
+    """
+    # The scrape is blocking, so it runs on the search pool instead of the event loop.
+    results_raw = await run_search(query, max_results=SEARCH_POOL_SIZE)
+    videos = [video for video in results_raw or [] if video.get("id")]
+    if not videos:
+        return []
+
+    if on_batch is None:
+        embeddability_results = await asyncio.gather(
+            *[embeddability_checker.is_embeddable(video["id"]) for video in videos]
+        )
+    else:
+        embeddability_results = await _check_progressively(videos, on_batch)
+    results = [video for video, is_embeddable_flag in zip(videos, embeddability_results) if is_embeddable_flag]
+    song_catalog.add(results)
+    suggestion_index.record_results(results)
+    return results
+
+
+async def _check_progressively(videos: list[dict], on_batch: OnBatch) -> list[bool]:
+    async def check(index: int) -> tuple[int, bool]:
+        return index, await embeddability_checker.is_embeddable(videos[index]["id"])
+
+    flags = [False] * len(videos)
+    pending = {asyncio.create_task(check(index)) for index in range(len(videos))}
+    batch: list[dict] = []
+    last_flush = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, timeout=SEARCH_BATCH_INTERVAL_SECONDS, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                index, is_embeddable_flag = task.result()
+                if is_embeddable_flag:
+                    flags[index] = True
+                    batch.append(videos[index])
+
+            # The very first verified video goes out on its own so remotes see something right away.
+            if batch and (
+                last_flush is None
+                or not pending
+                or len(batch) >= SEARCH_BATCH_SIZE
+                or time.monotonic() - last_flush >= SEARCH_BATCH_INTERVAL_SECONDS
+            ):
+                await on_batch(batch)
+                batch = []
+                last_flush = time.monotonic()
+    finally:
+        for task in pending:
+            task.cancel()
+    return flags
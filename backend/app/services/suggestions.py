@@ -0,0 +1,208 @@
+# backend/app/services/suggestions.py
+import asyncio
+import bisect
+import heapq
+import logging
+import os
+import re
+import time
+from app.services.search_cache import normalize_query, search_cache
+from app.services.search_executor import SearchOverloadedError
+from app.services.song_catalog import query_terms, song_catalog
+
+logger = logging.getLogger(__name__)
+
+SUGGEST_MAX_PHRASES = int(os.getenv("SUGGEST_MAX_PHRASES", "20000"))
+# Titles seeded from the song catalog at startup.
+SUGGEST_SEED_TITLES = int(os.getenv("SUGGEST_SEED_TITLES", "5000"))
+# Every interval, the most searched queries that aren't cached are searched again
+# in the background so the next remote to ask gets them instantly. 0 disables it.
+SUGGEST_PREWARM_INTERVAL_SECONDS = float(os.getenv("SUGGEST_PREWARM_INTERVAL_SECONDS", "300"))
+SUGGEST_PREWARM_TOP = int(os.getenv("SUGGEST_PREWARM_TOP", "20"))
+# Popularity halves over this long without new searches, so suggestions and pre-warming
+# follow what people sing now. 0 keeps counts forever.
+SUGGEST_HALF_LIFE_SECONDS = float(os.getenv("SUGGEST_HALF_LIFE_SECONDS", "86400"))
+
+# How much each signal adds to a phrase's popularity.
+QUERY_WEIGHT = 1.0
+QUEUED_WEIGHT = 2.0
+RESULT_WEIGHT = 0.1
+# Phrases scoring at least this (searched or queued at least once) get their own index,
+# so they are never crowded out by the many titles that merely appeared in results.
+POPULAR_SCORE = 1.0
+# A phrase is also found from the start of its next few words ("rhapsody" -> "bohemian rhapsody").
+INDEXED_WORD_STARTS = 4
+# Prefix matches scored per lookup; beyond this, the alphabetically first are used.
+MAX_CANDIDATES = 2000
+# Scores are aged in steps of this fraction of a half-life, each one pass over the index.
+AGE_STEP = 1 / 24
+# Phrases and queries that fade below these are forgotten.
+FORGOTTEN_SCORE = 0.01
+FORGOTTEN_QUERY = 0.1
+
+# Bracketed notes such as "(Karaoke Version)" or "[HD]" in video titles.
+BRACKETED = re.compile(r"[(\[][^)\]]*[)\]]")
+
+
+def suggestion_text(text: str) -> str:
+    """Lowercase words of a query or title, minus the filler every karaoke title carries."""
+    return " ".join(query_terms(BRACKETED.sub(" ", text)))
+
+
+class SuggestionIndex:
+    """
+    Typeahead over past queries and song titles, ranked by popularity.
+
+    Keys are kept in sorted lists, so a prefix is a contiguous slice found with two
+    binary searches. Each phrase is keyed from the start of its first few words.
+    Scores add up across every session on this worker: searches, songs queued and,
+    more lightly, titles seen in results. Phrases people searched for or queued are
+    also kept in a second, much smaller list that is consulted first. Scores and
+    search counts decay with a half-life of SUGGEST_HALF_LIFE_SECONDS.
+    """
+
+    def __init__(self, max_phrases: int = SUGGEST_MAX_PHRASES):
+        self.max_phrases = max_phrases
+        self._scores: dict[str, float] = {}
+        # Sorted (key, phrase) pairs, for every phrase and for popular ones.
+        self._keys: list[tuple[str, str]] = []
+        self._popular_keys: list[tuple[str, str]] = []
+        # Normalized query as sent -> times searched (decayed like scores), for pre-warming.
+        self._queries: dict[str, float] = {}
+        self._aged_at = time.monotonic()
+        self._prewarm_task: asyncio.Task | None = None
+
+    def __len__(self):
+        return len(self._scores)
+
+    def _add(self, phrase: str, weight: float):
+        if not phrase:
+            return
+        previous = self._scores.get(phrase)
+        score = self._scores[phrase] = (previous or 0.0) + weight
+        if previous is None:
+            self._index(self._keys, phrase)
+        if score >= POPULAR_SCORE and (previous is None or previous < POPULAR_SCORE):
+            self._index(self._popular_keys, phrase)
+        if len(self._scores) > self.max_phrases:
+            self._evict()
+
+    @staticmethod
+    def _index(keys: list[tuple[str, str]], phrase: str):
+        words = phrase.split(" ")
+        for start in range(min(len(words), INDEXED_WORD_STARTS)):
+            bisect.insort(keys, (" ".join(words[start:]), phrase))
+
+    def _evict(self):
+        # Drops the least popular tenth in one pass rather than one phrase per insert.
+        keep = heapq.nlargest(int(self.max_phrases * 0.9), self._scores.items(), key=lambda item: item[1])
+        self._scores = dict(keep)
+        self._keys = [entry for entry in self._keys if entry[1] in self._scores]
+        self._popular_keys = [entry for entry in self._popular_keys if entry[1] in self._scores]
+
+    def _age(self):
+        if SUGGEST_HALF_LIFE_SECONDS <= 0:
+            return
+        now = time.monotonic()
+        elapsed = now - self._aged_at
+        if elapsed >= SUGGEST_HALF_LIFE_SECONDS * AGE_STEP:
+            self._aged_at = now
+            self.decay(0.5 ** (elapsed / SUGGEST_HALF_LIFE_SECONDS))
+
+    def decay(self, factor: float):
+        """Scales every score and search count by `factor`, forgetting what fades out."""
+        self._scores = {
+            phrase: score * factor for phrase, score in self._scores.items() if score * factor >= FORGOTTEN_SCORE
+        }
+        self._keys = [entry for entry in self._keys if entry[1] in self._scores]
+        self._popular_keys = [
+            entry for entry in self._popular_keys if self._scores.get(entry[1], 0.0) >= POPULAR_SCORE
+        ]
+        self._queries = {
+            query: count * factor for query, count in self._queries.items() if count * factor >= FORGOTTEN_QUERY
+        }
+
+    def record_query(self, query: str):
+        self._age()
+        self._add(suggestion_text(query), QUERY_WEIGHT)
+        key = normalize_query(query)
+        self._queries[key] = self._queries.get(key, 0) + 1
+        if len(self._queries) > self.max_phrases:
+            keep = heapq.nlargest(int(self.max_phrases * 0.9), self._queries.items(), key=lambda item: item[1])
+            self._queries = dict(keep)
+
+    def record_queued(self, title: str):
+        self._age()
+        self._add(suggestion_text(title), QUEUED_WEIGHT)
+
+    def record_results(self, results: list[dict]):
+        self._age()
+        for result in results:
+            self._add(suggestion_text(result.get("title") or ""), RESULT_WEIGHT)
+
+    def suggest(self, prefix: str, limit: int) -> list[str]:
+        prefix = " ".join(re.findall(r"\w+", prefix.lower()))
+        if not prefix:
+            return []
+        suggestions = self._best(self._popular_keys, prefix, limit)
+        if len(suggestions) < limit:
+            suggestions += [
+                phrase for phrase in self._best(self._keys, prefix, limit + len(suggestions))
+                if phrase not in suggestions
+            ][:limit - len(suggestions)]
+        return suggestions
+
+    def _best(self, keys: list[tuple[str, str]], prefix: str, limit: int) -> list[str]:
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + "\uffff",), lo=start)
+        candidates = {phrase for _, phrase in keys[start:min(end, start + MAX_CANDIDATES)]}
+        return heapq.nlargest(limit, candidates, key=lambda phrase: (self._scores[phrase], -len(phrase)))
+
+    async def seed(self):
+        """Loads recently seen titles from the song catalog, so suggestions work right after a restart."""
+        titles = await song_catalog.recent_titles(SUGGEST_SEED_TITLES)
+        for title in titles:
+            self._add(suggestion_text(title), RESULT_WEIGHT)
+        if titles:
+            logger.info(f"Seeded {len(self)} suggestion(s) from the song catalog")
+
+    def start(self):
+        if SUGGEST_PREWARM_INTERVAL_SECONDS > 0 and SUGGEST_PREWARM_TOP > 0:
+            self._prewarm_task = asyncio.create_task(self._prewarm_periodically())
+
+    async def close(self):
+        if self._prewarm_task:
+            self._prewarm_task.cancel()
+            self._prewarm_task = None
+
+    async def _prewarm_periodically(self):
+        while True:
+            await asyncio.sleep(SUGGEST_PREWARM_INTERVAL_SECONDS)
+            try:
+                await self.prewarm()
+            except Exception as e:
+                logger.error(f"Failed to pre-warm the search cache: {e}")
+
+    async def prewarm(self) -> int:
+        """Searches the most popular uncached queries, one at a time. Returns how many were fetched."""
+        # Imported here because song_search records its results into this index.
+        from app.services.song_search import find_songs
+
+        self._age()
+        popular = heapq.nlargest(SUGGEST_PREWARM_TOP, self._queries.items(), key=lambda item: item[1])
+        warmed = 0
+        for query, _ in popular:
+            if search_cache.get(query) is not None:
+                continue
+            try:
+                await search_cache.get_or_fetch(query, lambda: find_songs(query))
+            except SearchOverloadedError:
+                # Live traffic comes first; try the rest next round.
+                break
+            warmed += 1
+        if warmed:
+            logger.debug(f"Pre-warmed {warmed} popular search(es)")
+        return warmed
+
+
+suggestion_index = SuggestionIndex()
@@ -1,119 +1,244 @@
 # File: backend/app/sockets/core.py
+import asyncio
+import logging
+import os
 from app.sockets.socket_server import sio
-from app.state import SESSIONS
+from app.state import session_store
+from app.sockets.rate_limits import socket_rate_limiter
+from app.sockets.session_sync import emit_session_patch, forget_session, patch_log, session_snapshot
+
+logger = logging.getLogger(__name__)
+
+# How long a disconnected user stays in the session (and a disconnected host's session
+# stays up) so a reconnecting phone or a reloaded TV can resume. 0 evicts at once.
+DISCONNECT_GRACE_SECONDS = float(os.getenv("DISCONNECT_GRACE_SECONDS", "30"))
+
+# (session_code, user_id) -> eviction waiting out the grace period on this worker
+_pending_evictions: dict[tuple[str, str], asyncio.Task] = {}
+
+# Connected clients and their associated data live in the session store, so every
+# worker can see them: { sid: { "session_code": str, "user_id": str | None } }.
+# The store also indexes them by (session_code, user_id) for kicks.
+
+async def remove_user(session_code, user_id) -> bool:
+    """Removes a user from a session and broadcasts `user_left`. Returns False if they weren't in it."""
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            return False
+        if session.remove_user(user_id) is None:
+            return False
+        await emit_session_patch(session_code, session, "user_left", {"user_id": user_id})
+        return True
+
+
+async def end_session(code: str, message: str):
+    """Tells the room the session is over and removes it from the store."""
+    # Patches still waiting in the coalescing window describe a session that no longer exists.
+    forget_session(code)
+    socket_rate_limiter.forget_session(code)
+    await sio.emit("session_deleted", {"message": message}, room=code)
+    await session_store.delete(code)
 
-# A simple in-memory dictionary to track connected clients and their associated data.
-# { sid: { "session_code": str, "user_id": str | None } }
-connected_clients = {}
 
 @sio.event
 async def connect(sid, environ):
     """Handles a new client connection."""
-    print(f"Socket connected: {sid}")
+    logger.debug(f"Socket connected: {sid}")
+
+async def _evict_after_grace(code: str, user_id: str, sid: str):
+    """
+    Removes a disconnected user, or ends a disconnected host's session, unless they
+    came back in the meantime. Whether they did is read from the session store, so
+    a reconnect served by another worker counts too.
+    """
+    if DISCONNECT_GRACE_SECONDS > 0:
+        try:
+            await asyncio.sleep(DISCONNECT_GRACE_SECONDS)
+        finally:
+            if _pending_evictions.get((code, user_id)) is asyncio.current_task():
+                del _pending_evictions[(code, user_id)]
+
+    if user_id == "host":
+        session = await session_store.get(code)
+        # A host that came back has registered its new socket.
+        if session is not None and session.host_sid == sid:
+            logger.info(f"Host {sid} did not come back to session {code}. Notifying room and deleting session.")
+            await end_session(code, "The host has disconnected and the session has ended.")
+    elif await session_store.get_user_sid(code, user_id) is None:
+        if await remove_user(code, user_id):
+            logger.info(f"User {user_id} removed from session {code} after disconnecting.")
+
+
+def _cancel_eviction(code: str, user_id: str):
+    task = _pending_evictions.pop((code, user_id), None)
+    if task is not None:
+        task.cancel()
+
 
 @sio.event
 async def disconnect(sid):
-    """Handles a client disconnection and cleans up the session."""
-    print(f"Socket disconnected: {sid}")
-    
-    if sid in connected_clients:
-        session_info = connected_clients.pop(sid, None)
-        if not session_info: return # Exit if no info was found
-
-        code = session_info.get("session_code")
-        user_id = session_info.get("user_id")
-
-        if code and code in SESSIONS:
-            # Check if the disconnected user was the host
-            if SESSIONS[code].get("host_sid") == sid:
-                print(f"Host {sid} disconnected from session {code}. Notifying room and deleting session.")
-                # Notify all remaining clients that the session is over.
-                await sio.emit("session_deleted", {"message": "The host has disconnected and the session has ended."}, room=code)
-                # Clean up the session from memory
-                SESSIONS.pop(code, None)
-            
-            # If a regular user disconnected
-            elif user_id:
-                # Remove the user from the session's user list
-                SESSIONS[code]["users"] = [u for u in SESSIONS[code]["users"] if u.get("id") != user_id]
-                # Notify the entire room about the updated session state
-                await sio.emit("session_updated", SESSIONS[code], room=code)
-                print(f"User {user_id} removed from session {code} on disconnect.")
+    """Handles a client disconnection; the user is evicted if they don't resume in time."""
+    logger.debug(f"Socket disconnected: {sid}")
+    socket_rate_limiter.forget_sid(sid)
+
+    session_info = await session_store.pop_client(sid)
+    if not session_info: return # Exit if no info was found
+
+    code = session_info.get("session_code")
+    user_id = session_info.get("user_id")
+
+    session = await session_store.get(code) if code else None
+    if session is None:
+        return
+    if session.host_sid == sid:
+        user_id = "host"
+    elif not user_id:
+        return
+    if DISCONNECT_GRACE_SECONDS <= 0:
+        await _evict_after_grace(code, user_id, sid)
+        return
+    _cancel_eviction(code, user_id)
+    _pending_evictions[(code, user_id)] = asyncio.create_task(_evict_after_grace(code, user_id, sid))
+    logger.debug(f"{user_id} of session {code} disconnected; evicting in {DISCONNECT_GRACE_SECONDS}s unless they resume")
+
+
+async def _bind_host(sid, session_code, host_token) -> bool:
+    """Makes `sid` the session's host socket, if it presents the session's host token."""
+    async with session_store.edit(session_code) as session:
+        if session is None or not session.is_host_token(host_token):
+            logger.warning(f"Refused host binding of {sid} to session {session_code}: wrong or missing host token")
+            return False
+        session.host_sid = sid
+    await session_store.claim(session_code)
+    await sio.enter_room(sid, session_code)
+    await session_store.set_client(sid, {"session_code": session_code, "user_id": "host"})
+    _cancel_eviction(session_code, "host")
+    return True
+
+
+@sio.event
+async def register_host(sid, data):
+    """
+    The host client calls this to be marked as the session's host.
+    :param data: {'session_code': str, 'host_token': str} (the token /create handed out)
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("session_code"), str):
+        return
+    session_code = data["session_code"]
+    if await _bind_host(sid, session_code, data.get("host_token")):
+        logger.info(f"Host registered with sid {sid} for session {session_code}")
 
 
 @sio.event
-async def register_host(sid, session_code):
-    """The host client calls this to be marked as the session's host."""
-    if session_code in SESSIONS:
-        SESSIONS[session_code]['host_sid'] = sid
+async def resume_session(sid, data):
+    """
+    A client that reconnected picks up where it left off in one round-trip: its new
+    socket is bound to the room and its user (or as host), and it is sent only the
+    patches after the last revision it applied, as `session_patches`. When those
+    aren't all in the replay buffer it gets a `session_updated` snapshot instead.
+    A remote evicted in the meantime gets `resume_failed` and has to join again.
+    :param data: {'session_code': str, 'user_id': str | None, 'host': bool, 'host_token': str | None,
+                  'revision': int | None}; resuming as host needs the session's host token.
+    """
+    session_code = data.get("session_code")
+    user_id = data.get("user_id")
+    revision = data.get("revision")
+
+    session = await session_store.get(session_code) if session_code else None
+    if session is None:
+        await sio.emit("session_deleted", {"message": "This session has ended."}, to=sid)
+        return
+
+    if data.get("host"):
+        if not await _bind_host(sid, session_code, data.get("host_token")):
+            await sio.emit("resume_failed", {"message": "Only the host can resume as host."}, to=sid)
+            return
+    elif user_id and not session.has_user(user_id):
+        await sio.emit("resume_failed", {"message": "You were away too long and left the session."}, to=sid)
+        return
+    else:
         await sio.enter_room(sid, session_code)
-        connected_clients[sid] = {"session_code": session_code, "user_id": "host"}
-        print(f"Host registered with sid {sid} for session {session_code}")
+        await session_store.set_client(sid, {"session_code": session_code, "user_id": user_id})
+        if user_id:
+            _cancel_eviction(session_code, user_id)
+    await session_store.touch(session_code)
+
+    # Read again: patches may have been made while the socket was being bound.
+    session = await session_store.get(session_code)
+    if session is None:
+        return
+    missed = patch_log.since(session_code, revision, session.revision) if isinstance(revision, int) else None
+    if missed is None:
+        await sio.emit("session_updated", session_snapshot(session_code, session), to=sid)
+    elif missed:
+        await sio.emit("session_patches", {"patches": missed}, to=sid)
+    logger.debug(f"Client {sid} resumed session {session_code} from revision {revision} "
+                 f"({'snapshot' if missed is None else f'{len(missed)} patch(es)'})")
 
 
 @sio.event
 async def join_room(sid, session_code):
     """A remote user joins a room. They will request the full state separately."""
     await sio.enter_room(sid, session_code)
-    connected_clients[sid] = {"session_code": session_code, "user_id": None}
-    print(f"Client {sid} joined room: {session_code}")
+    await session_store.set_client(sid, {"session_code": session_code, "user_id": None})
+    logger.debug(f"Client {sid} joined room: {session_code}")
 
 
 @sio.event
 async def get_full_session(sid, session_code):
     """
     This is the primary way for a client to get the full, current state of a session.
-    It's called by the frontend right after it mounts to solve the race condition.
+    It's called by the frontend right after it mounts to solve the race condition,
+    and again whenever it notices a gap in the patch revisions it has applied.
     """
-    print(f"Client {sid} requested full session info for {session_code}")
-    if session_code in SESSIONS:
-        # Emit the data only TO the requesting client.
-        await sio.emit("session_updated", SESSIONS[session_code], to=sid)
+    logger.debug(f"Client {sid} requested full session info for {session_code}")
+    session = await session_store.get(session_code)
+    if session is not None:
+        await session_store.touch(session_code)
+        # Emit the data only TO the requesting client. The snapshot is serialized once
+        # per revision, however many clients (re)connect in between.
+        await sio.emit("session_updated", session_snapshot(session_code, session), to=sid)
 
 
 @sio.event
 async def register_user(sid, data):
     """Associates a user_id with a connected socket ID for remotes."""
-    if sid in connected_clients:
-        connected_clients[sid]["user_id"] = data.get("id")
-        session_code = connected_clients[sid].get("session_code")
-        print(f"User {data.get('id')} registered on socket {sid} for session {session_code}")
-        
-        # After a user is fully registered, broadcast the updated session state to everyone
-        if session_code and session_code in SESSIONS:
-             await sio.emit("session_updated", SESSIONS[session_code], room=session_code)
+    client = await session_store.get_client(sid)
+    if client is not None:
+        client["user_id"] = data.get("id")
+        await session_store.set_client(sid, client)
+        session_code = client.get("session_code")
+        # The user entry itself was already broadcast as `user_joined` by /api/user/join,
+        # so binding the socket needs no room-wide update.
+        logger.debug(f"User {data.get('id')} registered on socket {sid} for session {session_code}")
 
 
 @sio.event
 async def logout_user(sid, data):
     session_code = data.get("session_code")
     user_id = data.get("id")
-    if session_code in SESSIONS:
-        SESSIONS[session_code]["users"] = [u for u in SESSIONS[session_code]["users"] if u["id"] != user_id]
-        await sio.emit("session_updated", SESSIONS[session_code], room=session_code)
+    await remove_user(session_code, user_id)
     await sio.leave_room(sid, session_code)
-    connected_clients.pop(sid, None)
-    print(f"User {user_id} logged out from session {session_code}")
+    await session_store.pop_client(sid)
+    logger.info(f"User {user_id} logged out from session {session_code}")
 
 
 @sio.event
 async def kick_user(sid, data):
     session_code = data.get("session_code")
     user_id_to_kick = data.get("id")
-    sid_to_kick = None
-    for s, info in connected_clients.items():
-        if info.get("user_id") == user_id_to_kick and info.get("session_code") == session_code:
-            sid_to_kick = s
-            break
-            
+    sid_to_kick = await session_store.get_user_sid(session_code, user_id_to_kick)
+
     if sid_to_kick:
         await sio.emit("kicked", {"message": "The host has removed you from the session."}, to=sid_to_kick)
         await sio.disconnect(sid_to_kick)
-        print(f"[kick_user] Kicked user {user_id_to_kick} with sid {sid_to_kick}")
+        # A kicked user doesn't get the reconnect grace period.
+        _cancel_eviction(session_code, user_id_to_kick)
+        await remove_user(session_code, user_id_to_kick)
+        logger.info(f"[kick_user] Kicked user {user_id_to_kick} with sid {sid_to_kick}")
     else:
-        # If the user wasn't found in connected_clients (e.g., disconnected already),
+        _cancel_eviction(session_code, user_id_to_kick)
+        # If the user wasn't found among the connected clients (e.g., disconnected already),
         # still ensure they are removed from the session user list and broadcast the update.
-        if session_code in SESSIONS:
-             SESSIONS[session_code]["users"] = [u for u in SESSIONS[session_code]["users"] if u.get("id") != user_id_to_kick]
-             await sio.emit("session_updated", SESSIONS[session_code], room=session_code)
-        print(f"[kick_user] Could not find sid for user {user_id_to_kick}, but ensured they were removed from user list.")
\ No newline at end of file
+        await remove_user(session_code, user_id_to_kick)
+        logger.info(f"[kick_user] Could not find sid for user {user_id_to_kick}, but ensured they were removed from user list.")
\ No newline at end of file
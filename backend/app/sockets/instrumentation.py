@@ -0,0 +1,159 @@
+# File: backend/app/sockets/instrumentation.py
+import asyncio
+import functools
+import inspect
+import logging
+import os
+import time
+import weakref
+import engineio
+import socketio
+from app.services.metrics import (
+    socket_backlog_shed,
+    socket_emit_fanout,
+    socket_emits,
+    socket_event_duration,
+    socket_event_errors,
+)
+from app.sockets.rate_limits import rate_limited
+
+logger = logging.getLogger(__name__)
+
+# Packets a socket may have waiting to be written before its backlog is dropped and
+# it is told to resync. 0 disables the bound.
+SOCKET_MAX_OUTBOUND_PACKETS = int(os.getenv("SOCKET_MAX_OUTBOUND_PACKETS", "256"))
+# A socket whose backlog overflows this many times is disconnected instead.
+SOCKET_MAX_RESYNCS = int(os.getenv("SOCKET_MAX_RESYNCS", "3"))
+
+
+class InstrumentedAsyncServer(socketio.AsyncServer):
+    """
+    `socketio.AsyncServer` that wraps every event handler as it is registered with
+    its rate limits (see `rate_limits`) and timing, counts emits and how many local
+    sockets each one reaches, and bounds what it buffers for slow sockets.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Engine.IO socket -> backlogs dropped so far
+        self._resyncs: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    def on(self, event, handler=None, namespace=None):
+        register = super().on(event, namespace=namespace)
+
+        def set_handler(handler):
+            if inspect.iscoroutinefunction(handler):
+                register(rate_limited(self, event, _timed(event, handler)))
+            else:
+                register(handler)
+            # The module keeps the plain function; only the server calls the wrapped one.
+            return handler
+
+        if handler is None:
+            return set_handler
+        set_handler(handler)
+
+    async def emit(self, event, data=None, to=None, room=None, skip_sid=None, namespace=None, **kwargs):
+        target = to or room
+        socket_emits.inc(event=event)
+        if target is not None:
+            socket_emit_fanout.observe(self._room_size(namespace or "/", target, skip_sid), event=event)
+        await super().emit(event, data, to=to, room=room, skip_sid=skip_sid, namespace=namespace, **kwargs)
+
+    def _room_size(self, namespace, target, skip_sid) -> int:
+        """
+        Local sockets an emit to `target` reaches, read off the manager's room sizes
+        rather than its participants. With a message queue only this worker's sockets
+        are known, so fan-out is per worker; a socket in several target rooms counts
+        once per room.
+        """
+        rooms = self.manager.rooms.get(namespace, {})
+        names = [target] if isinstance(target, str) else target
+        skipped = [skip_sid] if isinstance(skip_sid, str) else skip_sid or []
+        size = 0
+        for name in names:
+            members = rooms.get(name)
+            if members:
+                size += len(members) - sum(1 for sid in skipped if sid in members)
+        return size
+
+    async def _send_packet(self, eio_sid, pkt):
+        # Packets addressed to one socket.
+        if await self._make_room(eio_sid):
+            await super()._send_packet(eio_sid, pkt)
+
+    async def _send_eio_packet(self, eio_sid, eio_pkt):
+        # Room broadcasts: the manager encodes the packet once and sends it to every member.
+        if await self._make_room(eio_sid):
+            await super()._send_eio_packet(eio_sid, eio_pkt)
+
+    async def _make_room(self, eio_sid) -> bool:
+        """Applies the outbound bound before a packet is queued. Returns False to drop it."""
+        socket = self.eio.sockets.get(eio_sid)
+        if socket is None or SOCKET_MAX_OUTBOUND_PACKETS <= 0:
+            return True
+        if socket.closing or socket.closed or self._resyncs.get(socket, 0) > SOCKET_MAX_RESYNCS:
+            # Going away; the client resyncs when it reconnects.
+            return False
+        if socket.queue.qsize() >= SOCKET_MAX_OUTBOUND_PACKETS:
+            if not self._shed_backlog(eio_sid, socket):
+                return False
+            # Whatever was dropped is recovered by the client asking for a fresh snapshot.
+            await super()._send_packet(eio_sid, self.packet_class(
+                socketio.packet.EVENT, namespace="/", data=["resync_required", {}]))
+        return True
+
+    def _shed_backlog(self, eio_sid, socket) -> bool:
+        """
+        Drops everything queued for a socket that isn't keeping up. Returns False if
+        the socket is being disconnected rather than resynced.
+        """
+        dropped, kept = 0, []
+        while True:
+            try:
+                queued = socket.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            socket.queue.task_done()
+            # Only Socket.IO messages go; pings (and the writer's stop marker) must still reach it.
+            if queued is None or queued.packet_type != engineio.packet.MESSAGE:
+                kept.append(queued)
+            else:
+                dropped += 1
+        for queued in kept:
+            socket.queue.put_nowait(queued)
+
+        resyncs = self._resyncs.get(socket, 0) + 1
+        self._resyncs[socket] = resyncs
+        if resyncs > SOCKET_MAX_RESYNCS:
+            logger.warning(f"Disconnecting {eio_sid}: outbound backlog overflowed {resyncs} times")
+            socket_backlog_shed.inc(action="disconnect")
+            # Unblocks the writer so the transport closes, and runs the usual disconnect handling.
+            socket.queue.put_nowait(None)
+            self.start_background_task(socket.close, wait=False, abort=True, reason=self.eio.reason.SERVER_DISCONNECT)
+            return False
+        logger.info(f"Dropped {dropped} queued packet(s) for slow socket {eio_sid}; asking it to resync")
+        socket_backlog_shed.inc(action="resync")
+        return True
+
+
+def _timed(event: str, handler):
+    # socketio retries `connect`/`disconnect` with fewer arguments on TypeError; pass the
+    # handler only what it accepts so the wrapper never trips that fallback itself.
+    parameters = inspect.signature(handler).parameters.values()
+    takes_varargs = any(p.kind == p.VAR_POSITIONAL for p in parameters)
+    arity = len([p for p in parameters if p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)])
+
+    @functools.wraps(handler)
+    async def wrapper(*args):
+        started = time.perf_counter()
+        try:
+            return await handler(*(args if takes_varargs else args[:arity]))
+        except Exception:
+            socket_event_errors.inc(event=event)
+            logger.exception(f"Socket event '{event}' failed")
+            raise
+        finally:
+            socket_event_duration.observe(time.perf_counter() - started, event=event)
+
+    return wrapper
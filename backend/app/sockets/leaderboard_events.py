@@ -0,0 +1,51 @@
+# File: backend/app/sockets/leaderboard_events.py
+import logging
+from app.sockets.socket_server import sio
+from app.state import session_store
+from app.services.hall_of_fame import hall_of_fame
+from app.services.leaderboard import draw_score
+from app.sockets.session_sync import emit_session_patch
+
+logger = logging.getLogger(__name__)
+
+
+@sio.event
+async def song_finished(sid, data):
+    """
+    Host only: a song was sung to the end and its score is about to be shown.
+    The server draws the score (or takes the host's, 0-100), adds it to the
+    singer's total and tells the room which ranks changed. The host gets
+    `performance_scored` with the score and the singer's new rank to display.
+    :param data: {'session_code': str, 'queue_id': str, 'score': int | None}
+    """
+    session_code = data.get("session_code")
+    queue_id = data.get("queue_id")
+    score = data.get("score")
+    if score is not None and not (isinstance(score, int) and 0 <= score <= 100):
+        logger.warning(f"[song_finished] Invalid score {score!r} from {sid}")
+        return
+
+    async with session_store.edit(session_code) as session:
+        if session is None or session.host_sid != sid:
+            return
+        song = session.queue.get(queue_id)
+        if song is None:
+            return
+        user_id = song.get("added_by")
+        user = session.users.get(user_id) or {}
+
+        recorded = session.leaderboard.scored(queue_id)
+        if recorded is None:
+            recorded = score if score is not None else draw_score()
+            changes = session.leaderboard.record(queue_id, user_id, user.get("name", ""), recorded)
+            # Only the entries that moved or scored are sent, not the whole board.
+            await emit_session_patch(session_code, session, "leaderboard_changed", {"entries": changes})
+            is_new = True
+        else:
+            is_new = False
+        rank = session.leaderboard.rank_of(user_id)
+
+    await sio.emit("performance_scored", {"queue_id": queue_id, "user_id": user_id, "score": recorded, "rank": rank}, to=sid)
+    if is_new:
+        await hall_of_fame.add(session_code, user.get("name", ""), song, recorded)
+        logger.debug(f"{user_id} scored {recorded} in session {session_code}, now ranked {rank}")
@@ -1,6 +1,12 @@
 # File: backend/app/sockets/player_events.py
+import logging
+import time
 from app.sockets.socket_server import sio
-from app.state import SESSIONS
+from app.state import session_store
+from app.sockets.session_sync import emit_session_patch
+
+logger = logging.getLogger(__name__)
+
 
 @sio.event
 async def remote_wants_to_start(sid, data):
@@ -9,19 +15,20 @@ async def remote_wants_to_start(sid, data):
     We forward this request to the designated host of the session.
     """
     session_code = data.get('session_code')
-    if not session_code or session_code not in SESSIONS:
-        print(f"[remote_wants_to_start] Invalid request from {sid} for session {session_code}")
+    session = await session_store.get(session_code) if session_code else None
+    if session is None:
+        logger.warning(f"[remote_wants_to_start] Invalid request from {sid} for session {session_code}")
         return
 
-    host_sid = SESSIONS[session_code].get('host_sid')
+    host_sid = session.host_sid
     if host_sid:
         # Prevent spamming the host if the session is already live
-        if not SESSIONS[session_code].get("is_started", False):
-            print(f"Relaying 'start session' request from remote {sid} to host {host_sid} for session {session_code}")
+        if not session.is_started:
+            logger.info(f"Relaying 'start session' request from remote {sid} to host {host_sid} for session {session_code}")
             # Command the host client to start the session.
             await sio.emit('start_session_from_remote', to=host_sid)
         else:
-            print(f"Ignoring 'start session' request from {sid}, session '{session_code}' already started.")
+            logger.debug(f"Ignoring 'start session' request from {sid}, session '{session_code}' already started.")
 
 
 @sio.event
@@ -31,17 +38,18 @@ async def host_started_session(sid, data):
     Update the session state on the server and broadcast the change to all clients.
     """
     session_code = data.get('session_code')
-    if not session_code or session_code not in SESSIONS:
-        print(f"[host_started_session] Invalid broadcast from {sid} for session {session_code}")
-        return
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            logger.warning(f"[host_started_session] Invalid broadcast from {sid} for session {session_code}")
+            return
 
-    # 1. Update the state on the server to be the single source of truth.
-    SESSIONS[session_code]['is_started'] = True
-    print(f"Host {sid} has started session {session_code}. State updated to is_started: True.")
+        # 1. Update the state on the server to be the single source of truth.
+        session.is_started = True
+        logger.info(f"Host {sid} has started session {session_code}. State updated to is_started: True.")
 
-    # 2. Broadcast the ENTIRE updated session data to ALL clients in the room.
-    # This is the key to keeping all current and future remotes in sync.
-    await sio.emit('session_updated', SESSIONS[session_code], room=session_code)
+        # 2. Broadcast the change to ALL clients in the room. Future remotes pick the
+        # flag up from the snapshot they request through `get_full_session`.
+        await emit_session_patch(session_code, session, 'session_started', {})
 
 
 # This handler receives a control command from a remote client.
@@ -58,33 +66,52 @@ async def player_control(sid, data):
     session_code = data.get('session_code')
     user = data.get('user')
     
-    if not all([session_code, user, session_code in SESSIONS]):
-        print(f"[player_control] Invalid request data from {sid}")
+    session = await session_store.get(session_code) if session_code else None
+    if not all([session_code, user, session is not None]):
+        logger.warning(f"[player_control] Invalid request data from {sid}")
         return
 
     # Find the host's unique session ID (sid)
-    host_sid = SESSIONS[session_code].get('host_sid')
+    host_sid = session.host_sid
 
     if host_sid:
-        print(f"Forwarding action '{data.get('action')}' from {user.get('name')} to host {host_sid}")
+        logger.debug(f"Forwarding action '{data.get('action')}' from {user.get('name')} to host {host_sid}")
         # Emit the event *only* to the host client.
         await sio.emit('player_control', data, to=host_sid)
     else:
-        print(f"[player_control] Host not found for session {session_code}")
+        logger.warning(f"[player_control] Host not found for session {session_code}")
+
+
+def player_position(player: dict, now: float) -> float:
+    """Where playback is at `now`, extrapolated from the last reported state."""
+    if not player.get('isPlaying'):
+        return player['position']
+    return player['position'] + max(0.0, now - player['updated_at'])
+
+
+def player_state_message(player: dict) -> dict:
+    # `server_time` lets clients line their clock up with `updated_at` and extrapolate locally.
+    return {**player, 'server_time': time.time()}
 
 
 # This handler is triggered when a remote needs the current player state.
 @sio.event
 async def get_player_state(sid, session_code):
     """
-    A remote is asking for the current player state. We ask the host to provide it.
+    A remote is asking for the current player state. It is answered from the state the
+    host last reported; the host is only asked when it hasn't reported anything yet.
     """
-    if not session_code or session_code not in SESSIONS:
+    session = await session_store.get(session_code) if session_code else None
+    if session is None:
+        return
+
+    if session.player is not None:
+        await sio.emit('player_state_updated', player_state_message(session.player), to=sid)
         return
 
-    host_sid = SESSIONS[session_code].get('host_sid')
+    host_sid = session.host_sid
     if host_sid:
-        print(f"Asking host {host_sid} for player state for session {session_code}")
+        logger.debug(f"Asking host {host_sid} for player state for session {session_code}")
         # Ask the host to report its current state.
         await sio.emit('get_player_state', to=host_sid)
 
@@ -93,13 +120,38 @@ async def get_player_state(sid, session_code):
 @sio.event
 async def player_state_updated(sid, data):
     """
-    The host has updated its player state. Broadcast this to all remotes in the room.
-    :param data: {'session_code': str, 'isPlaying': bool}
+    The host's playback changed (play/pause, a new song). The server keeps it as the
+    session's player state and broadcasts it to all remotes in the room.
+    :param data: {'session_code': str, 'isPlaying': bool, 'queue_id': str | None, 'position': float}
+        `position` is in seconds. Hosts that leave it out get it extrapolated from
+        the previous state for the same song, or 0 for a new one.
     """
     session_code = data.get('session_code')
-    if not session_code or session_code not in SESSIONS:
+    if not session_code:
         return
-    
+    now = time.time()
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            return
+        if session.host_sid is not None and session.host_sid != sid:
+            logger.warning(f"[player_state_updated] Ignoring state for session {session_code} from non-host {sid}")
+            return
+
+        # Editing also touches the session, which keeps a live party from looking idle.
+        previous = session.player
+        queue_id = data.get('queue_id')
+        position = data.get('position')
+        if not isinstance(position, (int, float)):
+            same_song = previous is not None and previous.get('queue_id') == queue_id
+            position = player_position(previous, now) if same_song else 0.0
+        session.player = {
+            'isPlaying': bool(data.get('isPlaying')),
+            'queue_id': queue_id,
+            'position': max(0.0, float(position)),
+            'updated_at': now,
+        }
+        player = session.player
+
     # Broadcast to everyone in that room, skipping the sender.
-    print(f"Broadcasting player state {data.get('isPlaying')} to session {session_code}")
-    await sio.emit('player_state_updated', data, room=session_code, skip_sid=sid)
\ No newline at end of file
+    logger.debug(f"Broadcasting player state {player['isPlaying']} to session {session_code}")
+    await sio.emit('player_state_updated', player_state_message(player), room=session_code, skip_sid=sid)
@@ -1,29 +1,47 @@
 # File: backend/app/sockets/queue_events.py
+import logging
 from app.sockets.socket_server import sio
-from app.state import SESSIONS
+from app.state import session_store
+from app.services import queue_batch
+from app.services.queue_batch import QueueBatchError
+from app.services.session_limits import MAX_QUEUE_LENGTH, over_limit
+from app.services.suggestions import suggestion_index
+from app.sockets.session_sync import emit_session_patch
 import uuid  # <-- ADD THIS IMPORT
 
+logger = logging.getLogger(__name__)
+
+
 @sio.event
 async def add_song(sid, data):
     session_code = data.get("session_code")
     song = data.get("song")
 
-    if session_code not in SESSIONS:
-        return
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            return
 
-    # Ensure the user adding the song is part of the session
-    user_ids = [u["id"] for u in SESSIONS[session_code]["users"]]
-    if song.get("added_by") not in user_ids:
-        print(f"Unauthorized add_song attempt by unknown user in session {session_code}")
-        return
+        # Ensure the user adding the song is part of the session
+        if not isinstance(song, dict) or not session.has_user(song.get("added_by")):
+            logger.warning(f"Unauthorized add_song attempt by unknown user in session {session_code}")
+            return
+
+        if over_limit(len(session.queue), MAX_QUEUE_LENGTH):
+            logger.warning(f"Queue of session {session_code} is full, rejecting add_song from {sid}")
+            await sio.emit("add_song_rejected", {"message": "The queue is full. Try again after a few songs have played."}, to=sid)
+            return
 
-    # ✅ --- FIX: Add a unique ID to every queue entry ---
-    # This ID is unique to this specific entry in the queue, even if the song is a duplicate.
-    song['queue_id'] = str(uuid.uuid4())
+        # ✅ --- FIX: Add a unique ID to every queue entry ---
+        # This ID is unique to this specific entry in the queue, even if the song is a duplicate.
+        song['queue_id'] = str(uuid.uuid4())
 
-    SESSIONS[session_code]["queue"].append(song)
-    await sio.emit("session_updated", SESSIONS[session_code], room=session_code)
-    print(f"Song added by {song['added_by']} to {session_code} (queue_id: {song['queue_id']})")
+        # In a fair queue mode the song goes in its singer's next turn rather than last.
+        before = session.enqueue(song)
+        patch = {"item": song} if before is None else {"item": song, "before": before}
+        await emit_session_patch(session_code, session, "queue_item_added", patch)
+    # Songs people actually sing rank highest in search suggestions.
+    suggestion_index.record_queued(song.get("title") or "")
+    logger.debug(f"Song added by {song['added_by']} to {session_code} (queue_id: {song['queue_id']})")
 
 @sio.event
 async def remove_song(sid, data):
@@ -33,28 +51,86 @@ async def remove_song(sid, data):
     user_id = data.get("user_id")
 
     if not all([session_code, queue_id, user_id]):
-        print("Invalid remove_song request: missing data.")
+        logger.warning("Invalid remove_song request: missing data.")
         return
 
-    if session_code not in SESSIONS:
-        return
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            return
 
-    # Check if user is authorized (can be host or the user who added it)
-    queue = SESSIONS[session_code]["queue"]
-    song_to_remove = next((s for s in queue if s.get("queue_id") == queue_id), None)
-    
-    # Simple authorization: for now, only the user who added it can remove it.
-    # You could expand this to allow the host to remove any song.
-    if not song_to_remove or song_to_remove.get("added_by") != user_id:
-        print(f"Unauthorized remove_song attempt by {user_id} for queue item {queue_id}")
-        return
+        # Check if user is authorized (can be host or the user who added it)
+        song_to_remove = session.queue.get(queue_id)
+
+        # Simple authorization: for now, only the user who added it can remove it.
+        # You could expand this to allow the host to remove any song.
+        if not song_to_remove or song_to_remove.get("added_by") != user_id:
+            logger.warning(f"Unauthorized remove_song attempt by {user_id} for queue item {queue_id}")
+            return
+
+        before = len(session.queue)
+        # Unlink the item with the matching queue_id. The host removes the current song
+        # when it has been sung or skipped; a remote removing its own song withdraws it.
+        session.dequeue(queue_id, sung=sid == session.host_sid)
+        after = len(session.queue)
+        logger.debug(f"User {user_id} removed song with queue_id {queue_id} from {session_code}: {before} → {after}")
+
+        await emit_session_patch(session_code, session, "queue_item_removed", {"queue_id": queue_id})
+
+async def _apply_batch(sid, event: str, session_code, apply):
+    """
+    Runs one batch edit under the session lock and broadcasts it as a single patch.
+    `apply(session)` returns (patch event, patch payload) or raises QueueBatchError,
+    in which case nothing changed and the sender gets `queue_batch_rejected`.
+    """
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            return
+        try:
+            patch_event, payload = apply(session)
+        except QueueBatchError as e:
+            logger.warning(f"[{event}] Rejected batch from {sid} for session {session_code}: {e}")
+            await sio.emit("queue_batch_rejected", {"event": event, "message": str(e)}, to=sid)
+            return
+        await emit_session_patch(session_code, session, patch_event, payload)
 
-    before = len(queue)
-    # Filter the queue, removing the item with the matching queue_id
-    SESSIONS[session_code]["queue"] = [
-        s for s in queue if s.get("queue_id") != queue_id
-    ]
-    after = len(SESSIONS[session_code]["queue"])
-    print(f"User {user_id} removed song with queue_id {queue_id} from {session_code}: {before} → {after}")
 
-    await sio.emit("session_updated", SESSIONS[session_code], room=session_code)
\ No newline at end of file
+@sio.event
+async def add_songs(sid, data):
+    """
+    Adds several songs in one go, e.g. an imported playlist.
+    :param data: {'session_code': str, 'songs': [song, ...]}, each song as for `add_song`.
+    """
+    def apply(session):
+        items, moves = queue_batch.add_songs(session, data.get("songs"))
+        return "queue_items_added", {"items": items, "moves": moves}
+
+    await _apply_batch(sid, "add_songs", data.get("session_code"), apply)
+
+
+@sio.event
+async def remove_songs(sid, data):
+    """
+    Removes several songs in one go. The host may remove any; a remote only its own.
+    :param data: {'session_code': str, 'queue_ids': [str, ...], 'user_id': str}
+    """
+    def apply(session):
+        queue_ids = queue_batch.remove_songs(
+            session, data.get("queue_ids"), data.get("user_id"), is_host=session.host_sid == sid)
+        return "queue_items_removed", {"queue_ids": queue_ids}
+
+    await _apply_batch(sid, "remove_songs", data.get("session_code"), apply)
+
+
+@sio.event
+async def reorder_queue(sid, data):
+    """
+    Host only: moves songs by queue_id without resending the queue.
+    :param data: {'session_code': str, 'moves': [{'queue_id': str, 'before': str | None}, ...]}
+    """
+    def apply(session):
+        if session.host_sid != sid:
+            raise queue_batch.QueueBatchForbiddenError("Only the host can reorder the queue.")
+        moves = queue_batch.move_songs(session, data.get("moves"))
+        return "queue_items_moved", {"moves": moves}
+
+    await _apply_batch(sid, "reorder_queue", data.get("session_code"), apply)
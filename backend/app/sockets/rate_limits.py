@@ -0,0 +1,177 @@
+# File: backend/app/sockets/rate_limits.py
+import functools
+import logging
+import math
+import os
+import time
+from collections import OrderedDict
+from app.services.metrics import socket_rate_limited
+
+logger = logging.getLogger(__name__)
+
+# Token buckets per event, as "<per socket>,<per session>". Each limit is
+# "<burst>/<seconds>": up to `burst` events at once, refilled at burst/seconds.
+# An empty or "0" limit disables that level. Override one event with
+# SOCKET_RATE_LIMIT_<EVENT>, e.g. SOCKET_RATE_LIMIT_ADD_SONG="5/10,30/10".
+DEFAULT_RATE_LIMITS = {
+    "add_song": "5/10,30/10",
+    "remove_song": "10/10,60/10",
+    # Batches count once however many songs they carry; MAX_QUEUE_BATCH bounds their size.
+    "add_songs": "2/10,10/10",
+    "remove_songs": "5/10,20/10",
+    "reorder_queue": "10/10,",
+    "player_control": "5/5,15/5",
+    "change_setting": "5/10,10/10",
+    "remote_wants_to_start": "2/10,5/10",
+    "host_started_session": "2/10,",
+    "player_state_updated": "20/10,",
+    "song_finished": "5/10,",
+    "get_player_state": "10/10,",
+    "get_full_session": "10/10,",
+    "resume_session": "10/10,",
+    "search_songs": "5/10,30/10",
+    "kick_user": "5/10,",
+}
+SOCKET_RATE_LIMITS_ENABLED = os.getenv("SOCKET_RATE_LIMITS_ENABLED", "true").lower() not in ("0", "false", "no")
+# Per-session buckets kept at most; the least recently used are forgotten first.
+RATE_LIMIT_MAX_SESSIONS = int(os.getenv("RATE_LIMIT_MAX_SESSIONS", "4096"))
+
+
+def parse_limit(spec: str) -> tuple[float, float] | None:
+    """"<burst>/<seconds>" -> (burst, tokens per second), or None when disabled."""
+    spec = spec.strip()
+    if not spec or spec == "0":
+        return None
+    burst, _, seconds = spec.partition("/")
+    burst, seconds = float(burst), float(seconds or 1)
+    if burst <= 0 or seconds <= 0:
+        return None
+    return burst, burst / seconds
+
+
+def load_rate_limits() -> dict[str, tuple[tuple[float, float] | None, tuple[float, float] | None]]:
+    limits = {}
+    if not SOCKET_RATE_LIMITS_ENABLED:
+        return limits
+    for event, default in DEFAULT_RATE_LIMITS.items():
+        spec = os.getenv(f"SOCKET_RATE_LIMIT_{event.upper()}", default)
+        per_sid, _, per_session = spec.partition(",")
+        limits[event] = (parse_limit(per_sid), parse_limit(per_session))
+    return limits
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "tokens", "updated", "warned")
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        # Set once the client has been told it is limited, so a flood gets one reply.
+        self.warned = False
+
+    def take(self, now: float) -> float:
+        """Spends a token. Returns 0 if one was available, else seconds until there is one."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.warned = False
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class SocketRateLimiter:
+    """
+    Token buckets per (socket, event) and per (session, event).
+
+    A socket's buckets go when it disconnects; session buckets are capped at
+    `max_sessions` and evicted least recently used, since anyone can name a code.
+    With several workers each keeps its own buckets, so session limits apply per worker.
+    """
+
+    def __init__(self, limits: dict, max_sessions: int = RATE_LIMIT_MAX_SESSIONS):
+        self.limits = limits
+        self.max_sessions = max_sessions
+        self._by_sid: dict[str, dict[str, TokenBucket]] = {}
+        self._by_session: OrderedDict[str, dict[str, TokenBucket]] = OrderedDict()
+
+    def check(self, event: str, sid: str, session_code: str | None) -> tuple[str, float, bool] | None:
+        """
+        Spends a token from each bucket that applies. Returns None if the event may
+        run, else (scope, retry_after, first_rejection).
+        """
+        per_sid, per_session = self.limits.get(event, (None, None))
+        now = time.monotonic()
+        if per_sid is not None:
+            bucket = self._bucket(self._by_sid.setdefault(sid, {}), event, per_sid)
+            if retry_after := bucket.take(now):
+                return self._rejected(bucket, "sid", retry_after)
+        if per_session is not None and session_code:
+            buckets = self._by_session.get(session_code)
+            if buckets is None:
+                buckets = self._by_session[session_code] = {}
+                if len(self._by_session) > self.max_sessions:
+                    self._by_session.popitem(last=False)
+            else:
+                self._by_session.move_to_end(session_code)
+            bucket = self._bucket(buckets, event, per_session)
+            if retry_after := bucket.take(now):
+                return self._rejected(bucket, "session", retry_after)
+        return None
+
+    @staticmethod
+    def _bucket(buckets: dict[str, TokenBucket], event: str, limit: tuple[float, float]) -> TokenBucket:
+        bucket = buckets.get(event)
+        if bucket is None:
+            bucket = buckets[event] = TokenBucket(*limit)
+        return bucket
+
+    @staticmethod
+    def _rejected(bucket: TokenBucket, scope: str, retry_after: float) -> tuple[str, float, bool]:
+        first = not bucket.warned
+        bucket.warned = True
+        return scope, retry_after, first
+
+    def forget_sid(self, sid: str):
+        self._by_sid.pop(sid, None)
+
+    def forget_session(self, session_code: str):
+        self._by_session.pop(session_code, None)
+
+
+socket_rate_limiter = SocketRateLimiter(load_rate_limits())
+
+
+def _session_code(args) -> str | None:
+    # Handlers take either the code itself or a dict carrying `session_code`.
+    data = args[1] if len(args) > 1 else None
+    if isinstance(data, dict):
+        code = data.get("session_code")
+        return code if isinstance(code, str) else None
+    return data if isinstance(data, str) else None
+
+
+def rate_limited(server, event: str, handler):
+    """
+    Wraps a handler so events over their limits are dropped. The first rejection
+    in a row gets a `rate_limited` reply: {"event": str, "retry_after": int seconds}.
+    Events without limits get the handler back unchanged.
+    """
+    if socket_rate_limiter.limits.get(event, (None, None)) == (None, None):
+        return handler
+
+    @functools.wraps(handler)
+    async def wrapper(*args):
+        sid = args[0]
+        rejection = socket_rate_limiter.check(event, sid, _session_code(args))
+        if rejection is None:
+            return await handler(*args)
+        scope, retry_after, first = rejection
+        socket_rate_limited.inc(event=event, scope=scope)
+        if first:
+            logger.info(f"Rate limited '{event}' from {sid} ({scope} limit)")
+            await server.emit("rate_limited", {"event": event, "retry_after": math.ceil(retry_after)}, to=sid)
+
+    return wrapper
@@ -0,0 +1,72 @@
+# File: backend/app/sockets/search_events.py
+import logging
+from app.sockets.socket_server import sio
+from app.services.search_cache import search_cache
+from app.services.search_executor import SearchOverloadedError, SearchTimeoutError
+from app.services.song_search import find_songs
+from app.services.suggestions import suggestion_index
+
+logger = logging.getLogger(__name__)
+
+
+@sio.event
+async def search_songs(sid, data):
+    """
+    Progressive search. Embeddable results are emitted to the requesting client as
+    soon as they are verified, instead of after every oEmbed check has finished.
+    :param data: {'query': str, 'request_id': str}
+    Emits 'search_results_batch' {'request_id': str, 'results': list} one or more times,
+    then 'search_complete' {'request_id': str, 'status': 'OK' | 'error', 'total': int, 'message'?: str}.
+    """
+    query = (data.get("query") or "").strip()
+    request_id = data.get("request_id")
+    if len(query) < 2:
+        await sio.emit("search_complete", {
+            "request_id": request_id, "status": "error", "total": 0,
+            "message": "Search query must be at least 2 characters."
+        }, to=sid)
+        return
+
+    suggestion_index.record_query(query)
+
+    async def emit_batch(results):
+        await sio.emit("search_results_batch", {"request_id": request_id, "results": results}, to=sid)
+
+    streamed = False
+
+    async def fetch():
+        nonlocal streamed
+        streamed = True
+        return await find_songs(query, on_batch=emit_batch)
+
+    try:
+        # Shares the REST endpoint's cache: a cached or already in-flight query is
+        # answered from it, and a fresh fetch is stored for later pages and searches.
+        results = await search_cache.get_or_fetch(query, fetch)
+    except SearchOverloadedError:
+        logger.warning(f"Search pool is saturated, rejecting query '{query}' from {sid}")
+        await sio.emit("search_complete", {
+            "request_id": request_id, "status": "error", "total": 0,
+            "message": "Search is busy right now. Please try again in a moment."
+        }, to=sid)
+        return
+    except SearchTimeoutError:
+        logger.warning(f"YouTube search timed out for query '{query}' from {sid}")
+        await sio.emit("search_complete", {
+            "request_id": request_id, "status": "error", "total": 0,
+            "message": "YouTube took too long to respond. Please try again."
+        }, to=sid)
+        return
+    except Exception as e:
+        logger.error(f"An unexpected error occurred during streamed search for query '{query}': {e}")
+        await sio.emit("search_complete", {
+            "request_id": request_id, "status": "error", "total": 0,
+            "message": "An error occurred while searching. Please try again."
+        }, to=sid)
+        return
+
+    # Cached (or coalesced) results are all available at once, so they go out as one batch.
+    if not streamed and results:
+        await emit_batch(results)
+
+    await sio.emit("search_complete", {"request_id": request_id, "status": "OK", "total": len(results)}, to=sid)
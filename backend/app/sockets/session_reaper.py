@@ -0,0 +1,66 @@
+# File: backend/app/sockets/session_reaper.py
+import asyncio
+import logging
+import os
+import time
+from app.sockets.socket_server import sio
+from app.sockets.core import end_session
+from app.state import session_store
+
+logger = logging.getLogger(__name__)
+
+# A session nobody has touched for this long is ended.
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", str(6 * 3600)))
+# A session created through /api/session/create that no host registered for within this long is ended.
+SESSION_UNCLAIMED_TTL_SECONDS = float(os.getenv("SESSION_UNCLAIMED_TTL_SECONDS", str(30 * 60)))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))
+
+
+class SessionReaper:
+    """
+    Background task that ends abandoned sessions. Each sweep asks the store for
+    the sessions past their TTL, which it answers from time-ordered indexes, so
+    a sweep costs as much as there is to reap.
+    """
+
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.reaped = 0
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_periodically())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _sweep_periodically(self):
+        while True:
+            await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Session sweep failed: {e}")
+
+    async def sweep(self) -> int:
+        now = time.time()
+        codes = await session_store.expired(now - SESSION_IDLE_TTL_SECONDS, now - SESSION_UNCLAIMED_TTL_SECONDS)
+        reaped = 0
+        for code in codes:
+            # Sockets still in the room mean someone is there, even if nothing has changed lately.
+            # (Only this worker's sockets are visible; keep the TTLs generous with several workers.)
+            if next(iter(sio.manager.get_participants("/", code)), None) is not None:
+                await session_store.touch(code)
+                await session_store.claim(code)
+                continue
+            await end_session(code, "This session has ended because it was inactive.")
+            reaped += 1
+        if reaped:
+            self.reaped += reaped
+            logger.info(f"Reaped {reaped} inactive session(s)")
+        return reaped
+
+
+session_reaper = SessionReaper()
@@ -0,0 +1,219 @@
+# File: backend/app/sockets/session_sync.py
+import asyncio
+import itertools
+import logging
+import os
+from collections import OrderedDict, deque
+from app.sockets.socket_server import sio
+from app.services.payload_json import RawJSON, encode, payload_stats
+from app.services.session_model import Session
+
+logger = logging.getLogger(__name__)
+
+# Patch events sent to a room instead of the full session dict.
+# Every patch carries the session's new `revision`; a client that sees a gap
+# (revision != last_seen + 1) asks for a resync through `get_full_session`.
+#   queue_item_added    -> {"revision": int, "item": dict, "before"?: str}
+#   queue_item_removed  -> {"revision": int, "queue_id": str}
+#   queue_items_added   -> {"revision": int, "items": [dict, ...], "moves": [move, ...]}
+#   queue_items_removed -> {"revision": int, "queue_ids": [str, ...]}
+#   queue_items_moved   -> {"revision": int, "moves": [{"queue_id": str, "before": str | None}, ...]}
+#   user_joined         -> {"revision": int, "user": dict}
+#   user_left           -> {"revision": int, "user_id": str}
+#   session_started     -> {"revision": int}
+# New songs are appended, then placed by `before` or `moves` when a fair queue mode
+# puts them ahead of others.
+#   setting_updated     -> {"revision": int, "key": str, "value": any}
+#   leaderboard_changed -> {"revision": int, "entries": [{"id", "name", "score", "performances", "rank"}, ...]}
+# Patches made within the coalescing window go out together as one event:
+#   session_patches     -> {"patches": [{"event": str, "revision": int, ...}, ...]}
+# The same event carries the patches a client missed when it resumes after a
+# reconnect (`resume_session`).
+
+# Patches to the same room within this window are merged into a single emit. 0 disables it.
+BROADCAST_COALESCE_MS = float(os.getenv("BROADCAST_COALESCE_MS", "50"))
+# Upper bound on how long a patch may wait while later patches keep extending the window.
+BROADCAST_MAX_DELAY_MS = float(os.getenv("BROADCAST_MAX_DELAY_MS", "200"))
+# Serialized `session_updated` snapshots kept for reuse, one per session.
+SNAPSHOT_CACHE_SIZE = int(os.getenv("SNAPSHOT_CACHE_SIZE", "1024"))
+# Recent patches kept per session for clients resuming after a reconnect (see `PatchLog`),
+# and sessions that have one. 0 disables replay; resuming clients then get a snapshot.
+REPLAY_BUFFER_PATCHES = int(os.getenv("REPLAY_BUFFER_PATCHES", "256"))
+REPLAY_BUFFER_SESSIONS = int(os.getenv("REPLAY_BUFFER_SESSIONS", "1024"))
+
+
+class PatchCoalescer:
+    """
+    Per-room broadcast scheduler.
+
+    The first patch for a room opens a window; every patch within it pushes the
+    flush back by `window`, but never past `max_delay` after the first one. The
+    room then gets one emit: the patch itself if it was alone, otherwise a
+    `session_patches` batch in revision order.
+    """
+
+    def __init__(self, window_seconds: float, max_delay_seconds: float):
+        self.window = window_seconds
+        self.max_delay = max(max_delay_seconds, window_seconds)
+        # room -> [(event, patch)]
+        self._pending: dict[str, list[tuple[str, dict]]] = {}
+        self._deadlines: dict[str, float] = {}
+        self._flush_at: dict[str, float] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    async def add(self, room: str, event: str, patch: dict):
+        if self.window <= 0:
+            await sio.emit(event, patch, room=room)
+            return
+
+        now = asyncio.get_running_loop().time()
+        pending = self._pending.setdefault(room, [])
+        if not pending:
+            self._deadlines[room] = now + self.max_delay
+        pending.append((event, patch))
+        self._flush_at[room] = min(now + self.window, self._deadlines[room])
+        if room not in self._tasks:
+            self._tasks[room] = asyncio.create_task(self._flush_when_due(room))
+
+    async def _flush_when_due(self, room: str):
+        loop = asyncio.get_running_loop()
+        while (delay := self._flush_at[room] - loop.time()) > 0:
+            await asyncio.sleep(delay)
+        self._tasks.pop(room, None)
+        await self._emit(room, self._take(room))
+
+    def _take(self, room: str) -> list[tuple[str, dict]]:
+        self._deadlines.pop(room, None)
+        self._flush_at.pop(room, None)
+        return self._pending.pop(room, [])
+
+    async def _emit(self, room: str, patches: list[tuple[str, dict]]):
+        try:
+            if len(patches) == 1:
+                event, patch = patches[0]
+                await sio.emit(event, patch, room=room)
+            elif patches:
+                batch = [{"event": event, **patch} for event, patch in patches]
+                await sio.emit("session_patches", {"patches": batch}, room=room)
+        except Exception as e:
+            logger.error(f"Failed to broadcast {len(patches)} patch(es) to room {room}: {e}")
+
+    async def flush(self, room: str):
+        """Sends the room's pending patches now."""
+        task = self._tasks.pop(room, None)
+        if task is not None:
+            task.cancel()
+        await self._emit(room, self._take(room))
+
+    def discard(self, room: str):
+        """Drops the room's pending patches, e.g. because the session was deleted."""
+        task = self._tasks.pop(room, None)
+        if task is not None:
+            task.cancel()
+        self._take(room)
+
+    async def flush_all(self):
+        for room in list(self._pending):
+            await self.flush(room)
+
+
+patch_coalescer = PatchCoalescer(BROADCAST_COALESCE_MS / 1000, BROADCAST_MAX_DELAY_MS / 1000)
+
+
+class PatchLog:
+    """
+    The last few patches of each session, by revision, so a client that lost its
+    connection for a moment can be sent just what it missed.
+
+    Each session's patches sit in a ring buffer holding consecutive revisions only;
+    a revision bumped without a patch (such as a restore) empties it. Patches made
+    on another worker never reach this one, so `since` replays nothing unless it has
+    every revision the client is missing.
+    """
+
+    def __init__(self, max_patches: int, max_sessions: int):
+        self.max_patches = max_patches
+        self.max_sessions = max_sessions
+        # session_code -> deque of {"event": str, "revision": int, ...}
+        self._logs: OrderedDict[str, deque] = OrderedDict()
+
+    def record(self, session_code: str, event: str, patch: dict):
+        if self.max_patches <= 0:
+            return
+        log = self._logs.get(session_code)
+        if log is None or (log and log[-1]["revision"] != patch["revision"] - 1):
+            log = self._logs[session_code] = deque(maxlen=self.max_patches)
+        log.append({"event": event, **patch})
+        self._logs.move_to_end(session_code)
+        while len(self._logs) > self.max_sessions:
+            self._logs.popitem(last=False)
+
+    def since(self, session_code: str, revision: int, current: int) -> list[dict] | None:
+        """
+        The patches after `revision` up to `current`, or None when they aren't all here.
+        """
+        if revision == current:
+            return []
+        log = self._logs.get(session_code)
+        if not log or revision > current or log[0]["revision"] > revision + 1 or log[-1]["revision"] != current:
+            return None
+        # Revisions are consecutive, so the first missed patch sits at a known offset.
+        return list(itertools.islice(log, revision + 1 - log[0]["revision"], None))
+
+    def forget(self, session_code: str):
+        self._logs.pop(session_code, None)
+
+
+patch_log = PatchLog(REPLAY_BUFFER_PATCHES, REPLAY_BUFFER_SESSIONS)
+
+
+# session_code -> (revision, serialized snapshot, size in bytes)
+_snapshots: OrderedDict[str, tuple[int, RawJSON, int]] = OrderedDict()
+
+
+def session_snapshot(session_code: str, session: Session) -> RawJSON:
+    """
+    The serialized `session_updated` payload for the session's current revision.
+    Encoded once per revision and reused by every client that asks for it until
+    the next patch.
+    """
+    cached = _snapshots.get(session_code)
+    if cached is not None and cached[0] == session.revision:
+        _snapshots.move_to_end(session_code)
+        payload_stats.record_reused(cached[2])
+        return cached[1]
+
+    snapshot = RawJSON(encode(session.to_public_dict()))
+    size = len(snapshot.text.encode())
+    payload_stats.record_encoded(snapshot.text, size)
+    _snapshots[session_code] = (session.revision, snapshot, size)
+    _snapshots.move_to_end(session_code)
+    while len(_snapshots) > SNAPSHOT_CACHE_SIZE:
+        _snapshots.popitem(last=False)
+    return snapshot
+
+
+def forget_session(session_code: str):
+    """Drops pending patches, the replay buffer and the cached snapshot of a deleted session."""
+    patch_coalescer.discard(session_code)
+    patch_log.forget(session_code)
+    _snapshots.pop(session_code, None)
+
+
+def bump_revision(session: Session) -> int:
+    """Advances the session revision and returns the new value."""
+    session.revision += 1
+    return session.revision
+
+
+async def emit_session_patch(session_code: str, session: Session, event: str, payload: dict):
+    """
+    Bumps the session revision and queues a single patch event for the room.
+    Call it while holding the session through `session_store.edit`, so patches go
+    out in revision order. Patches are coalesced per room (see `PatchCoalescer`);
+    latency-critical messages such as `player_control` are emitted directly instead.
+    """
+    revision = bump_revision(session)
+    patch = {"revision": revision, **payload}
+    patch_log.record(session_code, event, patch)
+    await patch_coalescer.add(session_code, event, patch)
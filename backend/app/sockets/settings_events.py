@@ -1,6 +1,12 @@
 # File: backend/app/sockets/settings_events.py
+import logging
 from app.sockets.socket_server import sio
-from app.state import SESSIONS
+from app.state import session_store
+from app.sockets.session_sync import emit_session_patch
+from app.services.fair_queue import QUEUE_MODES
+
+logger = logging.getLogger(__name__)
+
 
 @sio.event
 async def change_setting(sid, data):
@@ -13,16 +19,28 @@ async def change_setting(sid, data):
     key = data.get("key")
     value = data.get("value")
 
-    if not all([session_code, key, session_code in SESSIONS]):
-        print(f"[change_setting] Invalid request from {sid}")
+    if not all([session_code, key]):
+        logger.warning(f"[change_setting] Invalid request from {sid}")
         return
 
-    # Update the setting directly in the session's state
-    if "settings" not in SESSIONS[session_code]:
-         SESSIONS[session_code]["settings"] = {} # Defensive coding
-    SESSIONS[session_code]["settings"][key] = value
-    
-    print(f"Session '{session_code}' setting '{key}' changed to '{value}'. Broadcasting.")
+    async with session_store.edit(session_code) as session:
+        if session is None:
+            logger.warning(f"[change_setting] Invalid request from {sid}")
+            return
+
+        if key == "queueMode":
+            if value not in QUEUE_MODES:
+                logger.warning(f"[change_setting] Unknown queue mode '{value}' from {sid}")
+                return
+            # Switching to a fair mode puts the waiting songs in rotation order right away.
+            moves = session.set_queue_mode(value)
+            if moves:
+                await emit_session_patch(session_code, session, "queue_items_moved", {"moves": moves})
+        else:
+            # Update the setting directly in the session's state
+            session.settings[key] = value
+
+        logger.info(f"Session '{session_code}' setting '{key}' changed to '{value}'. Broadcasting.")
 
-    # Broadcast the specific setting change to all clients in the room
-    await sio.emit("setting_updated", {"key": key, "value": value}, room=session_code)
\ No newline at end of file
+        # Broadcast the specific setting change to all clients in the room
+        await emit_session_patch(session_code, session, "setting_updated", {"key": key, "value": value})
\ No newline at end of file
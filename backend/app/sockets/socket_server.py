@@ -1,6 +1,11 @@
 # File: backend/app/sockets/socket_server.py
+import logging
 import socketio
 import os
+from app.services import payload_json
+from app.sockets.instrumentation import InstrumentedAsyncServer
+
+logger = logging.getLogger(__name__)
 # ❌ --- REMOVE THESE ---
 # from dotenv import load_dotenv
 # load_dotenv()
@@ -8,13 +13,27 @@ import os
 # This code now runs AFTER main.py has loaded the environment.
 # It will correctly find the ALLOWED_ORIGINS variable.
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*").split(",")
-print(f"✅ Socket.IO server configured with origins: {allowed_origins}") # Helpful debug print
+logger.info(f"Socket.IO server configured with origins: {allowed_origins}")
+
+# With a shared Redis-protocol server, rooms and broadcasts reach sockets held by
+# every worker (and host), not just the one handling the event.
+redis_url = os.getenv("REDIS_URL", "")
+client_manager = socketio.AsyncRedisManager(redis_url) if redis_url else None
+
+# Long-polling responses at least this large are gzip/deflate compressed. WebSocket
+# frames are compressed by the ASGI server through permessage-deflate (see runserver.bat).
+compression_threshold = int(os.getenv("SOCKET_COMPRESSION_THRESHOLD", "1024"))
 
 # The server is now created with the correct configuration
-sio = socketio.AsyncServer(
+sio = InstrumentedAsyncServer(
     cors_allowed_origins=allowed_origins,
-    async_mode="asgi"
+    async_mode="asgi",
+    client_manager=client_manager,
+    # Encodes packets with orjson when available and splices pre-serialized payloads in as-is.
+    json=payload_json,
+    http_compression=True,
+    compression_threshold=compression_threshold,
 )
 
 # Import all socket event handlers
-from . import core, queue_events,player_events,settings_events 
\ No newline at end of file
+from . import core, queue_events,player_events,settings_events,search_events,leaderboard_events 
\ No newline at end of file
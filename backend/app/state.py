@@ -1,4 +1,11 @@
-# This file holds the shared, in-memory state of the application.
+# This file holds the shared state of the application.
 # By keeping it separate, we avoid circular import errors.
+from app.services.session_snapshots import SessionSnapshotter
+from app.services.session_store import create_session_store
 
-SESSIONS = {}
\ No newline at end of file
+# Sessions and connected sockets. Kept in this process by default, or in a
+# Redis-protocol server shared by every worker when REDIS_URL is set.
+session_store = create_session_store()
+
+# Writes in-memory sessions to local disk and reloads them at startup.
+session_snapshotter = SessionSnapshotter(session_store)
@@ -0,0 +1,321 @@
+# File: backend/benchmarks/load_test.py
+"""
+Load test for the Socket.IO + REST surface.
+
+Starts `benchmarks.stub_server` in a subprocess, then simulates N rooms, each
+with one host and M remotes. Every remote joins over REST, binds its socket and
+sends bursts of add_song / remove_song / player_control while everyone in the
+room measures how long each broadcast took to reach them.
+
+    cd backend
+    python -m benchmarks.load_test --rooms 20 --remotes 10 --bursts 5
+
+Results are printed and written as JSON (see --output) so runs can be compared.
+Server settings such as BROADCAST_COALESCE_MS are read from the environment,
+as in production, and recorded in the results.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+import httpx
+import websockets
+
+RECORDED_SETTINGS = (
+    "BROADCAST_COALESCE_MS", "BROADCAST_MAX_DELAY_MS", "SOCKET_JSON_ENCODER",
+    "REDIS_URL", "STUB_SEARCH_LATENCY", "STUB_OEMBED_LATENCY",
+)
+
+
+class Metrics:
+    def __init__(self):
+        # kind -> latencies in seconds, from the sender's emit to a recipient's receive
+        self.latencies: dict[str, list[float]] = {"queue_item_added": [], "queue_item_removed": [], "player_control": []}
+        # marker -> send time; markers are song ids, queue ids and player_control ids
+        self.sent_at: dict[str, float] = {}
+        # Socket.IO messages received; one coalesced `session_patches` message counts once.
+        self.events_received = 0
+        # Individual queue patches applied, whether they arrived alone or batched.
+        self.patches_received = 0
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self.rest_requests = 0
+        self.rest_errors = 0
+
+    def record(self, kind: str, marker: str | None, received_at: float):
+        sent_at = self.sent_at.get(marker)
+        if sent_at is not None:
+            self.latencies[kind].append(received_at - sent_at)
+
+
+class BenchClient:
+    """
+    The smallest Socket.IO (protocol v5 over Engine.IO v4) client that can take
+    part: websocket transport only, no acks, no binary packets.
+    """
+
+    def __init__(self, url: str, metrics: Metrics):
+        self.url = url.replace("http", "ws", 1) + "/socket.io/?EIO=4&transport=websocket"
+        self.metrics = metrics
+        self.handlers = {}
+        self._ws = None
+        self._reader = None
+
+    async def connect(self):
+        self._ws = await websockets.connect(self.url, compression="deflate", max_size=None)
+        await self._ws.recv()  # Engine.IO open packet
+        await self._ws.send("40")
+        while not (await self._ws.recv()).startswith("40"):
+            pass
+        self._reader = asyncio.create_task(self._read())
+
+    async def emit(self, event: str, data):
+        message = "42" + json.dumps([event, data], separators=(",", ":"))
+        self.metrics.bytes_sent += len(message)
+        await self._ws.send(message)
+
+    def on(self, event: str, handler):
+        self.handlers[event] = handler
+
+    async def _read(self):
+        try:
+            async for message in self._ws:
+                received_at = time.perf_counter()
+                if message == "2":  # Engine.IO ping
+                    await self._ws.send("3")
+                    continue
+                if not message.startswith("42"):
+                    continue
+                self.metrics.bytes_received += len(message)
+                self.metrics.events_received += 1
+                event, *args = json.loads(message[2:])
+                handler = self.handlers.get(event)
+                if handler is not None:
+                    handler(args[0] if args else None, received_at)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            await self._reader
+
+
+def watch_room(client: BenchClient, metrics: Metrics, queue_ids: dict | None = None):
+    """Measures fan-out latency for every queue patch this client receives."""
+
+    def apply(event, patch, received_at):
+        metrics.patches_received += 1
+        if event == "queue_item_added":
+            item = patch["item"]
+            metrics.record(event, item.get("song_id"), received_at)
+            if queue_ids is not None:
+                queue_ids[item["song_id"]] = item["queue_id"]
+        elif event == "queue_item_removed":
+            metrics.record(event, patch["queue_id"], received_at)
+
+    client.on("queue_item_added", lambda patch, t: apply("queue_item_added", patch, t))
+    client.on("queue_item_removed", lambda patch, t: apply("queue_item_removed", patch, t))
+    client.on("session_patches", lambda batch, t: [apply(p["event"], p, t) for p in batch["patches"]])
+
+
+async def run_room(room_index: int, args, http: httpx.AsyncClient, metrics: Metrics, ready: asyncio.Barrier):
+    response = await http.post("/api/session/create", json={})
+    metrics.rest_requests += 1
+    created = response.json()
+    code = created["session_code"]
+
+    host = BenchClient(args.url, metrics)
+    await host.connect()
+    watch_room(host, metrics)
+    host.on("player_control", lambda data, t: metrics.record("player_control", data.get("bench_id"), t))
+    await host.emit("register_host", {"session_code": code, "host_token": created["host_token"]})
+
+    remotes = []
+    for remote_index in range(args.remotes):
+        user = {"id": f"user-{room_index}-{remote_index}", "name": f"Singer {remote_index}"}
+        response = await http.post("/api/user/join", json={"session_code": code, **user})
+        metrics.rest_requests += 1
+        if response.status_code != 200:
+            metrics.rest_errors += 1
+            continue
+        client = BenchClient(args.url, metrics)
+        await client.connect()
+        queue_ids = {}
+        watch_room(client, metrics, queue_ids)
+        await client.emit("join_room", code)
+        await client.emit("register_user", user)
+        remotes.append((client, user, queue_ids))
+
+    # Start the bursts in every room at once, like a party right after the host hits start.
+    await ready.wait()
+    await asyncio.gather(*[run_remote(code, room_index, client, user, queue_ids, args, http, metrics)
+                           for client, user, queue_ids in remotes])
+    await asyncio.sleep(args.settle)
+
+    await asyncio.gather(host.close(), *[client.close() for client, _, _ in remotes])
+    await http.delete(f"/api/session/{code}")
+
+
+async def run_remote(code, room_index, client, user, queue_ids, args, http, metrics):
+    for burst in range(args.bursts):
+        song_ids = []
+        for n in range(args.songs_per_burst):
+            song_id = f"s-{room_index}-{user['id']}-{burst}-{n}"
+            song_ids.append(song_id)
+            metrics.sent_at[song_id] = time.perf_counter()
+            await client.emit("add_song", {
+                "session_code": code,
+                "song": {"song_id": song_id, "title": f"Song {n}", "added_by": user["id"]},
+            })
+
+        if args.search_every and burst % args.search_every == 0:
+            response = await http.get("/api/youtube/search", params={"q": f"karaoke hits {burst}"})
+            metrics.rest_requests += 1
+            metrics.rest_errors += response.status_code != 200
+
+        # Wait for our own adds to come back so we know their queue ids, then remove half.
+        deadline = time.perf_counter() + args.settle
+        while any(song_id not in queue_ids for song_id in song_ids) and time.perf_counter() < deadline:
+            await asyncio.sleep(0.01)
+        for song_id in song_ids[::2]:
+            queue_id = queue_ids.get(song_id)
+            if queue_id is None:
+                continue
+            metrics.sent_at[queue_id] = time.perf_counter()
+            await client.emit("remove_song", {"session_code": code, "queue_id": queue_id, "user_id": user["id"]})
+
+        bench_id = str(uuid.uuid4())
+        metrics.sent_at[bench_id] = time.perf_counter()
+        await client.emit("player_control", {
+            "session_code": code, "action": "toggle_play_pause", "user": user, "bench_id": bench_id,
+        })
+        await asyncio.sleep(args.burst_interval)
+
+
+def percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def read_rss_kib(pid: int) -> dict:
+    """Current and peak resident set size of `pid`, from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+    except OSError:
+        return {"rss_kib": None, "peak_rss_kib": None}
+    to_kib = lambda key: int(fields[key].split()[0]) if key in fields else None
+    return {"rss_kib": to_kib("VmRSS"), "peak_rss_kib": to_kib("VmHWM")}
+
+
+async def wait_until_up(url: str, timeout: float = 20):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=url) as http:
+        while True:
+            try:
+                if (await http.get("/api/session/ping")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Stub server at {url} did not come up within {timeout}s")
+            await asyncio.sleep(0.2)
+
+
+async def run(args) -> dict:
+    metrics = Metrics()
+    server = None
+    if args.spawn:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.stub_server", "--port", str(args.port)],
+            stdout=subprocess.DEVNULL,
+        )
+    try:
+        await wait_until_up(args.url)
+        rss_before = read_rss_kib(server.pid) if server else {}
+        limits = httpx.Limits(max_connections=args.rooms * 2)
+        async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30) as http:
+            ready = asyncio.Barrier(args.rooms)
+            started = time.perf_counter()
+            await asyncio.gather(*[run_room(i, args, http, metrics, ready) for i in range(args.rooms)])
+            elapsed = time.perf_counter() - started
+        rss_after = read_rss_kib(server.pid) if server else {}
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    latency = {
+        kind: {
+            "count": len(values),
+            "p50_ms": round(percentile(values, 0.50) * 1000, 2) if values else None,
+            "p99_ms": round(percentile(values, 0.99) * 1000, 2) if values else None,
+            "max_ms": round(max(values) * 1000, 2) if values else None,
+        }
+        for kind, values in metrics.latencies.items()
+    }
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "scenario": {
+            "rooms": args.rooms, "remotes_per_room": args.remotes, "bursts": args.bursts,
+            "songs_per_burst": args.songs_per_burst, "burst_interval_s": args.burst_interval,
+            "search_every": args.search_every,
+        },
+        "settings": {name: os.getenv(name) for name in RECORDED_SETTINGS if os.getenv(name) is not None},
+        "elapsed_s": round(elapsed, 3),
+        "latency": latency,
+        "events_received": metrics.events_received,
+        "events_per_s": round(metrics.events_received / elapsed, 1),
+        "patches_received": metrics.patches_received,
+        "patches_per_s": round(metrics.patches_received / elapsed, 1),
+        "bytes_received": metrics.bytes_received,
+        "bytes_sent": metrics.bytes_sent,
+        "rest_requests": metrics.rest_requests,
+        "rest_errors": metrics.rest_errors,
+        "server_memory_before": rss_before,
+        "server_memory_after": rss_after,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rooms", type=int, default=10)
+    parser.add_argument("--remotes", type=int, default=10, help="remotes per room")
+    parser.add_argument("--bursts", type=int, default=5, help="bursts per remote")
+    parser.add_argument("--songs-per-burst", type=int, default=3)
+    parser.add_argument("--burst-interval", type=float, default=0.5, help="seconds between a remote's bursts")
+    parser.add_argument("--search-every", type=int, default=0, help="REST search every N bursts (0 disables)")
+    parser.add_argument("--settle", type=float, default=2.0, help="seconds to wait for stragglers")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--url", help="test an already running server instead of spawning the stub server")
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/load_test-<time>.json)")
+    args = parser.parse_args()
+
+    args.spawn = args.url is None
+    args.url = args.url or f"http://127.0.0.1:{args.port}"
+    results = asyncio.run(run(args))
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"load_test-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
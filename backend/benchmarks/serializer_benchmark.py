@@ -0,0 +1,213 @@
+# File: backend/benchmarks/serializer_benchmark.py
+"""
+Payload size and encode/decode CPU of the Socket.IO serializers.
+
+Builds typical payloads (a `session_updated` snapshot of a busy party and a page
+of `search_results_batch` results) and runs each through Socket.IO packet classes:
+JSON with the standard library, JSON with orjson (when installed) and
+python-socketio's MessagePack packets (when msgpack is installed). Sizes are
+reported raw and after deflate, which is what permessage-deflate puts on the wire.
+
+A `session_updated` snapshot is encoded once per revision and spliced into every
+later packet as-is (see `session_snapshot`); the "json-cached" row is the cost of
+such a repeat send. MessagePack would pack the snapshot on every send, which costs
+more than the cached JSON and comes out no smaller after deflate, so the server
+only speaks JSON.
+
+    cd backend
+    python -m benchmarks.serializer_benchmark --users 30 --queue 60 --results 20
+
+Results are printed and written as JSON (see --output) so runs can be compared.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import time
+import zlib
+from datetime import datetime, timezone
+
+import socketio
+from app.services import payload_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+    from socketio.msgpack_packet import MsgPackPacket
+except ImportError:
+    msgpack = None
+
+
+def session_payload(users: int, queue: int) -> dict:
+    members = [
+        {"id": f"user-{i:04d}", "name": f"Singer {i}", "avatarBase64": f"/api/avatar/{random.getrandbits(64):016x}.webp"}
+        for i in range(users)
+    ]
+    return {
+        "users": members,
+        "queue": [
+            {
+                "song_id": f"{random.getrandbits(40):010x}",
+                "title": f"Song number {i} (Karaoke Version) - Some Artist",
+                "duration": "3:45",
+                "added_by": random.choice(members)["id"],
+                "thumbnails": [f"https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg"],
+                "queue_id": f"{random.getrandbits(128):032x}",
+            }
+            for i in range(queue)
+        ],
+        "leaderboard": [
+            {"id": member["id"], "name": member["name"], "score": random.randint(0, 500), "performances": 3}
+            for member in members
+        ],
+        "settings": {"showScore": True, "queueMode": "fair"},
+        "is_started": True,
+        "revision": 1234,
+    }
+
+
+def search_payload(results: int) -> dict:
+    return {
+        "request_id": "1700000000000-abc123",
+        "results": [
+            {
+                "id": f"{random.getrandbits(40):010x}",
+                "title": f"Search result {i} karaoke with lyrics",
+                "channel": "Karaoke Channel",
+                "duration": "4:02",
+                "views": f"{random.randint(1000, 999999)} views",
+                "thumbnails": [f"https://i.ytimg.com/vi/{i:011d}/hqdefault.jpg"],
+            }
+            for i in range(results)
+        ],
+    }
+
+
+def serializers() -> dict:
+    """name -> (encode(event, payload), decode(encoded))"""
+    def json_codec(json_module):
+        class JSONPacket(socketio.packet.Packet):
+            json = json_module
+
+        def encode(event, payload):
+            return JSONPacket(socketio.packet.EVENT, data=[event, payload]).encode()
+
+        def decode(encoded):
+            return JSONPacket(encoded_packet=encoded).data
+
+        return encode, decode
+
+    codecs = {"json": json_codec(json)}
+    if orjson is not None:
+        class ORJSON:
+            @staticmethod
+            def dumps(value, **kwargs):
+                return orjson.dumps(value).decode()
+
+            @staticmethod
+            def loads(text, **kwargs):
+                return orjson.loads(text)
+
+        codecs["orjson"] = json_codec(ORJSON)
+    # What the server sends for a snapshot it already encoded at this revision.
+    encode_packet, decode_packet = json_codec(payload_json)
+    snapshots = {}
+
+    def encode_cached(event, payload):
+        snapshot = snapshots.get(id(payload))
+        if snapshot is None:
+            snapshot = snapshots[id(payload)] = payload_json.RawJSON(payload_json.encode(payload))
+        return encode_packet(event, snapshot)
+
+    codecs["json-cached"] = (encode_cached, decode_packet)
+    if msgpack is not None:
+        codecs["msgpack"] = (
+            lambda event, payload: MsgPackPacket(socketio.packet.EVENT, data=[event, payload]).encode(),
+            lambda encoded: MsgPackPacket(encoded_packet=encoded).data,
+        )
+    return codecs
+
+
+def measure(encode, decode, event: str, payload: dict, iterations: int) -> dict:
+    encoded = encode(event, payload)
+    raw = encoded.encode() if isinstance(encoded, str) else encoded
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    deflated = len(compressor.compress(raw) + compressor.flush(zlib.Z_SYNC_FLUSH))
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        encode(event, payload)
+    encode_us = (time.perf_counter() - started) / iterations * 1e6
+
+    started = time.perf_counter()
+    for _ in range(iterations):
+        decode(encoded)
+    decode_us = (time.perf_counter() - started) / iterations * 1e6
+
+    return {
+        "bytes": len(raw),
+        "deflated_bytes": deflated,
+        "encode_us": round(encode_us, 2),
+        "decode_us": round(decode_us, 2),
+    }
+
+
+def run(args) -> dict:
+    random.seed(args.seed)
+    payloads = {
+        "session_updated": session_payload(args.users, args.queue),
+        "search_results_batch": search_payload(args.results),
+    }
+    results = {}
+    for event, payload in payloads.items():
+        results[event] = {
+            name: measure(encode, decode, event, payload, args.iterations)
+            for name, (encode, decode) in serializers().items()
+            # Only snapshots are cached; search results are encoded as they arrive.
+            if name != "json-cached" or event == "session_updated"
+        }
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "scenario": {
+            "users": args.users, "queue": args.queue, "results": args.results,
+            "iterations": args.iterations, "seed": args.seed,
+        },
+        "missing": [name for name, module in (("orjson", orjson), ("msgpack", msgpack)) if module is None],
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=20, help="users in the session snapshot")
+    parser.add_argument("--queue", type=int, default=40, help="queued songs in the session snapshot")
+    parser.add_argument("--results", type=int, default=20, help="search results in the batch")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="JSON results path (default: benchmarks/results/serializer-<time>.json)")
+    args = parser.parse_args()
+
+    results = run(args)
+    for event, by_serializer in results["results"].items():
+        print(event)
+        for name, stats in by_serializer.items():
+            print(f"  {name:11} {stats['bytes']:>7} B  {stats['deflated_bytes']:>6} B deflated  "
+                  f"encode {stats['encode_us']:>8.1f} us  decode {stats['decode_us']:>8.1f} us")
+
+    output = args.output or os.path.join(
+        os.path.dirname(__file__), "results", f"serializer-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# File: backend/benchmarks/stub_server.py
+"""
+Runs the real ASGI app with YouTube and oEmbed replaced by local stubs, so load
+tests measure this server rather than YouTube.
+
+    python -m benchmarks.stub_server --port 8765
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+
+# Benchmarks must not read or grow the persistent caches and snapshots of a dev checkout.
+os.environ["EMBED_CACHE_DB"] = ""
+os.environ["SESSION_SNAPSHOT_PATH"] = ""
+os.environ["SONG_CATALOG_DB"] = ""
+os.environ["HALL_OF_FAME_DB"] = ""
+# Simulated remotes burst far past per-socket limits; measure the server, not the limiter.
+os.environ["SOCKET_RATE_LIMITS_ENABLED"] = "false"
+
+import uvicorn
+from app.main import app
+from app.services import search_executor
+from app.services.embeddability import embeddability_checker
+
+# Simulated upstream latencies, in seconds.
+STUB_SEARCH_LATENCY = float(os.getenv("STUB_SEARCH_LATENCY", "0.3"))
+STUB_OEMBED_LATENCY = float(os.getenv("STUB_OEMBED_LATENCY", "0.05"))
+
+
+class StubYoutubeSearch:
+    """Stands in for `youtube_search.YoutubeSearch`: same call shape, canned results."""
+
+    def __init__(self, query, max_results=10):
+        self.query = query
+        self.max_results = max_results
+
+    def to_dict(self):
+        # Blocking, like the real scrape, so the search pool is exercised as in production.
+        time.sleep(STUB_SEARCH_LATENCY)
+        slug = "".join(ch for ch in self.query.lower() if ch.isalnum())[:6] or "song"
+        return [
+            {
+                "id": f"{slug}{i:05d}",
+                "title": f"{self.query} karaoke #{i}",
+                "channel": "Stub Karaoke",
+                "duration": "3:45",
+                "views": f"{random.randint(1000, 999999)} views",
+                "thumbnails": [f"https://i.ytimg.com/vi/{slug}{i:05d}/hqdefault.jpg"],
+            }
+            for i in range(self.max_results)
+        ]
+
+
+async def stub_probe(video_id):
+    await asyncio.sleep(STUB_OEMBED_LATENCY)
+    # Roughly one video in ten has embedding disabled.
+    return hash(video_id) % 10 != 0, True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    search_executor.YoutubeSearch = StubYoutubeSearch
+    embeddability_checker._probe = stub_probe
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning", ws_per_message_deflate=True)
+
+
+if __name__ == "__main__":
+    main()
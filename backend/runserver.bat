@@ -4,6 +4,6 @@ echo Activating virtual environment...
 call .venv\Scripts\activate
 
 echo Starting FastAPI Socket.IO server on http://localhost:8000 ...
-uvicorn app.main:socket_app --host 0.0.0.0 --port 8000 --reload
+uvicorn app.main:socket_app --host 0.0.0.0 --port 8000 --reload --ws websockets --ws-per-message-deflate true
 
 pause
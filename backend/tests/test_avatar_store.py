@@ -0,0 +1,103 @@
+# backend/tests/test_avatar_store.py
+import asyncio
+import base64
+import io
+import os
+import pytest
+from app.services import avatar_store as avatar_store_module
+from app.services.avatar_store import (
+    AVATAR_URL_PREFIX,
+    AvatarError,
+    AvatarStore,
+    AvatarTooLargeError,
+    is_avatar_reference,
+    sniff_extension,
+)
+
+# A 1x1 red pixel.
+PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAIAAACQd1PeAAAADElEQVR42mP4z8AAAAMBAQD3A0FDAAAAAElFTkSuQmCC")
+
+
+def data_url(data: bytes, content_type: str = "image/png") -> str:
+    return f"data:{content_type};base64,{base64.b64encode(data).decode()}"
+
+
+@pytest.fixture
+def store(tmp_path):
+    return AvatarStore(str(tmp_path))
+
+
+@pytest.mark.parametrize("data, extension", [
+    (PNG, "png"),
+    (b"\xff\xd8\xff\xe0" + b"\x00" * 16, "jpg"),
+    (b"GIF89a" + b"\x00" * 16, "gif"),
+    (b"RIFF\x00\x00\x00\x00WEBPVP8 ", "webp"),
+    (b"  <svg xmlns='http://www.w3.org/2000/svg'></svg>", "svg"),
+    (b"<?xml version='1.0'?><svg></svg>", "svg"),
+    (b"<?xml version='1.0'?><html></html>", None),
+    (b"<html><svg></svg></html>", None),
+    (b"plain text", None),
+    (b"", None),
+])
+def test_sniff_extension_reads_the_leading_bytes(data, extension):
+    assert sniff_extension(data) == extension
+
+
+def test_the_type_comes_from_the_bytes_not_the_data_url(store):
+    reference = asyncio.run(store.to_reference(data_url(PNG, "image/svg+xml")))
+    assert reference.endswith(".png")
+
+
+def test_identical_uploads_share_one_file(store, tmp_path):
+    async def scenario():
+        return await store.to_reference(data_url(PNG)), await store.to_reference(data_url(PNG))
+
+    first, second = asyncio.run(scenario())
+    assert first == second
+    assert is_avatar_reference(first)
+    assert os.listdir(tmp_path) == [first[len(AVATAR_URL_PREFIX):]]
+    assert asyncio.run(store.load(first[len(AVATAR_URL_PREFIX):])) == PNG
+
+
+@pytest.mark.parametrize("avatar", [None, "", "/Avatars/3.svg", f"{AVATAR_URL_PREFIX}{'0' * 32}.png"])
+def test_bundled_avatars_and_references_pass_through(store, avatar):
+    assert asyncio.run(store.to_reference(avatar)) == avatar
+
+
+@pytest.mark.parametrize("avatar", [
+    "https://example.com/me.png",
+    "/Avatars/../secret.svg",
+    f"{AVATAR_URL_PREFIX}../../etc/passwd",
+    "data:image/png;base64,not base64!",
+    data_url(b"plain text", "image/png"),
+])
+def test_other_avatars_are_refused(store, avatar):
+    with pytest.raises(AvatarError):
+        asyncio.run(store.to_reference(avatar))
+
+
+def test_oversized_avatars_are_refused_before_and_after_decoding(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(avatar_store_module, "AVATAR_MAX_BYTES", 100)
+    with pytest.raises(AvatarTooLargeError):
+        asyncio.run(store.to_reference(data_url(PNG + b"\x00" * 64)))
+    with pytest.raises(AvatarTooLargeError):
+        asyncio.run(store.store(PNG + b"\x00" * 64))
+    assert asyncio.run(store.to_reference(data_url(PNG))).endswith(".png")
+    assert len(os.listdir(tmp_path)) == 1
+
+
+def test_load_only_reads_well_formed_ids(store, tmp_path):
+    (tmp_path / "notes.txt").write_bytes(b"secret")
+    assert asyncio.run(store.load("notes.txt")) is None
+    assert asyncio.run(store.load(f"{'0' * 32}.png")) is None
+
+
+def test_large_raster_avatars_are_downscaled(store, monkeypatch):
+    image_module = pytest.importorskip("PIL.Image")
+    monkeypatch.setattr(avatar_store_module, "AVATAR_MAX_DIMENSION", 16)
+    output = io.BytesIO()
+    image_module.new("RGB", (64, 32), "red").save(output, format="PNG")
+
+    avatar_id = asyncio.run(store.store(output.getvalue()))
+    with image_module.open(io.BytesIO(asyncio.run(store.load(avatar_id)))) as image:
+        assert image.size == (16, 8)
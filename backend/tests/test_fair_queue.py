@@ -0,0 +1,150 @@
+# backend/tests/test_fair_queue.py
+from app.services import fair_queue
+from app.services.fair_queue import FAIR, FAIR_WEIGHTED, FIFO, FairScheduler
+from app.services.session_model import Session
+
+
+def song(queue_id: str, user_id: str) -> dict:
+    return {"queue_id": queue_id, "song_id": queue_id, "title": queue_id, "added_by": user_id}
+
+
+def order(session: Session) -> list[str]:
+    return [entry["queue_id"] for entry in session.queue]
+
+
+def fair_session(mode: str = FAIR) -> Session:
+    return Session(settings={"showScore": True, "queueMode": mode})
+
+
+def test_fifo_appends_in_arrival_order():
+    session = fair_session(FIFO)
+    for queue_id, user_id in [("a1", "A"), ("a2", "A"), ("b1", "B")]:
+        assert session.enqueue(song(queue_id, user_id)) is None
+    assert order(session) == ["a1", "a2", "b1"]
+
+
+def test_fair_mode_gives_each_singer_one_song_per_round():
+    session = fair_session()
+    for queue_id, user_id in [("a1", "A"), ("a2", "A"), ("a3", "A"), ("b1", "B"), ("c1", "C"), ("b2", "B")]:
+        session.enqueue(song(queue_id, user_id))
+    assert order(session) == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+
+def test_enqueue_reports_the_song_it_was_put_in_front_of():
+    session = fair_session()
+    session.enqueue(song("a1", "A"))
+    session.enqueue(song("a2", "A"))
+    assert session.enqueue(song("b1", "B")) == "a2"
+    assert session.enqueue(song("a3", "A")) is None
+
+
+def test_playing_song_is_never_displaced():
+    session = fair_session(FAIR_WEIGHTED)
+    session.scheduler.sung["A"] = 1
+    session.enqueue(song("a1", "A"))
+    # B has sung less, so their tag sorts first, but a1 is already at the front.
+    assert session.enqueue(song("b1", "B")) is None
+    assert order(session) == ["a1", "b1"]
+
+
+def test_weighted_mode_pushes_frequent_singers_back(monkeypatch):
+    monkeypatch.setattr(fair_queue, "FAIR_SUNG_WEIGHT", 1.0)
+    session = fair_session(FAIR_WEIGHTED)
+    session.scheduler.sung.update({"A": 2})
+    session.enqueue(song("x1", "X"))
+    session.enqueue(song("a1", "A"))
+    session.enqueue(song("b1", "B"))
+    session.enqueue(song("b2", "B"))
+    assert order(session) == ["x1", "b1", "b2", "a1"]
+
+
+def test_removing_songs_keeps_the_others_in_place():
+    session = fair_session()
+    for queue_id, user_id in [("a1", "A"), ("a2", "A"), ("b1", "B"), ("b2", "B")]:
+        session.enqueue(song(queue_id, user_id))
+    assert order(session) == ["a1", "b1", "a2", "b2"]
+    session.dequeue("b1")
+    assert order(session) == ["a1", "a2", "b2"]
+
+
+def test_only_sung_songs_charge_a_turn():
+    session = fair_session()
+    session.enqueue(song("a1", "A"))
+    session.enqueue(song("a2", "A"))
+    session.dequeue("a2")
+    assert session.scheduler.sung == {}
+    session.dequeue("a1", sung=True)
+    assert session.scheduler.sung == {"A": 1}
+
+
+def test_withdrawn_song_gives_its_round_back():
+    session = fair_session()
+    session.enqueue(song("a1", "A"))
+    session.enqueue(song("a2", "A"))
+    session.dequeue("a2")
+    for queue_id in ("c1", "c2", "c3"):
+        session.enqueue(song(queue_id, "C"))
+    session.enqueue(song("a3", "A"))
+    assert order(session) == ["a1", "c1", "c2", "a3", "c3"]
+
+
+def test_scored_songs_count_as_sung():
+    session = fair_session()
+    session.enqueue(song("a1", "A"))
+    session.leaderboard.record("a1", "A", "Ann", 50)
+    session.dequeue("a1")
+    assert session.scheduler.sung == {"A": 1}
+
+
+def test_newcomers_start_at_the_round_now_playing():
+    session = fair_session()
+    for queue_id, user_id in [("a1", "A"), ("a2", "A"), ("a3", "A")]:
+        session.enqueue(song(queue_id, user_id))
+    session.dequeue("a1", sung=True)
+    session.dequeue("a2", sung=True)
+    session.enqueue(song("b1", "B"))
+    assert order(session) == ["a3", "b1"]
+
+
+def test_moved_song_stays_where_the_host_put_it():
+    session = fair_session()
+    for queue_id, user_id in [("a1", "A"), ("b1", "B"), ("a2", "A"), ("b2", "B")]:
+        session.enqueue(song(queue_id, user_id))
+    session.move_entry("b2", "b1")
+    assert order(session) == ["a1", "b2", "b1", "a2"]
+    session.move_entry("a1", None)
+    assert order(session) == ["b2", "b1", "a2", "a1"]
+    # A newcomer still gets the current round, without disturbing the moved songs.
+    session.enqueue(song("c1", "C"))
+    assert order(session) == ["b2", "b1", "c1", "a2", "a1"]
+
+
+def test_switching_to_fair_rotates_the_waiting_songs_behind_the_playing_one():
+    session = fair_session(FIFO)
+    for queue_id, user_id in [("b1", "B"), ("a1", "A"), ("a2", "A"), ("a3", "A"), ("b2", "B")]:
+        session.enqueue(song(queue_id, user_id))
+    session.set_queue_mode(FAIR)
+    # Within a round, songs keep the order they were queued in.
+    assert order(session) == ["b1", "a1", "a2", "b2", "a3"]
+    session.set_queue_mode(FIFO)
+    assert order(session) == ["b1", "a1", "a2", "b2", "a3"]
+    assert session.scheduler.to_dict() == {"sung": {}, "mode": FIFO}
+
+
+def test_saved_scheduler_places_songs_like_the_original():
+    session = fair_session()
+    for queue_id, user_id in [("a1", "A"), ("a2", "A"), ("b1", "B")]:
+        session.enqueue(song(queue_id, user_id))
+    session.dequeue("a1", sung=True)
+    restored = Session.from_dict(session.to_dict())
+    for copy in (session, restored):
+        copy.enqueue(song("c1", "C"))
+        copy.enqueue(song("a3", "A"))
+    assert order(restored) == order(session)
+    assert restored.scheduler.sung == {"A": 1}
+
+
+def test_from_dict_without_scheduler_state_starts_empty():
+    scheduler = FairScheduler.from_dict(None)
+    assert scheduler.mode == FIFO
+    assert scheduler.place(song("a1", "A")) is None
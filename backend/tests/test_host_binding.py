@@ -0,0 +1,92 @@
+# backend/tests/test_host_binding.py
+import asyncio
+import pytest
+# core is loaded through the server module, as the app does.
+from app.sockets import socket_server  # noqa: F401
+from app.sockets import core
+from app.services.session_model import Session
+from app.state import session_store
+
+
+class RecordingServer:
+    def __init__(self):
+        self.emits: list[tuple[str, dict | None, str | None]] = []
+        self.rooms: list[tuple[str, str]] = []
+
+    async def emit(self, event, data=None, to=None, room=None, **kwargs):
+        self.emits.append((event, data, to or room))
+
+    async def enter_room(self, sid, room, **kwargs):
+        self.rooms.append((sid, room))
+
+
+@pytest.fixture
+def server(monkeypatch):
+    recording = RecordingServer()
+    monkeypatch.setattr(core, "sio", recording)
+    return recording
+
+
+def run_with_session(scenario):
+    async def wrapper():
+        session = Session(host_token=Session.new_host_token())
+        code = await session_store.create(session)
+        try:
+            await scenario(code, session)
+        finally:
+            await session_store.delete(code)
+            await session_store.pop_client("sid-1")
+
+    asyncio.run(wrapper())
+
+
+@pytest.mark.parametrize("token", [None, "", "wrong", ["x"], "é"])
+def test_register_host_needs_the_host_token(server, token):
+    async def scenario(code, session):
+        await core.register_host("sid-1", {"session_code": code, "host_token": token})
+        assert session.host_sid is None
+        assert server.rooms == []
+
+    run_with_session(scenario)
+
+
+def test_register_host_with_the_token_binds_the_socket(server):
+    async def scenario(code, session):
+        await core.register_host("sid-1", {"session_code": code, "host_token": session.host_token})
+        assert session.host_sid == "sid-1"
+        assert server.rooms == [("sid-1", code)]
+
+    run_with_session(scenario)
+
+
+def test_register_host_ignores_malformed_requests(server):
+    async def scenario(code, session):
+        await core.register_host("sid-1", code)
+        await core.register_host("sid-1", {"session_code": ["x"]})
+        assert session.host_sid is None
+
+    run_with_session(scenario)
+
+
+def test_resume_as_host_without_the_token_fails(server):
+    async def scenario(code, session):
+        session.host_sid = "old-host"
+        await core.resume_session("sid-1", {"session_code": code, "host": True, "revision": 0})
+        assert session.host_sid == "old-host"
+        assert [event for event, _, _ in server.emits] == ["resume_failed"]
+        assert server.rooms == []
+
+    run_with_session(scenario)
+
+
+def test_resume_as_host_with_the_token_rebinds(server):
+    async def scenario(code, session):
+        session.host_sid = "old-host"
+        await core.resume_session("sid-1", {
+            "session_code": code, "host": True, "host_token": session.host_token, "revision": session.revision,
+        })
+        assert session.host_sid == "sid-1"
+        assert server.rooms == [("sid-1", code)]
+        assert "resume_failed" not in [event for event, _, _ in server.emits]
+
+    run_with_session(scenario)
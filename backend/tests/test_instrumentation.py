@@ -0,0 +1,95 @@
+# backend/tests/test_instrumentation.py
+import asyncio
+import engineio
+import pytest
+from app.sockets import instrumentation
+from app.sockets.instrumentation import InstrumentedAsyncServer
+
+
+class FakeSocket:
+    def __init__(self):
+        self.closing = self.closed = False
+        self.queue: asyncio.Queue = asyncio.Queue()
+
+
+def message(text: str) -> engineio.packet.Packet:
+    return engineio.packet.Packet(engineio.packet.MESSAGE, text)
+
+
+def server_with(room_size: int):
+    """A server whose Engine.IO layer just queues what it is given, with sockets in room R."""
+    server = InstrumentedAsyncServer(async_mode="asgi")
+    server.manager.set_server(server)
+    server.manager.initialize()
+    sockets = {}
+
+    async def send_packet(eio_sid, pkt):
+        sockets[eio_sid].queue.put_nowait(pkt)
+
+    async def send(eio_sid, data):
+        await send_packet(eio_sid, message(data))
+
+    server.eio.send_packet = send_packet
+    server.eio.send = send
+    for i in range(room_size):
+        sid, eio_sid = f"sid{i}", f"eio{i}"
+        sockets[eio_sid] = server.eio.sockets[eio_sid] = FakeSocket()
+        server.manager.basic_enter_room(sid, "/", None, eio_sid=eio_sid)
+        server.manager.basic_enter_room(sid, "/", sid, eio_sid=eio_sid)
+        server.manager.basic_enter_room(sid, "/", "ROOM1", eio_sid=eio_sid)
+    return server, sockets
+
+
+def queued(socket: FakeSocket) -> list:
+    items = []
+    while not socket.queue.empty():
+        items.append(socket.queue.get_nowait())
+    return items
+
+
+@pytest.fixture(autouse=True)
+def small_bound(monkeypatch):
+    monkeypatch.setattr(instrumentation, "SOCKET_MAX_OUTBOUND_PACKETS", 3)
+    monkeypatch.setattr(instrumentation, "SOCKET_MAX_RESYNCS", 1)
+
+
+def test_room_broadcast_to_a_backed_up_socket_sheds_its_backlog():
+    async def scenario():
+        server, sockets = server_with(2)
+        slow = sockets["eio0"]
+        for i in range(3):
+            slow.queue.put_nowait(message(f"old{i}"))
+        slow.queue.put_nowait(engineio.packet.Packet(engineio.packet.PING))
+        await server.emit("session_started", {"revision": 1}, room="ROOM1")
+        return queued(slow), queued(sockets["eio1"])
+
+    slow, fast = asyncio.run(scenario())
+    # The ping survives; the stale messages make way for a resync request and the new patch.
+    assert slow[0].packet_type == engineio.packet.PING
+    assert ["resync_required" in pkt.data for pkt in slow[1:]] == [True, False]
+    assert "session_started" in slow[2].data
+    assert len(fast) == 1 and "session_started" in fast[0].data
+
+
+def test_socket_that_keeps_overflowing_is_dropped_from_broadcasts():
+    async def scenario():
+        server, sockets = server_with(1)
+        slow = sockets["eio0"]
+        closed = []
+
+        async def close(*args, **kwargs):
+            closed.append(True)
+
+        slow.close = close
+        for _ in range(2):
+            for i in range(3):
+                slow.queue.put_nowait(message(f"old{i}"))
+            await server.emit("session_started", {"revision": 1}, room="ROOM1")
+        await asyncio.sleep(0)
+        await server.emit("session_started", {"revision": 2}, room="ROOM1")
+        return queued(slow), closed
+
+    items, closed = asyncio.run(scenario())
+    assert closed == [True]
+    # Only the disconnect marker is left; nothing more was queued for it.
+    assert items == [None]
@@ -0,0 +1,97 @@
+# backend/tests/test_leaderboard.py
+from app.services import leaderboard
+from app.services.leaderboard import Leaderboard, draw_score
+from app.services.session_model import Session
+
+
+def ranking(board: Leaderboard) -> list[tuple[str, int]]:
+    return [(entry["id"], entry["score"]) for entry in board.to_list()]
+
+
+def test_new_singer_is_ranked_by_score():
+    board = Leaderboard()
+    assert board.record("q1", "A", "Ann", 40) == [{"id": "A", "name": "Ann", "score": 40, "performances": 1, "rank": 1}]
+    changed = board.record("q2", "B", "Bob", 10)
+    assert [(entry["id"], entry["rank"]) for entry in changed] == [("B", 2)]
+    assert ranking(board) == [("A", 40), ("B", 10)]
+
+
+def test_overtaking_returns_everyone_who_moved():
+    board = Leaderboard()
+    for queue_id, user_id, score in [("q1", "A", 50), ("q2", "B", 40), ("q3", "C", 30), ("q4", "D", 20)]:
+        board.record(queue_id, user_id, user_id, score)
+    changed = board.record("q5", "D", "D", 35)
+    assert [(entry["id"], entry["rank"]) for entry in changed] == [("D", 1), ("A", 2), ("B", 3), ("C", 4)]
+    assert [board.rank_of(user_id) for user_id in "DABC"] == [1, 2, 3, 4]
+
+
+def test_earlier_score_wins_a_tie():
+    board = Leaderboard()
+    board.record("q1", "A", "A", 30)
+    board.record("q2", "B", "B", 30)
+    assert ranking(board) == [("A", 30), ("B", 30)]
+    board.record("q3", "B", "B", 10)
+    board.record("q4", "A", "A", 10)
+    assert ranking(board) == [("B", 40), ("A", 40)]
+
+
+def test_zero_score_keeps_the_singers_place():
+    board = Leaderboard()
+    board.record("q1", "A", "A", 30)
+    board.record("q2", "B", "B", 30)
+    changed = board.record("q3", "A", "A", 0)
+    assert changed == [{"id": "A", "name": "A", "score": 30, "performances": 2, "rank": 1}]
+    assert ranking(board) == [("A", 30), ("B", 30)]
+
+
+def test_record_updates_the_name_but_keeps_it_when_blank():
+    board = Leaderboard()
+    board.record("q1", "A", "Ann", 10)
+    board.record("q2", "A", "Annie", 10)
+    board.record("q3", "A", "", 10)
+    assert board.to_list() == [{"id": "A", "name": "Annie", "score": 30, "performances": 3}]
+
+
+def test_top_and_rank_of():
+    board = Leaderboard()
+    for queue_id, user_id, score in [("q1", "A", 10), ("q2", "B", 30), ("q3", "C", 20)]:
+        board.record(queue_id, user_id, user_id, score)
+    assert [entry["id"] for entry in board.top(2)] == ["B", "C"]
+    assert len(board.top(10)) == len(board) == 3
+    assert board.rank_of("A") == 3
+    assert board.rank_of("nobody") is None
+
+
+def test_saved_entries_keep_their_order_on_ties():
+    entries = [
+        {"id": "B", "name": "B", "score": 20, "performances": 1},
+        {"id": "A", "name": "A", "score": 20, "performances": 1},
+        {"id": "C", "name": "C", "score": 5, "performances": 1},
+    ]
+    assert ranking(Leaderboard(entries)) == [("B", 20), ("A", 20), ("C", 5)]
+
+
+def test_scored_remembers_recent_performances_only(monkeypatch):
+    monkeypatch.setattr(leaderboard, "RECENT_PERFORMANCES", 3)
+    board = Leaderboard()
+    for i in range(5):
+        board.record(f"q{i}", "A", "A", i + 1)
+    assert board.scored("q0") is None
+    assert board.scored("q1") is None
+    assert [board.scored(f"q{i}") for i in range(2, 5)] == [3, 4, 5]
+    assert board.scored_list() == [["q2", 3], ["q3", 4], ["q4", 5]]
+
+
+def test_scored_performances_survive_a_session_round_trip():
+    session = Session(users=[{"id": "A", "name": "Ann"}])
+    session.leaderboard.record("q1", "A", "Ann", 42)
+    saved = session.to_dict()
+    assert "leaderboard_scored" not in session.to_public_dict()
+
+    restored = Session.from_dict(saved)
+    assert restored.leaderboard.scored("q1") == 42
+    assert restored.leaderboard.to_list() == session.leaderboard.to_list()
+
+
+def test_draw_score_stays_in_range():
+    assert all(1 <= draw_score() <= 100 for _ in range(1000))
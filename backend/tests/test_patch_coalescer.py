@@ -0,0 +1,96 @@
+# backend/tests/test_patch_coalescer.py
+import asyncio
+import pytest
+# session_sync is loaded through the server module, as the app does.
+from app.sockets import socket_server  # noqa: F401
+from app.sockets import session_sync
+from app.sockets.session_sync import PatchCoalescer
+
+
+class RecordingServer:
+    def __init__(self):
+        self.emits: list[tuple[str, dict, str]] = []
+
+    async def emit(self, event, data=None, room=None, **kwargs):
+        self.emits.append((event, data, room))
+
+
+@pytest.fixture
+def server(monkeypatch):
+    recording = RecordingServer()
+    monkeypatch.setattr(session_sync, "sio", recording)
+    return recording
+
+
+def patch(revision: int) -> dict:
+    return {"revision": revision, "queue_id": f"q{revision}"}
+
+
+def test_disabled_window_emits_each_patch_at_once(server):
+    async def scenario():
+        coalescer = PatchCoalescer(0, 0)
+        await coalescer.add("ROOM1", "queue_item_removed", patch(1))
+        await coalescer.add("ROOM1", "queue_item_removed", patch(2))
+
+    asyncio.run(scenario())
+    assert server.emits == [
+        ("queue_item_removed", patch(1), "ROOM1"),
+        ("queue_item_removed", patch(2), "ROOM1"),
+    ]
+
+
+def test_lone_patch_is_sent_as_itself(server):
+    async def scenario():
+        coalescer = PatchCoalescer(0.01, 0.05)
+        await coalescer.add("ROOM1", "queue_item_removed", patch(1))
+        assert server.emits == []
+        await asyncio.sleep(0.05)
+
+    asyncio.run(scenario())
+    assert server.emits == [("queue_item_removed", patch(1), "ROOM1")]
+
+
+def test_patches_within_the_window_go_out_as_one_batch_per_room(server):
+    async def scenario():
+        coalescer = PatchCoalescer(0.02, 0.1)
+        await coalescer.add("ROOM1", "queue_item_removed", patch(1))
+        await coalescer.add("ROOM2", "user_left", {"revision": 7, "user_id": "u"})
+        await coalescer.add("ROOM1", "session_started", {"revision": 2})
+        await asyncio.sleep(0.1)
+
+    asyncio.run(scenario())
+    assert sorted(server.emits, key=lambda emit: emit[2]) == [
+        ("session_patches", {"patches": [
+            {"event": "queue_item_removed", **patch(1)},
+            {"event": "session_started", "revision": 2},
+        ]}, "ROOM1"),
+        ("user_left", {"revision": 7, "user_id": "u"}, "ROOM2"),
+    ]
+
+
+def test_a_steady_stream_is_still_flushed_by_the_max_delay(server):
+    async def scenario():
+        coalescer = PatchCoalescer(0.05, 0.1)
+        for revision in range(1, 11):
+            await coalescer.add("ROOM1", "queue_item_removed", patch(revision))
+            await asyncio.sleep(0.03)
+        await coalescer.flush_all()
+
+    asyncio.run(scenario())
+    # Without the cap every patch would keep extending the window into a single emit.
+    assert len(server.emits) >= 2
+    sent = [item["revision"] for _, data, _ in server.emits for item in data.get("patches", [data])]
+    assert sent == list(range(1, 11))
+
+
+def test_flush_sends_now_and_discard_drops(server):
+    async def scenario():
+        coalescer = PatchCoalescer(10, 10)
+        await coalescer.add("ROOM1", "queue_item_removed", patch(1))
+        await coalescer.flush("ROOM1")
+        await coalescer.add("ROOM2", "queue_item_removed", patch(5))
+        coalescer.discard("ROOM2")
+        await coalescer.flush("ROOM2")
+
+    asyncio.run(scenario())
+    assert server.emits == [("queue_item_removed", patch(1), "ROOM1")]
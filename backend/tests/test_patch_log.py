@@ -0,0 +1,74 @@
+# backend/tests/test_patch_log.py
+# session_sync is loaded through the server module, as the app does.
+from app.sockets import socket_server  # noqa: F401
+from app.sockets.session_sync import PatchLog
+
+
+def record(log: PatchLog, code: str, *revisions: int):
+    for revision in revisions:
+        log.record(code, "queue_item_removed", {"revision": revision, "queue_id": f"q{revision}"})
+
+
+def revisions(patches: list[dict] | None) -> list[int] | None:
+    return None if patches is None else [patch["revision"] for patch in patches]
+
+
+def test_replays_the_patches_after_a_revision():
+    log = PatchLog(max_patches=8, max_sessions=4)
+    record(log, "ABCDE", 1, 2, 3, 4)
+    assert revisions(log.since("ABCDE", 1, 4)) == [2, 3, 4]
+    assert revisions(log.since("ABCDE", 0, 4)) == [1, 2, 3, 4]
+    assert log.since("ABCDE", 4, 4) == []
+    assert log.since("ABCDE", 2, 4)[0] == {"event": "queue_item_removed", "revision": 3, "queue_id": "q3"}
+
+
+def test_up_to_date_client_needs_nothing_even_without_a_log():
+    assert PatchLog(max_patches=8, max_sessions=4).since("ABCDE", 7, 7) == []
+
+
+def test_nothing_is_replayed_past_what_the_ring_holds():
+    log = PatchLog(max_patches=3, max_sessions=4)
+    record(log, "ABCDE", 1, 2, 3, 4, 5)
+    assert log.since("ABCDE", 1, 5) is None
+    assert revisions(log.since("ABCDE", 2, 5)) == [3, 4, 5]
+
+
+def test_a_revision_gap_empties_the_ring():
+    log = PatchLog(max_patches=8, max_sessions=4)
+    record(log, "ABCDE", 1, 2, 3)
+    # Revision 4 was bumped without a patch here (a restore, or another worker).
+    record(log, "ABCDE", 5, 6)
+    assert log.since("ABCDE", 2, 6) is None
+    assert log.since("ABCDE", 3, 6) is None
+    assert revisions(log.since("ABCDE", 4, 6)) == [5, 6]
+
+
+def test_missing_latest_revisions_replay_nothing():
+    log = PatchLog(max_patches=8, max_sessions=4)
+    record(log, "ABCDE", 1, 2, 3)
+    assert log.since("ABCDE", 1, 4) is None
+    # A client claiming to be ahead of the session gets a snapshot instead.
+    assert log.since("ABCDE", 5, 3) is None
+    assert log.since("OTHER", 1, 3) is None
+
+
+def test_least_recently_patched_sessions_are_dropped_first():
+    log = PatchLog(max_patches=8, max_sessions=2)
+    record(log, "AAAAA", 1)
+    record(log, "BBBBB", 1)
+    record(log, "AAAAA", 2)
+    record(log, "CCCCC", 1)
+    assert log.since("BBBBB", 0, 1) is None
+    assert revisions(log.since("AAAAA", 0, 2)) == [1, 2]
+    assert revisions(log.since("CCCCC", 0, 1)) == [1]
+
+
+def test_forget_and_disabled_log():
+    log = PatchLog(max_patches=8, max_sessions=4)
+    record(log, "ABCDE", 1, 2)
+    log.forget("ABCDE")
+    assert log.since("ABCDE", 1, 2) is None
+
+    disabled = PatchLog(max_patches=0, max_sessions=4)
+    record(disabled, "ABCDE", 1, 2)
+    assert disabled.since("ABCDE", 1, 2) is None
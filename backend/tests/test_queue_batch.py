@@ -0,0 +1,85 @@
+# backend/tests/test_queue_batch.py
+import pytest
+from app.services import queue_batch
+from app.services.queue_batch import QueueBatchError, QueueBatchForbiddenError
+from app.services.session_model import Session
+
+
+def session_with_songs(*queue_ids: str) -> Session:
+    return Session(
+        users=[{"id": "u1", "name": "Ann"}, {"id": "u2", "name": "Bob"}],
+        queue=[{"queue_id": queue_id, "song_id": queue_id, "added_by": "u1"} for queue_id in queue_ids],
+    )
+
+
+@pytest.mark.parametrize("added_by", [None, ["u1"], {"id": "u1"}, 1, "nobody"])
+def test_songs_from_unknown_or_malformed_users_are_refused(added_by):
+    session = session_with_songs()
+    with pytest.raises(QueueBatchForbiddenError):
+        queue_batch.add_songs(session, [{"song_id": "s1", "added_by": added_by}])
+    assert len(session.queue) == 0
+
+
+def test_has_user_is_false_for_unhashable_ids():
+    session = session_with_songs()
+    assert session.has_user("u1")
+    assert not session.has_user(["u1"])
+    assert not session.has_user({"u1": 1})
+
+
+@pytest.mark.parametrize("queue_ids", [[["a"]], [{"a": 1}], ["a", 3]])
+def test_remove_rejects_non_string_queue_ids(queue_ids):
+    session = session_with_songs("a")
+    with pytest.raises(QueueBatchError):
+        queue_batch.remove_songs(session, queue_ids, "u1")
+    assert "a" in session.queue
+
+
+def queue_order(session: Session) -> list[str]:
+    return [entry["queue_id"] for entry in session.queue]
+
+
+def test_moves_are_applied_in_order_and_returned():
+    session = session_with_songs("a", "b", "c", "d")
+    applied = queue_batch.move_songs(session, [{"queue_id": "d", "before": "a"}, {"queue_id": "a", "before": None}])
+    assert applied == [{"queue_id": "d", "before": "a"}, {"queue_id": "a", "before": None}]
+    assert queue_order(session) == ["d", "b", "c", "a"]
+
+
+def test_a_move_without_before_goes_to_the_end():
+    session = session_with_songs("a", "b", "c")
+    queue_batch.move_songs(session, [{"queue_id": "a"}])
+    assert queue_order(session) == ["b", "c", "a"]
+
+
+@pytest.mark.parametrize("moves", [
+    [],
+    None,
+    {"queue_id": "a"},
+    ["a"],
+    [{"queue_id": "missing"}],
+    [{"queue_id": "a", "before": "missing"}],
+    [{"queue_id": ["a"]}],
+    [{"queue_id": "a", "before": {"id": "b"}}],
+    [{"before": "b"}],
+])
+def test_invalid_moves_are_refused(moves):
+    session = session_with_songs("a", "b", "c")
+    with pytest.raises(QueueBatchError):
+        queue_batch.move_songs(session, moves)
+    assert queue_order(session) == ["a", "b", "c"]
+
+
+def test_one_bad_move_leaves_the_whole_batch_unapplied():
+    session = session_with_songs("a", "b", "c")
+    with pytest.raises(QueueBatchError):
+        queue_batch.move_songs(session, [{"queue_id": "c", "before": "a"}, {"queue_id": "b", "before": "gone"}])
+    assert queue_order(session) == ["a", "b", "c"]
+
+
+def test_too_many_moves_are_refused(monkeypatch):
+    monkeypatch.setattr(queue_batch, "MAX_QUEUE_BATCH", 2)
+    session = session_with_songs("a", "b", "c")
+    with pytest.raises(QueueBatchError):
+        queue_batch.move_songs(session, [{"queue_id": "a"}, {"queue_id": "b"}, {"queue_id": "c"}])
+    assert queue_order(session) == ["a", "b", "c"]
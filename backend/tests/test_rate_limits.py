@@ -0,0 +1,123 @@
+# backend/tests/test_rate_limits.py
+import asyncio
+import pytest
+from app.sockets import rate_limits
+from app.sockets.rate_limits import SocketRateLimiter, TokenBucket, load_rate_limits, parse_limit
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(rate_limits.time, "monotonic", fake)
+    return fake
+
+
+@pytest.mark.parametrize("spec, expected", [
+    ("5/10", (5.0, 0.5)),
+    (" 3/1 ", (3.0, 3.0)),
+    ("4", (4.0, 4.0)),
+    ("", None),
+    ("0", None),
+    ("0/10", None),
+    ("5/0", None),
+])
+def test_parse_limit(spec, expected):
+    assert parse_limit(spec) == expected
+
+
+def test_event_limits_can_be_overridden_from_the_environment(monkeypatch):
+    monkeypatch.setenv("SOCKET_RATE_LIMIT_ADD_SONG", "2/4,")
+    limits = load_rate_limits()
+    assert limits["add_song"] == ((2.0, 0.5), None)
+    assert limits["reorder_queue"] == ((10.0, 1.0), None)
+    assert set(limits) == set(rate_limits.DEFAULT_RATE_LIMITS)
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate(clock):
+    bucket = TokenBucket(capacity=3, rate=0.5)
+    assert [bucket.take(clock.now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take(clock.now) == pytest.approx(2.0)
+    clock.now += 1
+    assert bucket.take(clock.now) == pytest.approx(1.0)
+    clock.now += 1
+    assert bucket.take(clock.now) == 0.0
+    # A long pause refills the bucket to its capacity, not beyond.
+    clock.now += 100
+    assert [bucket.take(clock.now) for _ in range(4)][-1] > 0
+
+
+def test_socket_and_session_limits_are_separate_buckets(clock):
+    limiter = SocketRateLimiter({"add_song": ((2, 1), (3, 1))})
+    assert limiter.check("add_song", "sid1", "ROOM1") is None
+    assert limiter.check("add_song", "sid1", "ROOM1") is None
+    assert limiter.check("add_song", "sid1", "ROOM1")[0] == "sid"
+    # Another socket still has its own tokens, until the session's run out.
+    assert limiter.check("add_song", "sid2", "ROOM1") is None
+    scope, retry_after, first = limiter.check("add_song", "sid2", "ROOM1")
+    assert (scope, first) == ("session", True)
+    assert retry_after == pytest.approx(1.0)
+    assert limiter.check("add_song", "sid3", "ROOM2") is None
+    assert limiter.check("other_event", "sid1", "ROOM1") is None
+
+
+def test_only_the_first_rejection_in_a_row_is_reported(clock):
+    limiter = SocketRateLimiter({"add_song": ((1, 1), None)})
+    limiter.check("add_song", "sid1", None)
+    assert limiter.check("add_song", "sid1", None)[2] is True
+    assert limiter.check("add_song", "sid1", None)[2] is False
+    clock.now += 1
+    assert limiter.check("add_song", "sid1", None) is None
+    assert limiter.check("add_song", "sid1", None)[2] is True
+
+
+def test_session_buckets_are_evicted_least_recently_used(clock):
+    limiter = SocketRateLimiter({"add_song": (None, (1, 1))}, max_sessions=2)
+    for code in ("AAAAA", "BBBBB"):
+        limiter.check("add_song", "sid", code)
+    limiter.check("add_song", "sid", "AAAAA")
+    limiter.check("add_song", "sid", "CCCCC")
+    assert list(limiter._by_session) == ["AAAAA", "CCCCC"]
+    # BBBBB was forgotten, so it starts over with a full bucket.
+    assert limiter.check("add_song", "sid", "BBBBB") is None
+
+
+def test_forgetting_a_socket_resets_its_buckets(clock):
+    limiter = SocketRateLimiter({"add_song": ((1, 1), None)})
+    limiter.check("add_song", "sid1", None)
+    assert limiter.check("add_song", "sid1", None) is not None
+    limiter.forget_sid("sid1")
+    assert limiter.check("add_song", "sid1", None) is None
+
+
+def test_rate_limited_handler_drops_events_and_replies_once(clock, monkeypatch):
+    monkeypatch.setattr(rate_limits, "socket_rate_limiter", SocketRateLimiter({"add_song": ((1, 1), None)}))
+    replies, handled = [], []
+
+    class Server:
+        async def emit(self, event, data=None, to=None, **kwargs):
+            replies.append((event, data, to))
+
+    async def handler(sid, data):
+        handled.append(data)
+
+    async def unlimited(sid, data):
+        pass
+
+    wrapped = rate_limits.rate_limited(Server(), "add_song", handler)
+    assert rate_limits.rate_limited(Server(), "unlisted_event", unlimited) is unlimited
+
+    async def scenario():
+        for i in range(3):
+            await wrapped("sid1", {"session_code": "ROOM1", "n": i})
+
+    asyncio.run(scenario())
+    assert handled == [{"session_code": "ROOM1", "n": 0}]
+    assert replies == [("rate_limited", {"event": "add_song", "retry_after": 1}, "sid1")]
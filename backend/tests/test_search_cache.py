@@ -0,0 +1,125 @@
+# backend/tests/test_search_cache.py
+import asyncio
+import pytest
+from app.services import search_cache as search_cache_module
+from app.services.search_cache import SearchResultCache, normalize_query
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class GatedFetch:
+    """A fetch that counts its calls and doesn't finish until released."""
+
+    def __init__(self, results=None, error=None):
+        self.calls = 0
+        self.results = results if results is not None else [{"id": "abc"}]
+        self.error = error
+        self.gate = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return self.results
+
+
+def test_normalize_query_ignores_case_and_spacing():
+    assert normalize_query("  Bohemian   RHAPSODY ") == "bohemian rhapsody"
+
+
+def test_concurrent_lookups_share_one_fetch():
+    async def scenario():
+        cache = SearchResultCache(max_entries=8, ttl_seconds=60)
+        fetch = GatedFetch()
+        waiters = [asyncio.create_task(cache.get_or_fetch(query, fetch)) for query in ("Queen", "queen", " QUEEN ")]
+        await asyncio.sleep(0)
+        fetch.gate.set()
+        results = await asyncio.gather(*waiters)
+        return cache, fetch, results
+
+    cache, fetch, results = asyncio.run(scenario())
+    assert fetch.calls == 1
+    assert results == [fetch.results] * 3
+    assert (cache.misses, cache.coalesced, cache.hits) == (1, 2, 0)
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_later_lookups_and_pages_are_served_from_the_cache():
+    async def scenario():
+        cache = SearchResultCache(max_entries=8, ttl_seconds=60)
+        fetch = GatedFetch()
+        fetch.gate.set()
+        first = await cache.get_or_fetch("queen", fetch)
+        second = await cache.get_or_fetch("Queen", fetch)
+        return cache, fetch, first, second
+
+    cache, fetch, first, second = asyncio.run(scenario())
+    assert fetch.calls == 1
+    assert second is first
+    assert cache.hits == 1
+
+
+def test_a_failed_fetch_is_not_cached_and_can_be_retried():
+    async def scenario():
+        cache = SearchResultCache(max_entries=8, ttl_seconds=60)
+        failing = GatedFetch(error=RuntimeError("scrape failed"))
+        failing.gate.set()
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("queen", failing)
+        retry = GatedFetch()
+        retry.gate.set()
+        return cache, retry, await cache.get_or_fetch("queen", retry)
+
+    cache, retry, results = asyncio.run(scenario())
+    assert retry.calls == 1
+    assert results == retry.results
+    assert cache.stats()["in_flight"] == 0
+
+
+def test_a_caller_going_away_does_not_cancel_the_shared_fetch():
+    async def scenario():
+        cache = SearchResultCache(max_entries=8, ttl_seconds=60)
+        fetch = GatedFetch()
+        leaving = asyncio.create_task(cache.get_or_fetch("queen", fetch))
+        staying = asyncio.create_task(cache.get_or_fetch("queen", fetch))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        await asyncio.sleep(0)
+        fetch.gate.set()
+        return cache, fetch, await staying, leaving.cancelled()
+
+    cache, fetch, results, left = asyncio.run(scenario())
+    assert left
+    assert fetch.calls == 1
+    assert results == fetch.results
+    assert cache.get("queen") == fetch.results
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(search_cache_module.time, "monotonic", clock)
+    cache = SearchResultCache(max_entries=8, ttl_seconds=60)
+    cache.put("queen", [{"id": "abc"}])
+    clock.now += 59
+    assert cache.get("queen") == [{"id": "abc"}]
+    clock.now += 1
+    assert cache.get("queen") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_least_recently_used_entry_is_evicted_first():
+    cache = SearchResultCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", [])
+    cache.put("b", [])
+    cache.get("a")
+    cache.put("c", [])
+    assert cache.get("b") is None
+    assert cache.get("a") == []
+    assert cache.get("c") == []
@@ -0,0 +1,63 @@
+# backend/tests/test_search_executor.py
+import asyncio
+import threading
+import time
+import pytest
+from app.services import search_executor
+from app.services.search_executor import SearchOverloadedError, SearchTimeoutError, get_search_pool_stats, run_search
+
+
+class FakeYoutubeSearch:
+    """Stands in for the scrape; blocks its worker thread until `release` is set."""
+
+    release = threading.Event()
+
+    def __init__(self, query, max_results):
+        self.query = query
+
+    def to_dict(self):
+        if not self.release.wait(timeout=5):
+            raise RuntimeError("never released")
+        return [{"id": self.query}]
+
+
+@pytest.fixture
+def fake_search(monkeypatch):
+    FakeYoutubeSearch.release = threading.Event()
+    monkeypatch.setattr(search_executor, "YoutubeSearch", FakeYoutubeSearch)
+    yield FakeYoutubeSearch
+    FakeYoutubeSearch.release.set()
+    # Let the worker threads finish so the next test starts with an idle pool.
+    deadline = time.monotonic() + 5
+    while get_search_pool_stats()["running"] + get_search_pool_stats()["queue_depth"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_results_come_back_from_the_pool(fake_search):
+    fake_search.release.set()
+    assert asyncio.run(run_search("queen")) == [{"id": "queen"}]
+
+
+def test_requests_beyond_the_waiting_line_are_rejected(fake_search, monkeypatch):
+    monkeypatch.setattr(search_executor, "SEARCH_WORKERS", 1)
+    monkeypatch.setattr(search_executor, "SEARCH_MAX_PENDING", 1)
+    rejected_before = get_search_pool_stats()["rejected"]
+
+    async def scenario():
+        admitted = [asyncio.create_task(run_search(f"q{i}")) for i in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(SearchOverloadedError):
+            await run_search("one too many")
+        fake_search.release.set()
+        return await asyncio.gather(*admitted)
+
+    assert asyncio.run(scenario()) == [[{"id": "q0"}], [{"id": "q1"}]]
+    assert get_search_pool_stats()["rejected"] == rejected_before + 1
+
+
+def test_slow_scrapes_time_out(fake_search, monkeypatch):
+    monkeypatch.setattr(search_executor, "SEARCH_TIMEOUT_SECONDS", 0.05)
+    timed_out_before = get_search_pool_stats()["timed_out"]
+    with pytest.raises(SearchTimeoutError):
+        asyncio.run(run_search("slow"))
+    assert get_search_pool_stats()["timed_out"] == timed_out_before + 1
@@ -0,0 +1,89 @@
+# backend/tests/test_session_code_utils.py
+import pytest
+from app.services import session_code_utils
+from app.services.session_code_utils import (
+    CODE_SPACE,
+    SessionCodeAllocator,
+    code_to_index,
+    index_to_code,
+)
+
+
+def fill_all_but(allocator: SessionCodeAllocator, free_index: int):
+    """Marks every code taken except one, without allocating 60 million times."""
+    bitmap = allocator._bits()
+    bitmap[:] = b"\xff" * len(bitmap)
+    bitmap[free_index >> 3] &= ~(1 << (free_index & 7)) & 0xFF
+    allocator.in_use = CODE_SPACE - 1
+
+
+@pytest.mark.parametrize("index", [0, 1, 35, 36, 12345678, CODE_SPACE - 1])
+def test_index_and_code_round_trip(index):
+    code = index_to_code(index)
+    assert len(code) == session_code_utils.CODE_LENGTH
+    assert code_to_index(code) == index
+
+
+@pytest.mark.parametrize("code", ["", "ABCD", "ABCDEF", "abcde", "AB-DE"])
+def test_malformed_codes_have_no_index(code):
+    assert code_to_index(code) is None
+
+
+def test_allocated_codes_are_unique_and_counted():
+    allocator = SessionCodeAllocator()
+    codes = {allocator.allocate() for _ in range(2000)}
+    assert len(codes) == 2000
+    assert allocator.in_use == 2000
+    assert all(code_to_index(code) is not None for code in codes)
+
+
+def test_release_frees_a_code_once():
+    allocator = SessionCodeAllocator()
+    code = allocator.allocate()
+    allocator.release(code)
+    allocator.release(code)
+    assert allocator.in_use == 0
+    assert not allocator._is_taken(code_to_index(code))
+
+
+def test_reserve_is_idempotent_and_ignores_malformed_codes():
+    allocator = SessionCodeAllocator()
+    allocator.reserve("AAAAA")
+    allocator.reserve("AAAAA")
+    allocator.reserve("not-a-code")
+    allocator.release("not-a-code")
+    assert allocator.in_use == 1
+
+
+def test_reserved_code_is_never_handed_out(monkeypatch):
+    allocator = SessionCodeAllocator()
+    allocator.reserve(index_to_code(41))
+    draws = iter([41, 41, 42])
+    monkeypatch.setattr(session_code_utils.secrets, "randbelow", lambda _: next(draws))
+    assert allocator.allocate() == index_to_code(42)
+
+
+def test_nearly_full_space_finds_the_last_free_code():
+    allocator = SessionCodeAllocator()
+    fill_all_but(allocator, 987654)
+    assert allocator.allocate() == index_to_code(987654)
+    assert allocator.in_use == CODE_SPACE
+    with pytest.raises(RuntimeError):
+        allocator.allocate()
+
+
+def test_scan_wraps_around_to_codes_before_its_start(monkeypatch):
+    allocator = SessionCodeAllocator()
+    fill_all_but(allocator, 3)
+    monkeypatch.setattr(session_code_utils, "MAX_RANDOM_PROBES", 0)
+    monkeypatch.setattr(session_code_utils.secrets, "randbelow", lambda _: CODE_SPACE - 1)
+    assert allocator.allocate() == index_to_code(3)
+
+
+def test_released_code_can_be_allocated_again():
+    allocator = SessionCodeAllocator()
+    fill_all_but(allocator, 500)
+    last = allocator.allocate()
+    allocator.release(index_to_code(17))
+    assert allocator.allocate() == index_to_code(17)
+    assert last == index_to_code(500)
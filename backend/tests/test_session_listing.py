@@ -0,0 +1,98 @@
+# backend/tests/test_session_listing.py
+import asyncio
+from app.services import session_listing
+from app.services.session_model import Session
+from app.services.session_store import MemorySessionStore
+
+
+def make_store(count: int) -> tuple[MemorySessionStore, dict[str, Session]]:
+    """`count` sessions: every third started, every fourth with a password."""
+    async def fill():
+        store, sessions = MemorySessionStore(), {}
+        for i in range(count):
+            session = Session(
+                users=[{"id": f"u{i}", "name": "Ana"}],
+                queue=[{"queue_id": f"q{i}", "song_id": "s"}],
+                is_started=i % 3 == 0,
+                password="secret" if i % 4 == 0 else None,
+            )
+            sessions[await store.create(session)] = session
+        return store, sessions
+
+    return asyncio.run(fill())
+
+
+def list_all(store, limit: int, state=None, view="counts") -> tuple[list[dict], int]:
+    async def walk():
+        items, cursor, requests = [], None, 0
+        while True:
+            page, cursor = await session_listing.list_page(store, cursor, limit, state, view)
+            assert len(page) <= limit
+            items.extend(page)
+            requests += 1
+            if cursor is None:
+                return items, requests
+
+    return asyncio.run(walk())
+
+
+def test_paging_lists_every_session_once():
+    store, sessions = make_store(37)
+    items, requests = list_all(store, limit=10)
+    assert sorted(item["session_code"] for item in items) == sorted(sessions)
+    assert requests == 4
+
+
+def test_filters_apply_across_pages():
+    store, sessions = make_store(37)
+    for state, wanted in [
+        ("started", lambda session: session.is_started),
+        ("idle", lambda session: not session.is_started),
+        ("password", lambda session: bool(session.password)),
+    ]:
+        items, _ = list_all(store, limit=4, state=state)
+        assert sorted(item["session_code"] for item in items) == sorted(
+            code for code, session in sessions.items() if wanted(session)
+        )
+
+
+def test_a_sparse_filter_returns_a_short_page_with_a_cursor(monkeypatch):
+    monkeypatch.setattr(session_listing, "MAX_PAGES_PER_REQUEST", 2)
+    store, _ = make_store(30)
+
+    async def first_page():
+        # Only the `password` sessions match, about one in four.
+        return await session_listing.list_page(store, None, 5, "password", "counts")
+
+    items, cursor = asyncio.run(first_page())
+    assert len(items) < 5
+    assert cursor is not None
+
+
+def test_views_never_include_secrets():
+    store, sessions = make_store(4)
+    code = next(code for code, session in sessions.items() if session.password)
+    for view in session_listing.VIEWS:
+        items, _ = list_all(store, limit=10, view=view)
+        item = next(item for item in items if item["session_code"] == code)
+        assert item["has_password"]
+        assert "password" not in item
+        assert "host_token" not in item
+        if view == "counts":
+            assert (item["users"], item["queue"]) == (1, 1)
+        elif view == "compact":
+            assert "users" not in item and "queue" not in item
+        else:
+            assert len(item["users"]) == 1 and len(item["queue"]) == 1
+
+
+def test_export_streams_every_matching_session():
+    store, sessions = make_store(25)
+
+    async def export():
+        return [item async for item in session_listing.iter_listing(store, "started", "compact", page_size=4)]
+
+    items = asyncio.run(export())
+    assert sorted(item["session_code"] for item in items) == sorted(
+        code for code, session in sessions.items() if session.is_started
+    )
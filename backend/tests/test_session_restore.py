@@ -0,0 +1,67 @@
+# backend/tests/test_session_restore.py
+import asyncio
+from app.sockets import socket_server  # noqa: F401
+from app.api.session import LeaderboardEntry, QueueEntry, RestoreRequest, UserEntry, restore_session
+from app.services.fair_queue import FAIR
+from app.services.session_model import Session
+from app.state import session_store
+
+
+def restore_request(code: str) -> RestoreRequest:
+    return RestoreRequest(
+        session_code=code,
+        users=[
+            UserEntry(id="ana", name="Ana", avatarBase64="/Avatars/1.svg"),
+            UserEntry(id="ben", name="Ben", avatarBase64="/Avatars/2.svg"),
+        ],
+        queue=[
+            QueueEntry(song_id="a1", title="A1", singer="Ana"),
+            QueueEntry(song_id="a2", title="A2", singer="Ana"),
+            QueueEntry(song_id="b1", title="B1", singer="Ben"),
+        ],
+        leaderboard=[LeaderboardEntry(id="ana", name="Ana", score=50)],
+    )
+
+
+def test_restore_keeps_server_owned_state():
+    async def scenario():
+        live = Session(settings={"showScore": True, "queueMode": FAIR}, host_token="token", is_started=True)
+        live.host_sid = "host-sid"
+        live.player = {"state": "playing", "position": 12.0}
+        live.scheduler.sung["ben"] = 2
+        live.leaderboard.record("q-played", "ana", "Ana", 50)
+        code = await session_store.create(live)
+        try:
+            response = await restore_session(restore_request(code))
+            session = await session_store.get(code)
+        finally:
+            await session_store.delete(code)
+        return response, session
+
+    response, session = asyncio.run(scenario())
+    assert "host_token" not in response
+    assert session.host_sid == "host-sid"
+    assert session.player == {"state": "playing", "position": 12.0}
+    assert session.host_token == "token"
+    assert session.is_started
+    assert session.revision == 1
+    assert session.leaderboard.scored("q-played") is not None
+    assert session.scheduler.sung == {"ben": 2}
+    assert session.scheduler.mode == FAIR
+    assert [entry["song_id"] for entry in session.queue.to_list()] == ["a1", "a2", "b1"]
+
+
+def test_restore_from_scratch_hands_out_a_host_token():
+    async def scenario():
+        code = "RESTORED"
+        try:
+            response = await restore_session(restore_request(code))
+            session = await session_store.get(code)
+        finally:
+            await session_store.delete(code)
+        return response, session
+
+    response, session = asyncio.run(scenario())
+    assert session.is_host_token(response["host_token"])
+    assert session.host_sid is None
+    assert len(session.queue) == 3
@@ -0,0 +1,100 @@
+# backend/tests/test_session_snapshots.py
+import asyncio
+import json
+from app.services.session_model import Session
+from app.services.session_snapshots import SessionSnapshotter
+from app.services.session_store import MemorySessionStore
+
+
+def records(path) -> list[tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [(record["op"], record["code"]) for record in map(json.loads, f)]
+
+
+def no_full_scan(store: MemorySessionStore):
+    def iter_sessions():
+        raise AssertionError("write_changes walked every session")
+
+    store.iter_sessions = iter_sessions
+
+
+def test_only_changed_sessions_are_written(tmp_path):
+    path = tmp_path / "sessions.jsonl"
+
+    async def scenario():
+        store = MemorySessionStore()
+        snapshotter = SessionSnapshotter(store, str(path))
+        first = await store.create(Session())
+        second = await store.create(Session())
+        no_full_scan(store)
+        await snapshotter.write_changes()
+        assert sorted(records(path)) == sorted([("put", first), ("put", second)])
+
+        await snapshotter.write_changes()
+        # An edit that doesn't move the revision has nothing new to save.
+        async with store.edit(first):
+            pass
+        await snapshotter.write_changes()
+        assert len(records(path)) == 2
+
+        async with store.edit(second) as session:
+            session.revision += 1
+        await store.delete(first)
+        await snapshotter.write_changes()
+        assert sorted(records(path)[2:]) == sorted([("put", second), ("del", first)])
+
+    asyncio.run(scenario())
+
+
+def test_log_replays_into_a_fresh_store_and_compacts(tmp_path):
+    path = tmp_path / "sessions.jsonl"
+
+    async def scenario():
+        store = MemorySessionStore()
+        snapshotter = SessionSnapshotter(store, str(path))
+        kept = await store.create(Session(users=[{"id": "u1", "name": "Ann"}], revision=3))
+        gone = await store.create(Session())
+        await snapshotter.write_changes()
+        await store.delete(gone)
+        async with store.edit(kept) as session:
+            session.revision += 1
+        await snapshotter.write_changes()
+
+        restored_store = MemorySessionStore()
+        restored = SessionSnapshotter(restored_store, str(path))
+        assert await restored._load() == 1
+        session = await restored_store.get(kept)
+        assert session.revision == 4 and session.has_user("u1")
+        assert await restored_store.get(gone) is None
+        # Loading doesn't count as a change to write back.
+        await restored.write_changes()
+        assert len(records(path)) == 4
+
+        await restored.compact()
+        assert records(path) == [("put", kept)]
+
+    asyncio.run(scenario())
+
+
+def test_changes_are_kept_when_an_append_fails(tmp_path):
+    path = tmp_path / "sessions.jsonl"
+
+    async def scenario():
+        store = MemorySessionStore()
+        snapshotter = SessionSnapshotter(store, str(path))
+        code = await store.create(Session())
+        append = snapshotter._append
+
+        def failing_append(text):
+            raise OSError("disk full")
+
+        snapshotter._append = failing_append
+        try:
+            await snapshotter.write_changes()
+        except OSError:
+            pass
+        snapshotter._append = append
+        await snapshotter.write_changes()
+        assert records(path) == [("put", code)]
+
+    asyncio.run(scenario())
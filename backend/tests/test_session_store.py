@@ -0,0 +1,149 @@
+# backend/tests/test_session_store.py
+import asyncio
+import time
+import pytest
+from app.services.session_model import Session
+from app.services.session_store import MemorySessionStore, RedisSessionStore
+
+
+def memory_store():
+    return MemorySessionStore()
+
+
+def redis_store():
+    fakeredis = pytest.importorskip("fakeredis")
+    return RedisSessionStore(fakeredis.aioredis.FakeRedis(), prefix="test:")
+
+
+@pytest.fixture(params=[memory_store, redis_store], ids=["memory", "redis"])
+def run(request):
+    """Runs `scenario(store)` on a fresh store of each kind."""
+    factory = request.param
+
+    def runner(scenario):
+        async def wrapper():
+            store = factory()
+            try:
+                return await scenario(store)
+            finally:
+                await store.close()
+
+        return asyncio.run(wrapper())
+
+    return runner
+
+
+def test_create_get_and_delete(run):
+    async def scenario(store):
+        codes = [await store.create(Session(password=f"pw{i}")) for i in range(5)]
+        assert len(set(codes)) == 5
+        assert await store.count() == 5
+        assert (await store.get(codes[2])).password == "pw2"
+        assert await store.exists(codes[2])
+        await store.delete(codes[2])
+        assert await store.get(codes[2]) is None
+        assert not await store.exists(codes[2])
+        assert await store.count() == 4
+        assert sorted(code for code, _ in [item async for item in store.iter_sessions()]) == sorted(
+            codes[:2] + codes[3:]
+        )
+
+    run(scenario)
+
+
+def test_edit_writes_changes_back(run):
+    async def scenario(store):
+        code = await store.create(Session())
+        async with store.edit(code) as session:
+            session.add_user({"id": "ana", "name": "Ana"})
+            session.revision += 1
+        stored = await store.get(code)
+        assert stored.has_user("ana")
+        assert stored.revision == 1
+
+    run(scenario)
+
+
+def test_replacing_a_session_inside_edit_is_written_back(run):
+    async def scenario(store):
+        code = await store.create(Session(password="old"))
+        async with store.edit(code) as session:
+            session.replace_with(Session(password="new", revision=7))
+        stored = await store.get(code)
+        assert (stored.password, stored.revision) == ("new", 7)
+
+    run(scenario)
+
+
+def test_edit_of_a_missing_session_yields_none_and_creates_nothing(run):
+    async def scenario(store):
+        async with store.edit("NOPE") as session:
+            assert session is None
+        assert await store.get("NOPE") is None
+        assert await store.count() == 0
+
+    run(scenario)
+
+
+def test_edits_of_one_session_are_serialized(run):
+    async def scenario(store):
+        code = await store.create(Session())
+
+        async def bump():
+            async with store.edit(code) as session:
+                revision = session.revision
+                await asyncio.sleep(0)
+                session.revision = revision + 1
+
+        await asyncio.gather(*(bump() for _ in range(10)))
+        assert (await store.get(code)).revision == 10
+
+    run(scenario)
+
+
+def test_paging_visits_every_session_once(run):
+    async def scenario(store):
+        codes = {await store.create(Session()) for _ in range(23)}
+        seen, cursor = [], None
+        while True:
+            page, cursor = await store.page_sessions(cursor, 5)
+            seen.extend(code for code, _ in page)
+            if cursor is None:
+                break
+        assert sorted(seen) == sorted(codes)
+
+    run(scenario)
+
+
+def test_expired_finds_idle_and_unclaimed_sessions(run):
+    async def scenario(store):
+        claimed = await store.create(Session())
+        unclaimed = await store.create(Session())
+        await store.claim(claimed)
+        later = time.time() + 1
+        assert set(await store.expired(idle_before=0, unclaimed_before=later)) == {unclaimed}
+        assert set(await store.expired(idle_before=later, unclaimed_before=0)) == {claimed, unclaimed}
+        await store.delete(unclaimed)
+        assert await store.expired(idle_before=later, unclaimed_before=later) == [claimed]
+
+    run(scenario)
+
+
+def test_clients_are_indexed_by_session_and_user(run):
+    async def scenario(store):
+        await store.set_client("sid-1", {"session_code": "ABC", "user_id": "ana"})
+        await store.set_client("sid-2", {"session_code": "ABC", "user_id": None})
+        assert await store.get_client("sid-1") == {"session_code": "ABC", "user_id": "ana"}
+        assert await store.get_user_sid("ABC", "ana") == "sid-1"
+
+        # Ana reconnects; the old socket going away must not unindex the new one.
+        await store.set_client("sid-3", {"session_code": "ABC", "user_id": "ana"})
+        assert await store.pop_client("sid-1") == {"session_code": "ABC", "user_id": "ana"}
+        assert await store.get_user_sid("ABC", "ana") == "sid-3"
+
+        assert sorted(sid for sid, _ in [item async for item in store.iter_clients()]) == ["sid-2", "sid-3"]
+        await store.pop_client("sid-3")
+        assert await store.get_user_sid("ABC", "ana") is None
+        assert await store.pop_client("sid-3") is None
+
+    run(scenario)
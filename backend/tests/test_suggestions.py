@@ -0,0 +1,94 @@
+# backend/tests/test_suggestions.py
+import pytest
+from app.services import suggestions
+from app.services.suggestions import SuggestionIndex, suggestion_text
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(suggestions.time, "monotonic", fake)
+    return fake
+
+
+def test_suggestion_text_drops_bracketed_notes_and_filler():
+    assert suggestion_text("Bohemian Rhapsody (Karaoke Version) [HD]") == "bohemian rhapsody"
+
+
+def test_prefix_matches_from_the_start_of_any_of_the_first_words(clock):
+    index = SuggestionIndex()
+    index.record_query("bohemian rhapsody")
+    index.record_query("bohemian like you")
+    index.record_query("never gonna give you up")
+    assert sorted(index.suggest("bohem", 5)) == ["bohemian like you", "bohemian rhapsody"]
+    assert index.suggest("rhaps", 5) == ["bohemian rhapsody"]
+    assert index.suggest("Gonna  GIVE", 5) == ["never gonna give you up"]
+    assert index.suggest("zzz", 5) == []
+    assert index.suggest("  ", 5) == []
+
+
+def test_more_popular_phrases_come_first(clock):
+    index = SuggestionIndex()
+    index.record_query("let it go")
+    index.record_query("let it be")
+    index.record_queued("Let It Be (Karaoke)")
+    assert index.suggest("let it", 2) == ["let it be", "let it go"]
+    assert index.suggest("let it", 1) == ["let it be"]
+
+
+def test_searched_phrases_outrank_titles_only_seen_in_results(clock):
+    index = SuggestionIndex()
+    index.record_results([{"title": f"Love song {i}"} for i in range(30)])
+    index.record_query("love story")
+    assert index.suggest("love", 3)[0] == "love story"
+    assert len(index.suggest("love", 3)) == 3
+
+
+def test_eviction_keeps_the_most_popular_phrases(clock):
+    index = SuggestionIndex(max_phrases=10)
+    index.record_query("keep me")
+    index.record_results([{"title": f"title {i}"} for i in range(20)])
+    assert len(index) <= 10
+    assert index.suggest("keep", 5) == ["keep me"]
+    # Every key left in the index still points at a known phrase.
+    assert all(phrase in index._scores for _, phrase in index._keys)
+    assert len(index.suggest("title", 20)) == len(index) - 1
+
+
+def test_scores_and_search_counts_fade_with_time(clock, monkeypatch):
+    monkeypatch.setattr(suggestions, "SUGGEST_HALF_LIFE_SECONDS", 100.0)
+    index = SuggestionIndex()
+    for _ in range(4):
+        index.record_query("old favourite")
+    index.record_results([{"title": "Seen once"}])
+
+    clock.now += 100
+    index.record_query("new hit")
+    assert index._scores["old favourite"] == pytest.approx(2.0)
+    assert index._queries["old favourite"] == pytest.approx(2.0)
+
+    clock.now += 300
+    index.record_query("new hit")
+    # Four old searches are now worth half of one, so the recent query ranks first.
+    assert index.suggest("new", 1) == ["new hit"]
+    assert index._scores["old favourite"] == pytest.approx(0.25)
+    assert index._popular_keys and all(phrase == "new hit" for _, phrase in index._popular_keys)
+    assert index.suggest("seen", 1) == []
+    assert index.suggest("old", 1) == ["old favourite"]
+
+
+def test_no_half_life_keeps_counts(clock, monkeypatch):
+    monkeypatch.setattr(suggestions, "SUGGEST_HALF_LIFE_SECONDS", 0.0)
+    index = SuggestionIndex()
+    index.record_query("forever")
+    clock.now += 10 ** 9
+    index.record_query("other")
+    assert index._scores["forever"] == 1.0
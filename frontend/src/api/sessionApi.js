@@ -6,7 +6,7 @@ import axiosClient from "./axiosClient";
  * Sends a request to the backend to create a new session.
  * @param {object} payload - The request payload.
  * @param {string|null} payload.password - The optional password for the session.
- * @returns {Promise<{status: string, session_code: string}>} The session data.
+ * @returns {Promise<{status: string, session_code: string, host_token: string}>} The session data.
  */
 // MODIFIED: The function now accepts an object with a password and sends it as the request body.
 export const createSession = async ({ password }) => {
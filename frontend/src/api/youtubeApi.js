@@ -23,4 +23,20 @@ export const searchYoutube = async ({ query, limit, page }) => {
     console.error("Error searching YouTube:", error);
     throw error;
   }
-};
\ No newline at end of file
+};
+/**
+ * Fetches typeahead suggestions for what the user has typed so far.
+ * @param {string} query - The partial search term.
+ * @param {number} [limit=8] - The maximum number of suggestions.
+ * @returns {Promise<string[]>} Suggested search terms, most popular first.
+ */
+export const suggestSongs = async (query, limit = 8) => {
+  try {
+    const response = await axiosClient.get('/youtube/suggest', { params: { q: query, limit } });
+    return response.data.suggestions || [];
+  } catch (error) {
+    // Suggestions are a nicety; a failure just means none are shown.
+    console.error("Error fetching suggestions:", error);
+    return [];
+  }
+};
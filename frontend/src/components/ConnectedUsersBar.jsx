@@ -2,6 +2,7 @@
 import React from 'react';
 import { Box, Typography, Avatar, AvatarGroup } from '@mui/material';
 import { styled } from '@mui/material/styles';
+import { resolveAvatarUrl } from '../utils/userUtils';
 
 // This styled component is now self-contained within this file.
 const UsersContainer = styled(Box)({
@@ -34,7 +35,7 @@ const ConnectedUsersBar = ({ users = [] }) => {
           <Avatar 
             key={user.id} 
             alt={user.name} 
-            src={user.avatarBase64} 
+            src={resolveAvatarUrl(user.avatarBase64)} 
           />
         ))}
       </AvatarGroup>
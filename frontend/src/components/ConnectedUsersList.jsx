@@ -3,6 +3,7 @@
 import React from 'react';
 import { Box, Typography, List, ListItem, ListItemAvatar, Avatar, ListItemText } from '@mui/material';
 import { styled } from '@mui/material/styles';
+import { resolveAvatarUrl } from '../utils/userUtils';
 
 const UsersContainer = styled(Box)(({ theme }) => ({
   marginTop: theme.spacing(4),
@@ -53,7 +54,7 @@ const ConnectedUsersList = ({ users, onKick }) => {
           {users.map((user) => (
             <UserListItem key={user.uuid || user.id}> {/* Use uuid or id for key */}
               <ListItemAvatar>
-                <Avatar src={user.avatarBase64} alt={user.name} />
+                <Avatar src={resolveAvatarUrl(user.avatarBase64)} alt={user.name} />
               </ListItemAvatar>
               <ListItemText 
                 primary={user.name} 
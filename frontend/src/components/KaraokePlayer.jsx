@@ -20,7 +20,7 @@ const PlayerWrapper = {
   },
 };
 
-const KaraokePlayer = ({ song, isPlaying, isLooping, showControls, onEnded, onError ,isMuted}) => {
+const KaraokePlayer = ({ song, isPlaying, isLooping, showControls, onEnded, onError ,isMuted, playerRef}) => {
   if (!song || !song.song_id) {
     return null;
   }
@@ -28,6 +28,7 @@ const KaraokePlayer = ({ song, isPlaying, isLooping, showControls, onEnded, onEr
   return (
     <div style={PlayerWrapper}>
       <ReactPlayer
+        ref={playerRef} // Lets the page read the playback position it reports to the server
         // Note: 'url' is the more standard prop name, but 'src' works too.
         src={`https://www.youtube.com/watch?v=${song.song_id}&vq=hd720`}
         // --- THIS IS THE FIX ---
@@ -3,6 +3,7 @@ import React from 'react';
 import { Box, Typography, Paper, Avatar } from '@mui/material';
 import { styled, keyframes } from '@mui/material/styles';
 import { sanitizeTitle } from '../utils/textUtils';
+import { resolveAvatarUrl } from '../utils/userUtils';
 
 // The animation scrolls the container from its start (0%) to the halfway point (-50%).
 // Because the content is duplicated, this creates a perfect, seamless loop.
@@ -85,7 +86,7 @@ const NowPlayingCard = ({ song, user }) => {
 
   return (
     <CardContainer>
-      <DanglingAvatar src={user.avatarBase64} alt={user.name} />
+      <DanglingAvatar src={resolveAvatarUrl(user.avatarBase64)} alt={user.name} />
       <ContentBox elevation={3}>
         <MarqueeContainer>
           <ScrollingTypography duration={animationDuration} variant="h6" sx={{ fontWeight: 'bold', fontSize: '1.2rem' }}>
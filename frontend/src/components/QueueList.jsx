@@ -6,6 +6,7 @@ import {
 } from '@mui/material';
 import DeleteIcon from '@mui/icons-material/Delete';
 import MusicNoteIcon from '@mui/icons-material/MusicNote';
+import { resolveAvatarUrl } from '../utils/userUtils';
 
 const QueueList = ({ queue, currentUser, onRemoveSong, connectedUsers }) => {
 
@@ -19,11 +20,11 @@ const QueueList = ({ queue, currentUser, onRemoveSong, connectedUsers }) => {
 
   const getAddedByDisplayData = (userId) => {
     if (userId === currentUser.id) {
-      return { name: 'You', avatar: currentUser.avatarBase64 };
+      return { name: 'You', avatar: resolveAvatarUrl(currentUser.avatarBase64) };
     }
     const user = userMap.get(userId);
     return user
-      ? { name: user.name, avatar: user.avatarBase64 }
+      ? { name: user.name, avatar: resolveAvatarUrl(user.avatarBase64) }
       : { name: 'A former user', avatar: null };
   };
 
@@ -1,7 +1,7 @@
 // src/components/ScoreDisplay.jsx
 import React, { useEffect, useState } from 'react';
 import { Box, Typography, Avatar, styled } from '@mui/material';
-import getRandomScore from '../utils/getRandomScore';
+import { resolveAvatarUrl } from '../utils/userUtils';
 
 const ScoreRoot = styled(Box)({
   position: 'fixed',
@@ -28,17 +28,13 @@ const BouncingAvatar = styled(Avatar)({
   border: '4px solid white',
 });
 
-const ScoreDisplay = ({ user, onCountUpFinished }) => {
-  const [score, setScore] = useState(0);
+// The score comes from the server (null while it is on its way); `rank` is the
+// singer's place on the session leaderboard, when known.
+const ScoreDisplay = ({ user, score, rank, onCountUpFinished }) => {
   const [displayScore, setDisplayScore] = useState(0);
   const [message, setMessage] = useState('');
   const [scoreColor, setScoreColor] = useState('white');
 
-  // Generate the score once when the component mounts
-  useEffect(() => {
-    setScore(getRandomScore());
-  }, []);
-
   // Animate the score counting up
   useEffect(() => {
     if (score > 0 && displayScore < score) {
@@ -73,10 +69,13 @@ const ScoreDisplay = ({ user, onCountUpFinished }) => {
 
   return (
     <ScoreRoot>
-      <BouncingAvatar src={user.avatarBase64} alt={user.name} />
+      <BouncingAvatar src={resolveAvatarUrl(user.avatarBase64)} alt={user.name} />
       <Typography sx={{ fontSize: '5vh', fontWeight: 'bold' }}>{user.name}'s Score!</Typography>
       <Typography sx={{ fontSize: '10vh', fontWeight: 'bold', color: scoreColor }}>{displayScore}</Typography>
       <Typography sx={{ fontSize: '5vh' }}>{message}</Typography>
+      {rank && displayScore === score && (
+        <Typography sx={{ fontSize: '3vh', opacity: 0.8 }}>#{rank} on the leaderboard</Typography>
+      )}
     </ScoreRoot>
   );
 };
@@ -1,10 +1,33 @@
 // src/components/SearchBar.jsx
-import React from 'react';
-import { TextField, IconButton, InputAdornment } from '@mui/material';
+import React, { useEffect, useState } from 'react';
+import { Autocomplete, TextField, IconButton, InputAdornment } from '@mui/material';
 import SearchIcon from '@mui/icons-material/Search';
+import { suggestSongs } from '../api/youtubeApi';
 
-// The component no longer has its own state. It gets everything from props.
+// Wait this long after the last keystroke before asking for suggestions.
+const SUGGEST_DEBOUNCE_MS = 150;
+
+// The component doesn't own the query. It gets it from props and reports changes up.
 const SearchBar = ({ query, onQueryChange, onSearch, isLoading }) => {
+  const [suggestions, setSuggestions] = useState([]);
+
+  // Typeahead: suggestions come from the server's in-memory index, never from YouTube.
+  useEffect(() => {
+    const term = query.trim();
+    if (!term || isLoading) {
+      setSuggestions([]);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      const found = await suggestSongs(term);
+      if (!cancelled) setSuggestions(found);
+    }, SUGGEST_DEBOUNCE_MS);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query, isLoading]);
 
   const handleSearchClick = () => {
     // onSearch is called without arguments, as the parent already has the query.
@@ -19,26 +42,46 @@ const SearchBar = ({ query, onQueryChange, onSearch, isLoading }) => {
     }
   };
 
+  // Picking a suggestion searches for it right away. Typed text submitted with Enter
+  // is handled by handleKeyPress instead.
+  const handleSuggestionPicked = (_event, value, reason) => {
+    if (reason === 'selectOption' && typeof value === 'string' && value.trim()) {
+      onQueryChange(value);
+      onSearch(value);
+    }
+  };
+
   return (
-    <TextField
-      label="Search for a song..."
-      variant="filled"
-      fullWidth
-      value={query} // The displayed text is now controlled by the parent.
-      onChange={(e) => onQueryChange(e.target.value)} // It reports changes up to the parent.
-      onKeyPress={handleKeyPress}
+    <Autocomplete
+      freeSolo
+      disableClearable
+      options={suggestions}
+      filterOptions={(options) => options} // The server already matched them.
+      inputValue={query}
+      onInputChange={(_event, value, reason) => { if (reason === 'input') onQueryChange(value); }}
+      onChange={handleSuggestionPicked}
       disabled={isLoading}
-      InputProps={{
-        endAdornment: (
-          <InputAdornment position="end">
-            <IconButton onClick={handleSearchClick} edge="end" disabled={isLoading || !query.trim()}>
-              <SearchIcon />
-            </IconButton>
-          </InputAdornment>
-        ),
-      }}
+      renderInput={(params) => (
+        <TextField
+          {...params}
+          label="Search for a song..."
+          variant="filled"
+          fullWidth
+          onKeyPress={handleKeyPress}
+          InputProps={{
+            ...params.InputProps,
+            endAdornment: (
+              <InputAdornment position="end">
+                <IconButton onClick={handleSearchClick} edge="end" disabled={isLoading || !query.trim()}>
+                  <SearchIcon />
+                </IconButton>
+              </InputAdornment>
+            ),
+          }}
+        />
+      )}
     />
   );
 };
 
-export default SearchBar;
\ No newline at end of file
+export default SearchBar;
@@ -1,5 +1,5 @@
 // src/components/SearchResults.jsx
-import React, { useRef, useCallback, useEffect } from 'react';
+import React from 'react';
 import {
   List, ListItem, ListItemAvatar, Avatar, ListItemText, Button, Box,
   CircularProgress, Typography, Paper
@@ -16,25 +16,9 @@ const ResultsContainer = styled(Paper)(({ theme }) => ({
   overflowY: 'auto', // Make it scrollable
 }));
 
-const SearchResults = ({ results, onAddSong, isLoading, loadMore, hasMore }) => {
-  const observer = useRef();
-
-  // This callback will be attached to the last element in the list
-  const lastResultElementRef = useCallback(node => {
-    if (isLoading) return; // Don't trigger while loading
-    if (observer.current) observer.current.disconnect(); // Disconnect old observer
-
-    observer.current = new IntersectionObserver(entries => {
-      // If the last element is visible and we have more results to load
-      if (entries[0].isIntersecting && hasMore) {
-        loadMore();
-      }
-    });
-
-    if (node) observer.current.observe(node); // Observe the new last element
-  }, [isLoading, hasMore, loadMore]);
-
-
+// Results stream in over the socket until the search completes; every result the
+// search found arrives that way, so there is no further page to load.
+const SearchResults = ({ results, onAddSong, isLoading }) => {
   if (results.length === 0 && !isLoading) {
     return null; // Don't show anything if there are no results
   }
@@ -42,13 +26,10 @@ const SearchResults = ({ results, onAddSong, isLoading, loadMore, hasMore }) =>
   return (
     <ResultsContainer>
       <List>
-        {results.map((song, index) => {
-          // Check if this is the last element to attach the ref
-          const isLastElement = results.length === index + 1;
+        {results.map((song) => {
           return (
             <ListItem
               key={song.id}
-              ref={isLastElement ? lastResultElementRef : null}
               secondaryAction={
                 <Button
                   variant="contained"
@@ -77,7 +58,7 @@ const SearchResults = ({ results, onAddSong, isLoading, loadMore, hasMore }) =>
           <CircularProgress />
         </Box>
       )}
-      {!hasMore && results.length > 0 && (
+      {!isLoading && results.length > 0 && (
          <Typography align="center" color="text.secondary" sx={{ p: 2 }}>
             No more results
          </Typography>
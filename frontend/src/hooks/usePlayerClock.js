@@ -0,0 +1,42 @@
+// src/hooks/usePlayerClock.js
+import { useState, useEffect, useCallback } from 'react';
+
+/**
+ * Follows the server's player state and extrapolates the playback position locally,
+ * so remotes only hear from the server when playback actually changes.
+ * @returns {[object, function(object): void]} - A tuple of the current player state
+ *   ({ isPlaying, queueId, position } with `position` in seconds, refreshed every second
+ *   while playing) and the handler for `player_state_updated` messages.
+ */
+const usePlayerClock = () => {
+  const [clock, setClock] = useState(null);
+  const [now, setNow] = useState(Date.now());
+
+  const handlePlayerState = useCallback((message) => {
+    // The server stamps its own time on every message; the difference to ours lines
+    // `updated_at` up with the local clock.
+    const offsetMs = message.server_time != null ? message.server_time * 1000 - Date.now() : 0;
+    setClock({ ...message, offsetMs });
+    setNow(Date.now());
+  }, []);
+
+  useEffect(() => {
+    if (!clock?.isPlaying) return;
+    const timer = setInterval(() => setNow(Date.now()), 1000);
+    return () => clearInterval(timer);
+  }, [clock]);
+
+  let position = clock?.position ?? 0;
+  if (clock?.isPlaying && clock.updated_at != null) {
+    position += Math.max(0, (now + clock.offsetMs) / 1000 - clock.updated_at);
+  }
+
+  const state = {
+    isPlaying: clock ? clock.isPlaying : true,
+    queueId: clock?.queue_id ?? null,
+    position,
+  };
+  return [state, handlePlayerState];
+};
+
+export default usePlayerClock;
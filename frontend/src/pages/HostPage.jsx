@@ -29,6 +29,7 @@ import { setSessionItem } from '../utils/sessionStorageUtils';
 import QRCodeDisplay from '../components/QRCodeDisplay';
 import ConnectedUsersList from '../components/ConnectedUsersList';
 import socket from '../socket/socket';
+import { subscribeToSession } from '../socket/sessionSync';
 
 // Constants
 const HOST_SESSION_KEY = 'kara_youke_host_session';
@@ -89,7 +90,7 @@ const HostPage = () => {
       socket.emit('host_started_session', { session_code: sessionCode });
       
       // Store session info and navigate.
-      setSessionItem('kara_youke_session', { code: sessionCode, role: 'host' });
+      setSessionItem('kara_youke_session', { code: sessionCode, role: 'host', hostToken: getLocalItem(HOST_SESSION_KEY)?.hostToken });
       navigate(`/karaoke`);
     }
   }, [navigate, sessionCode]); // Dependencies for useCallback
@@ -117,7 +118,8 @@ const HostPage = () => {
         handleStartKaraoke();
     };
 
-    socket.on('session_updated', handleSessionUpdate);
+    const hostToken = getLocalItem(HOST_SESSION_KEY)?.hostToken;
+    const unsubscribeSession = subscribeToSession(sessionCode, handleSessionUpdate, { host: true, hostToken });
     socket.on('users_updated', handleUsersUpdate);
     socket.on('start_session_from_remote', handleStartFromRemote); // <-- Attach the new listener
 
@@ -130,18 +132,19 @@ const HostPage = () => {
     }
 
     return () => {
-      socket.off('session_updated', handleSessionUpdate);
+      unsubscribeSession();
       socket.off('users_updated', handleUsersUpdate);
       socket.off('start_session_from_remote', handleStartFromRemote); // <-- Detach the listener on cleanup
     };
   }, [sessionCode, handleStartKaraoke]); // <-- Add handleStartKaraoke as a dependency
 
   // registerAsHost and session restoration effect (unchanged)
-  const registerAsHost = useCallback((code) => {
+  // The server only accepts a host socket that presents the token /create handed out.
+  const registerAsHost = useCallback((code, hostToken) => {
     if (!code) return;
     const doRegister = () => {
       console.log(`Socket connected, registering as host for ${code}`);
-      socket.emit('register_host', code);
+      socket.emit('register_host', { session_code: code, host_token: hostToken });
     };
     if (socket.connected) { doRegister(); } 
     else {
@@ -157,7 +160,7 @@ const HostPage = () => {
         const { valid } = await validateSession(savedSession.code);
         if (valid) {
           setSessionCode(savedSession.code);
-          registerAsHost(savedSession.code);
+          registerAsHost(savedSession.code, savedSession.hostToken);
         } else {
           removeLocalItem(HOST_SESSION_KEY);
         }
@@ -192,8 +195,9 @@ const HostPage = () => {
         });
         
         setSessionCode(newSessionCode);
-        setLocalItem(HOST_SESSION_KEY, { code: newSessionCode, role: 'host', password: password || null });
-        registerAsHost(newSessionCode);
+        // hostToken authorizes host-only REST calls (e.g. queue reorder); never share it.
+        setLocalItem(HOST_SESSION_KEY, { code: newSessionCode, role: 'host', password: password || null, hostToken: sessionData.host_token });
+        registerAsHost(newSessionCode, sessionData.host_token);
         setConnectedUsers([hostUserEntry]);
 
       } else {
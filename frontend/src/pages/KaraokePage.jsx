@@ -14,11 +14,13 @@ import DynamicQRCode from '../components/DynamicQRCode'; // Import the dynamic Q
 
 // Import hooks, socket, and utilities
 import socket from '../socket/socket';
+import { subscribeToSession } from '../socket/sessionSync';
 import { getSessionItem } from '../utils/sessionStorageUtils';
 import { getLocalItem } from '../utils/localStorageUtils';
 import { getUserData } from '../utils/userUtils';
 import { sanitizeTitle } from '../utils/textUtils';
 import useAudio from '../hooks/useAudio';
+import getRandomScore from '../utils/getRandomScore';
 
 // --- Styled Components for positioning UI elements ---
 const FixedNowPlayingWrapper = styled(Box)(({ theme }) => ({
@@ -62,12 +64,16 @@ const DEFAULT_SONG_OBJECT = {
   added_by: 'system',
 };
 
+// How long the score screen waits for the server's score before drawing one locally.
+const SCORE_TIMEOUT_MS = 3000;
+
 const KaraokePage = () => {
   // --- State Management ---
   const [queue, setQueue] = useState([]);
   const [users, setUsers] = useState([]);
   const [currentSong, setCurrentSong] = useState(DEFAULT_SONG_OBJECT);
   const [finishedSinger, setFinishedSinger] = useState(null);
+  const [finishedScore, setFinishedScore] = useState(null); // { score, rank } from the server
   const [isPlaying, setIsPlaying] = useState(true);
   const [message, setMessage] = useState(null);
   const [playerKey, setPlayerKey] = useState(Date.now());
@@ -76,6 +82,7 @@ const KaraokePage = () => {
   // --- Refs and Hooks ---
   const lastShownSongId = useRef(null);
   const songThatEnded = useRef(null);
+  const playerRef = useRef(null);
   const [, playScoreSound] = useAudio('/Sounds/videokeScore.mp3');
 
   const session = useMemo(() => getSessionItem('kara_youke_session'), []);
@@ -98,19 +105,20 @@ const KaraokePage = () => {
     });
   };
 
+  // --- Reports the player state; the server keeps it and answers remotes from it ---
+  const reportPlayerState = () => {
+    socket.emit('player_state_updated', {
+      session_code: sessionCode,
+      isPlaying,
+      queue_id: currentSong.queue_id ?? null,
+      position: playerRef.current?.currentTime ?? 0,
+    });
+  };
+
   // --- Effect #1: Setup Socket Event Listeners ---
   useEffect(() => {
     if (!sessionCode) return;
 
-    // A single, unified handler for ALL session state updates
-    const handleSessionUpdate = (sessionData) => {
-        setQueue(sessionData.queue || []);
-        setUsers(sessionData.users || []);
-        if (sessionData.settings && typeof sessionData.settings.showScore === 'boolean') {
-            setShowScore(sessionData.settings.showScore);
-        }
-    };
-
     // Handler for live, single setting changes
     const handleSettingUpdate = ({ key, value }) => {
         if (key === 'showScore') setShowScore(value);
@@ -125,33 +133,46 @@ const KaraokePage = () => {
       }
     };
 
-    const handleGetPlayerState = () => socket.emit('player_state_updated', { session_code: sessionCode, isPlaying });
+    // Only asked when the server has no state for this session yet.
+    const handleGetPlayerState = () => reportPlayerState();
 
-    socket.on('session_updated', handleSessionUpdate);
     socket.on('player_control', handlePlayerControl);
     socket.on('get_player_state', handleGetPlayerState);
     socket.on('setting_updated', handleSettingUpdate);
 
     return () => {
-      socket.off('session_updated', handleSessionUpdate);
       socket.off('player_control', handlePlayerControl);
       socket.off('get_player_state', handleGetPlayerState);
       socket.off('setting_updated', handleSettingUpdate);
     };
-  }, [sessionCode, isPlaying, queue]);
+  }, [sessionCode, isPlaying, queue, currentSong]);
 
-  // --- Effect #2: Fetch Initial Data ONCE ---
+  // --- Effect #2: Follow the Session State and Fetch Initial Data ONCE ---
+  // Kept apart from Effect #1 so the synced session mirror isn't reset on every queue change.
   useEffect(() => {
-    if (sessionCode) {
-      socket.emit('get_full_session', sessionCode);
-    }
+    if (!sessionCode) return;
+
+    // A single, unified handler for ALL session state updates
+    const handleSessionUpdate = (sessionData) => {
+        setQueue(sessionData.queue || []);
+        setUsers(sessionData.users || []);
+        if (sessionData.settings && typeof sessionData.settings.showScore === 'boolean') {
+            setShowScore(sessionData.settings.showScore);
+        }
+    };
+
+    const unsubscribeSession = subscribeToSession(sessionCode, handleSessionUpdate, { host: true, hostToken: session?.hostToken });
+    socket.emit('get_full_session', sessionCode);
+
+    return unsubscribeSession;
   }, [sessionCode]);
 
   // --- Effect #3: Broadcasting Player State ---
+  // Once per actual change (play/pause or a new song); remotes extrapolate the position in between.
   useEffect(() => {
     if (!sessionCode || !socket.connected) return;
-    socket.emit('player_state_updated', { session_code: sessionCode, isPlaying });
-  }, [isPlaying, sessionCode]);
+    reportPlayerState();
+  }, [isPlaying, sessionCode, currentSong.queue_id]);
 
   // --- Effect #4: Core Karaoke Logic (Current Song & Messages) ---
   useEffect(() => {
@@ -176,6 +197,22 @@ const KaraokePage = () => {
     setIsPlaying(!finishedSinger);
   }, [finishedSinger]);
 
+  // --- Effect #6: Scores come from the server, which also keeps the leaderboard ---
+  useEffect(() => {
+    const handlePerformanceScored = ({ queue_id, score, rank }) => {
+      if (queue_id === songThatEnded.current?.queue_id) setFinishedScore({ score, rank });
+    };
+    socket.on('performance_scored', handlePerformanceScored);
+    return () => socket.off('performance_scored', handlePerformanceScored);
+  }, []);
+
+  // If the server doesn't answer in time, show a local score rather than hold up the party.
+  useEffect(() => {
+    if (!finishedSinger || finishedScore) return;
+    const timer = setTimeout(() => setFinishedScore({ score: getRandomScore(), rank: null }), SCORE_TIMEOUT_MS);
+    return () => clearTimeout(timer);
+  }, [finishedSinger, finishedScore]);
+
   // --- Event Handlers ---
   const handleSongEnded = () => {
     if (currentSong?.added_by === 'system') {
@@ -186,7 +223,9 @@ const KaraokePage = () => {
     if (showScore) {
       songThatEnded.current = currentSong;
       const singer = getUserData(currentSong?.added_by, users);
+      setFinishedScore(null);
       setFinishedSinger(singer);
+      socket.emit('song_finished', { session_code: sessionCode, queue_id: currentSong.queue_id });
     } else {
       handleSkipSong(); // If scores are off, just skip to the next song
     }
@@ -201,6 +240,7 @@ const KaraokePage = () => {
         socket.emit('remove_song', { session_code: sessionCode, queue_id: songToRemove.queue_id, user_id: songToRemove.added_by });
       }
       setFinishedSinger(null);
+      setFinishedScore(null);
       songThatEnded.current = null;
     });
   };
@@ -235,6 +275,7 @@ const KaraokePage = () => {
       <KaraokePlayer
         key={playerKey}
         song={currentSong}
+        playerRef={playerRef}
         isPlaying={isPlaying}
         isLooping={currentSong.song_id === DEFAULT_VIDEO_ID}
         showControls={false}
@@ -244,7 +285,12 @@ const KaraokePage = () => {
       />
 
       {finishedSinger && (
-        <ScoreDisplay user={finishedSinger} onCountUpFinished={handleScoreAnimationComplete} />
+        <ScoreDisplay
+          user={finishedSinger}
+          score={finishedScore?.score ?? null}
+          rank={finishedScore?.rank}
+          onCountUpFinished={handleScoreAnimationComplete}
+        />
       )}
 
       <FullScreenMessage show={!!message} duration={message?.duration} onFinished={handleMessageFinished}>
@@ -1,5 +1,5 @@
 import React, { useState, useEffect, useMemo, useCallback, useRef } from 'react';
-import { Box, Typography, Stack, FormControlLabel, Switch, Button } from '@mui/material';
+import { Box, Typography, Stack, FormControlLabel, Switch, Button, Alert } from '@mui/material';
 import { styled } from '@mui/material/styles';
 import PlayCircleFilledWhiteIcon from '@mui/icons-material/PlayCircleFilledWhite';
 
@@ -11,11 +11,12 @@ import QueueList from '../components/QueueList';
 
 // Import Socket, Utils, and API functions
 import socket from '../socket/socket';
+import { subscribeToSession } from '../socket/sessionSync';
+import usePlayerClock from '../hooks/usePlayerClock';
 import { getSessionItem } from '../utils/sessionStorageUtils';
-import { searchYoutube } from '../api/youtubeApi';
+import { joinSession } from '../api/userApi';
 
 // --- Constants & Styled Components ---
-const ITEMS_PER_PAGE = 10;
 
 const RemotePageRoot = styled(Box)({
   minHeight: '100vh',
@@ -51,18 +52,18 @@ const RemotePage = () => {
   // --- State Management ---
   const [queue, setQueue] = useState([]);
   const [connectedUsers, setConnectedUsers] = useState([]);
-  const [isPlaying, setIsPlaying] = useState(true);
+  const [player, handlePlayerStateUpdate] = usePlayerClock(); // Server-authoritative playback state
   const [clientId, setClientId] = useState('');
   const [showScore, setShowScore] = useState(true);
+  const [queueMode, setQueueMode] = useState('fifo'); // 'fair' rotates the queue between singers
   const [isSessionStarted, setIsSessionStarted] = useState(false); // Master state for UI mode
+  const [queueNotice, setQueueNotice] = useState(''); // Set when the server turns a song away
 
-  // --- Search and Pagination State ---
+  // --- Search State ---
   const [searchQuery, setSearchQuery] = useState('');
   const [searchResults, setSearchResults] = useState([]);
-  const [page, setPage] = useState(1);
-  const [hasMore, setHasMore] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
-  const currentQueryRef = useRef('');
+  const searchRequestIdRef = useRef(null);
 
   // --- Memoized Values ---
   const session = useMemo(() => getSessionItem('kara_youke_session'), []);
@@ -73,7 +74,6 @@ const RemotePage = () => {
     if (!session?.code) return;
     
     const updateClientId = () => setClientId(socket.id || '');
-    const handlePlayerStateUpdate = ({ isPlaying }) => setIsPlaying(isPlaying);
 
     // This single handler is the source of truth for the component's state.
     const handleSessionUpdate = (sessionData) => {
@@ -81,6 +81,7 @@ const RemotePage = () => {
         setConnectedUsers(sessionData.users || []);
         if (sessionData.settings) {
             setShowScore(sessionData.settings.showScore ?? true);
+            setQueueMode(sessionData.settings.queueMode ?? 'fifo');
         }
         // Set the session started state directly from the server's truth.
         setIsSessionStarted(sessionData.is_started || false);
@@ -89,13 +90,51 @@ const RemotePage = () => {
     const handleSettingUpdate = ({ key, value }) => {
         if (key === 'showScore') {
             setShowScore(value);
+        } else if (key === 'queueMode') {
+            setQueueMode(value);
         }
     };
 
+    // Progressive search results; anything from an older search is ignored.
+    const handleSearchBatch = ({ request_id, results }) => {
+        if (request_id !== searchRequestIdRef.current) return;
+        setSearchResults(prevResults => [...prevResults, ...(results || [])]);
+    };
+
+    const handleSearchComplete = ({ request_id, status, message }) => {
+        if (request_id !== searchRequestIdRef.current) return;
+        if (status !== 'OK') console.error("Failed to fetch search results", message);
+        setIsLoading(false);
+    };
+
+    const handleAddSongRejected = ({ message }) => setQueueNotice(message);
+    const handleRateLimited = ({ retry_after }) => setQueueNotice(`You're doing that too often. Try again in ${retry_after}s.`);
+    // Player updates may have been dropped along with everything else; ask again.
+    const handleResync = () => socket.emit('get_player_state', session.code);
+
+    // Gone for longer than the server's grace period: join again, then resume from a snapshot.
+    const handleResumeFailed = async ({ message }) => {
+      const user = session.user || {};
+      try {
+        await joinSession({ session_code: session.code, id: user.id, name: user.name, avatarBase64: user.avatarBase64 });
+        socket.emit('resume_session', { session_code: session.code, user_id: user.id, revision: null });
+      } catch (error) {
+        setQueueNotice(error.response?.data?.detail || message);
+      }
+    };
+
     socket.on('connect', updateClientId);
-    socket.on('session_updated', handleSessionUpdate);
+    const unsubscribeSession = subscribeToSession(session.code, handleSessionUpdate, {
+      userId: session.user?.id,
+      onResumeFailed: handleResumeFailed,
+    });
     socket.on('setting_updated', handleSettingUpdate);
     socket.on('player_state_updated', handlePlayerStateUpdate);
+    socket.on('search_results_batch', handleSearchBatch);
+    socket.on('search_complete', handleSearchComplete);
+    socket.on('add_song_rejected', handleAddSongRejected);
+    socket.on('rate_limited', handleRateLimited);
+    socket.on('resync_required', handleResync);
 
     // This is the crucial part. After mounting and setting listeners, we ASK for the state.
     // This solves the race condition for newly joining clients.
@@ -105,50 +144,38 @@ const RemotePage = () => {
 
     return () => {
       socket.off('connect', updateClientId);
-      socket.off('session_updated', handleSessionUpdate);
+      unsubscribeSession();
       socket.off('setting_updated', handleSettingUpdate);
       socket.off('player_state_updated', handlePlayerStateUpdate);
+      socket.off('search_results_batch', handleSearchBatch);
+      socket.off('search_complete', handleSearchComplete);
+      socket.off('add_song_rejected', handleAddSongRejected);
+      socket.off('rate_limited', handleRateLimited);
+      socket.off('resync_required', handleResync);
     };
-  }, [session]);
+  }, [session, handlePlayerStateUpdate]);
 
   // --- Handlers ---
-  const handleSearch = useCallback(async () => {
-    if (!searchQuery.trim() || isLoading) return;
-    currentQueryRef.current = searchQuery;
+  // A picked suggestion is passed in directly, since the query state hasn't caught up yet.
+  const handleSearch = useCallback((pickedQuery) => {
+    const query = typeof pickedQuery === 'string' ? pickedQuery : searchQuery;
+    if (!query.trim() || isLoading) return;
+    const requestId = `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    searchRequestIdRef.current = requestId;
     setIsLoading(true);
-    setPage(1);
-    try {
-      const data = await searchYoutube({ query: searchQuery, limit: ITEMS_PER_PAGE, page: 1 });
-      setSearchResults(data.results || []);
-      setHasMore(data.has_more || false);
-    } catch (error) {
-      console.error("Failed to fetch search results", error);
-    } finally {
-      setIsLoading(false);
-    }
+    setSearchResults([]);
+    socket.emit('search_songs', { query: `${query} karaoke`, request_id: requestId });
   }, [searchQuery, isLoading]);
 
-  const handleLoadMore = useCallback(async () => {
-    if (isLoading || !hasMore) return;
-    const nextPage = page + 1;
-    setIsLoading(true);
-    try {
-      const data = await searchYoutube({ query: currentQueryRef.current, limit: ITEMS_PER_PAGE, page: nextPage });
-      setSearchResults(prevResults => [...prevResults, ...(data.results || [])]);
-      setHasMore(data.has_more || false);
-      setPage(nextPage);
-    } catch (error) {
-      console.error("Failed to fetch more results", error);
-    } finally {
-      setIsLoading(false);
-    }
-  }, [isLoading, hasMore, page]);
-
   const handleAddSong = useCallback((song) => {
     const newSongEntry = { song_id: song.id, title: song.title, duration: song.duration, added_by: currentUser.id, thumbnails: song.thumbnails };
     socket.emit('add_song', { session_code: session.code, song: newSongEntry });
+    setQueueNotice('');
+    // Drop any batches still streaming in for the search we're closing.
+    searchRequestIdRef.current = null;
     setSearchQuery('');
     setSearchResults([]);
+    setIsLoading(false);
   }, [currentUser, session]);
 
   const handleRemoveSong = useCallback((queueId) => { 
@@ -167,6 +194,10 @@ const RemotePage = () => {
     socket.emit('change_setting', { session_code: session.code, key: 'showScore', value: event.target.checked });
   };
   
+  const handleQueueModeChange = (event) => {
+    socket.emit('change_setting', { session_code: session.code, key: 'queueMode', value: event.target.checked ? 'fair' : 'fifo' });
+  };
+
   const handleRequestStartKaraoke = () => {
     socket.emit('remote_wants_to_start', { session_code: session.code });
   };
@@ -174,6 +205,9 @@ const RemotePage = () => {
   if (!currentUser) return null;
 
   const isPlayPauseDisabled = queue.length === 0;
+  // Only show the elapsed time once the server's state refers to the song that is on.
+  const isClockCurrent = queue.length > 0 && player.queueId === queue[0].queue_id;
+  const elapsed = `${Math.floor(player.position / 60)}:${String(Math.floor(player.position % 60)).padStart(2, '0')}`;
   const isNextDisabled = queue.length <= 1;
 
   return (
@@ -203,19 +237,30 @@ const RemotePage = () => {
             // --- UI AFTER SESSION STARTS (Full Remote View) ---
             <>
               <KaraokeControls
-                isPlaying={isPlaying}
+                isPlaying={player.isPlaying}
                 onPlayPause={handleTogglePlayPause}
                 onNext={handleNextSong}
                 isPlayPauseDisabled={isPlayPauseDisabled}
                 isNextDisabled={isNextDisabled}
               />
+              {isClockCurrent && (
+                <Typography variant="body2" color="text.secondary" sx={{ textAlign: 'center', mt: 1 }}>{elapsed}</Typography>
+              )}
               <Box sx={{ display: 'flex', justifyContent: 'center', my: 2, alignItems: 'center' }}>
                 <FormControlLabel
                   control={<Switch checked={showScore} onChange={handleShowScoreChange} />}
                   label="Show Score For All Singers"
                 />
+                <FormControlLabel
+                  control={<Switch checked={queueMode !== 'fifo'} onChange={handleQueueModeChange} />}
+                  label="Take Turns"
+                />
               </Box>
 
+              {queueNotice && (
+                <Alert severity="warning" onClose={() => setQueueNotice('')} sx={{ mb: 2 }}>{queueNotice}</Alert>
+              )}
+
               <Box mt={2}>
                 <SearchBar 
                   query={searchQuery} 
@@ -227,8 +272,6 @@ const RemotePage = () => {
                   results={searchResults} 
                   onAddSong={handleAddSong} 
                   isLoading={isLoading} 
-                  loadMore={handleLoadMore} 
-                  hasMore={hasMore} 
                 />
               </Box>
 
@@ -0,0 +1,142 @@
+// File: frontend/src/socket/sessionSync.js
+import socket from './socket';
+
+// Replays `{ queue_id, before }` moves: each song goes in front of `before`, or last when it is null.
+const applyMoves = (queue, moves) => {
+  const moved = [...queue];
+  for (const { queue_id, before } of moves || []) {
+    const from = moved.findIndex((song) => song.queue_id === queue_id);
+    if (from < 0) continue;
+    const [song] = moved.splice(from, 1);
+    const to = before == null ? -1 : moved.findIndex((s) => s.queue_id === before);
+    moved.splice(to < 0 ? moved.length : to, 0, song);
+  }
+  return moved;
+};
+
+// Reducers for the patch events the server broadcasts instead of the full session.
+// Each patch carries the session `revision` it produces; `session_patches` delivers
+// several of them, in order, as one event.
+const PATCH_REDUCERS = {
+  // In a fair queue mode, songs can be scheduled ahead of others already queued.
+  queue_item_added: (state, { item, before }) => ({
+    ...state,
+    queue: applyMoves([...(state.queue || []), item], before ? [{ queue_id: item.queue_id, before }] : []),
+  }),
+  queue_item_removed: (state, { queue_id }) => ({
+    ...state,
+    queue: (state.queue || []).filter((song) => song.queue_id !== queue_id),
+  }),
+  queue_items_added: (state, { items, moves }) => ({
+    ...state,
+    queue: applyMoves([...(state.queue || []), ...items], moves),
+  }),
+  queue_items_removed: (state, { queue_ids }) => {
+    const removed = new Set(queue_ids);
+    return { ...state, queue: (state.queue || []).filter((song) => !removed.has(song.queue_id)) };
+  },
+  queue_items_moved: (state, { moves }) => ({ ...state, queue: applyMoves(state.queue || [], moves) }),
+  user_joined: (state, { user }) => ({
+    ...state,
+    users: [...(state.users || []).filter((u) => u.id !== user.id), user],
+  }),
+  user_left: (state, { user_id }) => ({
+    ...state,
+    users: (state.users || []).filter((u) => u.id !== user_id),
+  }),
+  session_started: (state) => ({ ...state, is_started: true }),
+  setting_updated: (state, { key, value }) => ({
+    ...state,
+    settings: { ...(state.settings || {}), [key]: value },
+  }),
+  // Only singers whose rank or score changed are sent; everyone else keeps their place.
+  leaderboard_changed: (state, { entries }) => {
+    const changed = new Map(entries.map(({ rank, ...entry }) => [entry.id, { entry, rank }]));
+    const board = (state.leaderboard || []).filter((entry) => !changed.has(entry.id));
+    [...changed.values()]
+      .sort((a, b) => a.rank - b.rank)
+      .forEach(({ entry, rank }) => board.splice(rank - 1, 0, entry));
+    return { ...state, leaderboard: board };
+  },
+};
+
+/**
+ * Keeps a local mirror of a session in sync from the full snapshot (`session_updated`)
+ * and the revisioned patch events that follow it. A missed revision triggers a resync
+ * through `get_full_session`. After a dropped connection, `resume_session` rebinds the
+ * new socket and fetches only the patches missed in between.
+ * @param {string} sessionCode - The session to follow.
+ * @param {function} onChange - Called with the full, updated session state.
+ * @param {object} [resumeAs] - Who to resume as: `{ host: true, hostToken }` or `{ userId }`,
+ *   plus an optional `onResumeFailed` called when the server no longer has the user.
+ * @returns {function} Unsubscribes all listeners.
+ */
+export const subscribeToSession = (sessionCode, onChange, resumeAs = {}) => {
+  let state = null;
+
+  const handleSnapshot = (sessionData) => {
+    state = sessionData;
+    onChange(state);
+  };
+
+  // Applies one patch to the local state. Returns false if a revision was missed.
+  const applyPatch = (event, patch) => {
+    // Patches that arrive before the first snapshot are already part of it.
+    if (!state || patch.revision <= (state.revision ?? 0)) return true;
+    if (patch.revision !== (state.revision ?? 0) + 1) {
+      socket.emit('get_full_session', sessionCode);
+      return false;
+    }
+    state = { ...PATCH_REDUCERS[event](state, patch), revision: patch.revision };
+    return true;
+  };
+
+  const patchHandlers = Object.keys(PATCH_REDUCERS).map((event) => {
+    const handler = (patch) => {
+      const before = state;
+      applyPatch(event, patch);
+      if (state !== before) onChange(state);
+    };
+    return [event, handler];
+  });
+
+  // Patches made in quick succession arrive batched; render once for the whole batch.
+  const handleBatch = ({ patches = [] }) => {
+    const before = state;
+    for (const { event, ...patch } of patches) {
+      if (!PATCH_REDUCERS[event] || !applyPatch(event, patch)) break;
+    }
+    if (state !== before) onChange(state);
+  };
+
+  // The server dropped events it couldn't deliver to us in time; start over from a snapshot.
+  const handleResync = () => socket.emit('get_full_session', sessionCode);
+
+  // A reconnect gets a new socket id; one request binds it again and catches up.
+  const handleReconnect = () => {
+    socket.emit('resume_session', {
+      session_code: sessionCode,
+      user_id: resumeAs.userId ?? null,
+      host: Boolean(resumeAs.host),
+      host_token: resumeAs.host ? resumeAs.hostToken ?? null : null,
+      revision: state ? state.revision ?? 0 : null,
+    });
+  };
+  const handleResumeFailed = (data) => resumeAs.onResumeFailed?.(data);
+
+  socket.on('session_updated', handleSnapshot);
+  socket.on('session_patches', handleBatch);
+  socket.on('resync_required', handleResync);
+  socket.on('resume_failed', handleResumeFailed);
+  socket.io.on('reconnect', handleReconnect);
+  patchHandlers.forEach(([event, handler]) => socket.on(event, handler));
+
+  return () => {
+    socket.off('session_updated', handleSnapshot);
+    socket.off('session_patches', handleBatch);
+    socket.off('resync_required', handleResync);
+    socket.off('resume_failed', handleResumeFailed);
+    socket.io.off('reconnect', handleReconnect);
+    patchHandlers.forEach(([event, handler]) => socket.off(event, handler));
+  };
+};
@@ -20,4 +20,17 @@ export const getUserData = (userId, users) => {
   }
   const foundUser = users.find(user => user.id === userId);
   return foundUser || defaultUser;
-};
\ No newline at end of file
+};
+/**
+ * Resolves a user's avatar to an image URL. Uploaded avatars are stored by the
+ * backend and referenced as `/api/avatar/<id>`, which lives on the backend origin;
+ * bundled `/Avatars/*.svg` paths are served by the frontend itself.
+ * @param {string} avatar - The user's `avatarBase64` value.
+ * @returns {string} A URL usable as an image `src`.
+ */
+export const resolveAvatarUrl = (avatar) => {
+  if (avatar && avatar.startsWith('/api/avatar/')) {
+    return `${import.meta.env.VITE_BACKEND_BASE}${avatar}`;
+  }
+  return avatar;
+};